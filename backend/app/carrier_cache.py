@@ -0,0 +1,239 @@
+"""
+FMCSA carrier verification cache.
+
+Sits in front of the upstream lookup with:
+
+- positive results cached for hours, not-found results for a shorter TTL,
+  and upstream errors never cached
+- a bounded in-memory LRU backed by the ``carrier_verifications`` table, so
+  entries survive restarts
+- single-flight: concurrent lookups for one MC number share one request
+- stale-while-revalidate: an expired positive entry is served immediately
+  while a background task refreshes it
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.fmcsa_client import is_not_found, request_deadline
+from app.models import CarrierVerification
+from app.schemas import FMCSAVerifyResponse
+
+logger = logging.getLogger(__name__)
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+
+@dataclass
+class CacheEntry:
+    result: FMCSAVerifyResponse
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+
+
+def to_timestamp(value: datetime) -> float:
+    # SQLite drops the timezone, and values are always written in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def to_datetime(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class CarrierVerificationCache:
+    """Read-through cache for FMCSA carrier verifications."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[FMCSAVerifyResponse]],
+        session_factory: Optional[async_sessionmaker] = None,
+        ttl: float = 6 * 3600,
+        negative_ttl: float = 15 * 60,
+        stale_ttl: float = 24 * 3600,
+        max_entries: int = 50000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.fetch = fetch
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_requests = 0
+
+    async def get(self, mc_number: str) -> Tuple[FMCSAVerifyResponse, str]:
+        """Return ``(result, cache_status)`` for an MC number."""
+        entry = self._entries.get(mc_number)
+        if entry is None:
+            entry = await self._load(mc_number)
+        else:
+            self._entries.move_to_end(mc_number)
+
+        now = self.clock()
+        if entry is not None and now < entry.expires_at:
+            self.hits += 1
+            return entry.result, HIT
+
+        if entry is not None and now < entry.stale_until:
+            self.stale_hits += 1
+            self.revalidate(mc_number)
+            return entry.result, STALE
+
+        self.misses += 1
+        return await self.refresh(mc_number), MISS
+
+    def peek(self, mc_number: str) -> Optional[CacheEntry]:
+        """Return the in-memory entry for an MC number, even if expired."""
+        return self._entries.get(mc_number)
+
+    async def last_known_good(self, mc_number: str) -> Optional[CacheEntry]:
+        """The most recent stored verification, however old, for fallbacks."""
+        return self._entries.get(mc_number) or await self._load(mc_number)
+
+    async def refresh(self, mc_number: str) -> FMCSAVerifyResponse:
+        """Fetch upstream, sharing one request among concurrent callers."""
+        task = self._inflight.get(mc_number)
+        if task is None:
+            # The fetch is shared, so it must not inherit the first caller's
+            # deadline; each waiter enforces its own budget around the shield
+            context = contextvars.copy_context()
+            context.run(request_deadline.set, None)
+            task = asyncio.create_task(
+                self._fetch_and_store(mc_number), context=context
+            )
+            self._inflight[mc_number] = task
+            task.add_done_callback(lambda _: self._inflight.pop(mc_number, None))
+        # Shield so one caller going away does not cancel the shared request
+        return await asyncio.shield(task)
+
+    def revalidate(self, mc_number: str):
+        """Refresh an entry in the background, keeping the stale copy on failure."""
+        if mc_number in self._inflight:
+            return
+
+        async def run():
+            try:
+                await self.refresh(mc_number)
+            except Exception as e:
+                logger.warning(
+                    "Background FMCSA refresh for %s failed: %s", mc_number, e
+                )
+
+        # Fresh context so the refresh is not bound to the caller's request
+        task = asyncio.create_task(run(), context=contextvars.Context())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self):
+        """Cancel outstanding background refreshes."""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_requests": self.upstream_requests,
+            "inflight": len(self._inflight),
+        }
+
+    def ttl_for(self, result: FMCSAVerifyResponse) -> Optional[float]:
+        """Positive and not-found results are cacheable; upstream errors are not."""
+        if result.is_valid:
+            return self.ttl
+        if is_not_found(result):
+            return self.negative_ttl
+        return None
+
+    async def _fetch_and_store(self, mc_number: str) -> FMCSAVerifyResponse:
+        self.upstream_requests += 1
+        result = await self.fetch(mc_number)
+
+        ttl = self.ttl_for(result)
+        if ttl is not None:
+            now = self.clock()
+            stale = self.stale_ttl if result.is_valid else 0
+            entry = CacheEntry(result, now, now + ttl, now + ttl + stale)
+            self._remember(mc_number, entry)
+            await self._save(mc_number, entry)
+
+        return result
+
+    def _remember(self, mc_number: str, entry: CacheEntry):
+        self._entries[mc_number] = entry
+        self._entries.move_to_end(mc_number)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, mc_number: str) -> Optional[CacheEntry]:
+        if self.session_factory is None:
+            return None
+        try:
+            async with self.session_factory() as db:
+                row = await db.get(CarrierVerification, mc_number)
+        except Exception as e:
+            logger.warning("Failed to load cached verification %s: %s", mc_number, e)
+            return None
+        if row is None:
+            return None
+
+        expires_at = to_timestamp(row.expires_at)
+        entry = CacheEntry(
+            result=FMCSAVerifyResponse(
+                mc_number=row.mc_number,
+                is_valid=row.is_valid,
+                carrier_name=row.carrier_name,
+                operating_status=row.operating_status,
+                details=row.details,
+            ),
+            fetched_at=to_timestamp(row.fetched_at),
+            expires_at=expires_at,
+            stale_until=expires_at + (self.stale_ttl if row.is_valid else 0),
+        )
+        self._remember(mc_number, entry)
+        return entry
+
+    async def _save(self, mc_number: str, entry: CacheEntry):
+        if self.session_factory is None:
+            return
+        try:
+            async with self.session_factory() as db:
+                await db.merge(
+                    CarrierVerification(
+                        mc_number=mc_number,
+                        is_valid=entry.result.is_valid,
+                        carrier_name=entry.result.carrier_name,
+                        operating_status=entry.result.operating_status,
+                        details=entry.result.details,
+                        fetched_at=to_datetime(entry.fetched_at),
+                        expires_at=to_datetime(entry.expires_at),
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("Failed to persist verification %s: %s", mc_number, e)
@@ -0,0 +1,272 @@
+"""
+Materialized carrier history keyed by MC number.
+
+The ``carrier_profiles`` table holds running totals per carrier: calls,
+outcomes, negotiation rounds and the negotiated discount against the load's
+``loadboard_rate``. The call write queue folds each batch's changes into the
+affected rows inside the batch's transaction, so reading a profile is one
+primary-key lookup however many calls the carrier has made. Profiles are
+fronted by an LRU of ready-to-serve summaries.
+
+Discounts are ``(loadboard_rate - final_rate) / loadboard_rate``; a negative
+average means the carrier typically books above the posted rate.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Call, CarrierProfile, Load
+
+
+class CallSnapshot(NamedTuple):
+    """The fields of a call that feed its carrier's profile."""
+
+    carrier_mc_number: Optional[str]
+    carrier_name: Optional[str]
+    load_id: Optional[str]
+    outcome: Optional[str]
+    final_rate: Optional[float]
+    negotiation_rounds: Optional[int]
+    started_at: Optional[datetime]
+
+    @classmethod
+    def of(cls, call: Call) -> "CallSnapshot":
+        return cls(*(getattr(call, name) for name in cls._fields))
+
+
+def new_profile(mc_number: str) -> CarrierProfile:
+    return CarrierProfile(
+        mc_number=mc_number,
+        total_calls=0,
+        accepted_calls=0,
+        calls_by_outcome={},
+        negotiation_rounds_total=0,
+        rated_calls=0,
+        discount_total=0.0,
+    )
+
+
+def apply_call(
+    profile: CarrierProfile,
+    call: CallSnapshot,
+    loadboard_rate: Optional[float],
+    sign: int,
+):
+    """Add (``sign=1``) or remove (``sign=-1``) one call's contribution."""
+    profile.total_calls += sign
+    if call.outcome == "accepted":
+        profile.accepted_calls += sign
+    if call.outcome:
+        outcomes = dict(profile.calls_by_outcome or {})
+        outcomes[call.outcome] = outcomes.get(call.outcome, 0) + sign
+        profile.calls_by_outcome = {k: v for k, v in outcomes.items() if v > 0}
+    profile.negotiation_rounds_total += sign * (call.negotiation_rounds or 0)
+    if call.final_rate is not None and loadboard_rate:
+        profile.rated_calls += sign
+        profile.discount_total += (
+            sign * (loadboard_rate - call.final_rate) / (loadboard_rate)
+        )
+        if not profile.rated_calls:
+            profile.discount_total = 0.0
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; its CURRENT_TIMESTAMP is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_later_call(profile: CarrierProfile, call: CallSnapshot) -> bool:
+    """Whether ``call`` started no earlier than the profile's last call."""
+    if profile.last_call_at is None or call.started_at is None:
+        return True
+    return as_utc(call.started_at) >= as_utc(profile.last_call_at)
+
+
+def summarize(profile: CarrierProfile) -> Dict[str, Any]:
+    total = profile.total_calls
+    return {
+        "mc_number": profile.mc_number,
+        "carrier_name": profile.carrier_name,
+        "total_calls": total,
+        "accepted_calls": profile.accepted_calls,
+        "acceptance_rate": profile.accepted_calls / total if total else None,
+        "calls_by_outcome": profile.calls_by_outcome or {},
+        "average_negotiation_rounds": (
+            profile.negotiation_rounds_total / total if total else None
+        ),
+        "rated_calls": profile.rated_calls,
+        "average_discount": (
+            round(profile.discount_total / profile.rated_calls, 4)
+            if profile.rated_calls
+            else None
+        ),
+        "last_call_id": profile.last_call_id,
+        "last_call_at": profile.last_call_at,
+        "updated_at": profile.updated_at,
+    }
+
+
+class CarrierProfileStore:
+    """
+    LRU of profile summaries in front of the ``carrier_profiles`` table.
+
+    The write queue publishes summaries after each commit. Readers fill the
+    LRU from the database on a miss, but never over a published summary, so a
+    read that raced a commit cannot put an older profile back.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # The write queue publishes from its worker thread
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, mc_number: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self._entries.get(mc_number)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(mc_number)
+            self.hits += 1
+            return summary
+
+    def fill(self, mc_number: str, summary: Dict[str, Any]):
+        """Cache a summary read from the database unless a newer one is cached."""
+        with self._lock:
+            if mc_number not in self._entries:
+                self._put(mc_number, summary)
+
+    def publish(self, summaries: Dict[str, Dict[str, Any]]):
+        """Cache summaries written by a committed transaction."""
+        with self._lock:
+            for mc_number, summary in summaries.items():
+                self._put(mc_number, summary)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _put(self, mc_number: str, summary: Dict[str, Any]):
+        self._entries[mc_number] = summary
+        self._entries.move_to_end(mc_number)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def apply(
+        self,
+        db: Session,
+        changes: List[Tuple[Optional[CallSnapshot], CallSnapshot, str]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fold call changes into ``carrier_profiles`` in ``db``'s transaction.
+
+        ``changes`` holds ``(before, after, call_id)`` per written call, with
+        ``before`` None for new calls. Returns summaries of the touched
+        profiles for ``publish`` once the caller has committed.
+        """
+        changes = [c for c in changes if c[0] != c[1]]
+        if not changes:
+            return {}
+
+        snapshots = [s for before, after, _ in changes for s in (before, after) if s]
+        load_ids = {s.load_id for s in snapshots if s.load_id}
+        mc_numbers = {s.carrier_mc_number for s in snapshots if s.carrier_mc_number}
+        loadboard_rates = dict(
+            db.query(Load.load_id, Load.loadboard_rate).filter(
+                Load.load_id.in_(load_ids)
+            )
+        )
+        profiles = {
+            row.mc_number: row
+            for row in db.query(CarrierProfile).filter(
+                CarrierProfile.mc_number.in_(mc_numbers)
+            )
+        }
+
+        def profile_for(mc_number: str) -> CarrierProfile:
+            if mc_number not in profiles:
+                profiles[mc_number] = new_profile(mc_number)
+                db.add(profiles[mc_number])
+            return profiles[mc_number]
+
+        now = datetime.now(timezone.utc)
+        touched = set()
+        for before, after, call_id in changes:
+            if before is not None and before.carrier_mc_number:
+                profile = profile_for(before.carrier_mc_number)
+                apply_call(profile, before, loadboard_rates.get(before.load_id), -1)
+                touched.add(before.carrier_mc_number)
+            if after.carrier_mc_number:
+                profile = profile_for(after.carrier_mc_number)
+                apply_call(profile, after, loadboard_rates.get(after.load_id), 1)
+                if after.carrier_name:
+                    profile.carrier_name = after.carrier_name
+                if (
+                    before is None
+                    or before.carrier_mc_number != after.carrier_mc_number
+                ) and is_later_call(profile, after):
+                    profile.last_call_id = call_id
+                    profile.last_call_at = after.started_at
+                touched.add(after.carrier_mc_number)
+
+        for mc_number in touched:
+            profiles[mc_number].updated_at = now
+        return {mc_number: summarize(profiles[mc_number]) for mc_number in touched}
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every profile from call history, replacing the table and
+        emptying the LRU. Returns the number of carriers.
+        """
+        now = datetime.now(timezone.utc)
+        profiles: Dict[str, CarrierProfile] = {}
+        rows = (
+            db.query(
+                Call.call_id,
+                *(getattr(Call, name) for name in CallSnapshot._fields),
+                Load.loadboard_rate,
+            )
+            .outerjoin(Load, Call.load_id == Load.load_id)
+            .filter(Call.carrier_mc_number.isnot(None))
+            .order_by(Call.started_at, Call.id)
+        )
+        for row in rows.yield_per(1000):
+            call = CallSnapshot(*(getattr(row, name) for name in CallSnapshot._fields))
+            profile = profiles.get(call.carrier_mc_number)
+            if profile is None:
+                profile = profiles[call.carrier_mc_number] = new_profile(
+                    call.carrier_mc_number
+                )
+            apply_call(profile, call, row.loadboard_rate, 1)
+            profile.carrier_name = call.carrier_name or profile.carrier_name
+            profile.last_call_id = row.call_id
+            profile.last_call_at = row.started_at
+            profile.updated_at = now
+
+        db.query(CarrierProfile).delete()
+        db.add_all(profiles.values())
+        db.commit()
+        self.clear()
+        return len(profiles)
+
+    @staticmethod
+    def is_materialized(db: Session) -> bool:
+        """Whether profiles exist, or there is no call history to build them from."""
+        if db.query(CarrierProfile.mc_number).first() is not None:
+            return True
+        return (
+            db.query(Call.id).filter(Call.carrier_mc_number.isnot(None)).first() is None
+        )
+
+
+carrier_profiles = CarrierProfileStore(settings.CARRIER_PROFILE_CACHE_MAX_ENTRIES)
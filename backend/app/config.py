@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -9,14 +9,179 @@ class Settings(BaseSettings):
     API_KEY: str = ""
 
     DATABASE_URL: str = "sqlite:///./carrier_sales.db"
+    READ_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL
+    DB_ECHO: bool = False  # Log every SQL statement
+
+    # Named engine profiles: SQLite pragmas applied on connect plus pool sizing.
+    # Select one with DB_PROFILE; override the whole mapping as JSON if needed.
+    DB_PROFILE: str = "default"
+    DB_PROFILES: Dict[str, Dict[str, Any]] = {
+        "default": {
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "busy_timeout": 5000,
+                "cache_size": -64000,  # KiB, i.e. 64 MB
+                "mmap_size": 268435456,
+                "temp_store": "MEMORY",
+            },
+            "pool_size": 5,
+            "max_overflow": 10,
+            "read_pool_size": 10,
+            "pool_timeout": 30,
+        },
+        "low_memory": {
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "busy_timeout": 5000,
+                "cache_size": -8000,
+                "mmap_size": 0,
+            },
+            "pool_size": 2,
+            "max_overflow": 2,
+            "read_pool_size": 4,
+            "pool_timeout": 30,
+        },
+        "bulk_load": {
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "OFF",
+                "busy_timeout": 30000,
+                "cache_size": -256000,
+                "mmap_size": 1073741824,
+                "temp_store": "MEMORY",
+            },
+            "pool_size": 1,
+            "max_overflow": 0,
+            "read_pool_size": 2,
+            "pool_timeout": 60,
+        },
+    }
 
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
 
     FMCSA_API_URL: str = "https://mobile.fmcsa.dot.gov/qc/services/carriers"
     FMCSA_API_KEY: str = ""
 
+    # Shared FMCSA HTTP client (created once per process in the app lifespan)
+    FMCSA_HTTP2: bool = True
+    FMCSA_MAX_CONNECTIONS: int = 20
+    FMCSA_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    FMCSA_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    FMCSA_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    FMCSA_TIMEOUT_SECONDS: float = 10.0
+
+    # FMCSA verification cache
+    FMCSA_CACHE_TTL_SECONDS: float = 6 * 3600
+    FMCSA_NEGATIVE_CACHE_TTL_SECONDS: float = 15 * 60
+    FMCSA_CACHE_STALE_SECONDS: float = 24 * 3600  # Serve stale while refreshing
+    FMCSA_CACHE_MAX_ENTRIES: int = 50000
+
+    # Upstream quota shared by all FMCSA lookups, and bulk verification fan-out
+    FMCSA_RATE_LIMIT_PER_SECOND: float = 10.0
+    FMCSA_RATE_LIMIT_BURST: int = 20
+    FMCSA_BULK_CONCURRENCY: int = 10
+    FMCSA_BULK_MAX_ITEMS: int = 10000
+
+    # Circuit breaker and latency budget for FMCSA lookups. Callers can send
+    # their remaining budget in X-Request-Budget-Ms; otherwise the default is used
+    FMCSA_BREAKER_FAILURE_THRESHOLD: int = 5
+    FMCSA_BREAKER_RESET_SECONDS: float = 30.0
+    FMCSA_BREAKER_HALF_OPEN_CALLS: int = 1
+    FMCSA_DEFAULT_BUDGET_MS: float = 4000.0
+    FMCSA_BUDGET_RESERVE_MS: float = 50.0  # Kept back to build the response
+    FMCSA_LATENCY_WINDOW: int = 1000
+
     HAPPYROBOT_WEBHOOK_SECRET: str = ""  # For validating webhook calls
 
+    # Slow-query log; statements over the threshold are kept with their plan
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # Bulk load ingestion
+    BULK_UPSERT_CHUNK_SIZE: int = 500
+
+    # Prometheus request metrics middleware
+    PROMETHEUS_ENABLED: bool = True
+
+    # Admission control: requests matching a class's "METHOD /path" patterns
+    # (fnmatch syntax, no trailing slash) share its concurrency limit and wait
+    # at most queue_timeout_ms for a slot before a 503 with Retry-After. Lower
+    # priority numbers win: while a higher class has requests queued, lower
+    # classes are shed instead of queued. Unmatched routes are not limited.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_CLASSES: Dict[str, Dict[str, Any]] = {
+        "live": {
+            "priority": 0,
+            "routes": [
+                "GET /api/v1/loads",
+                "GET /api/v1/loads/*",
+                "POST /api/v1/fmcsa/verify",
+                "GET /api/v1/carriers/*",
+                "GET /api/v1/metrics/lanes",
+            ],
+            "max_concurrency": 32,
+            "max_queue": 256,
+            "queue_timeout_ms": 1000,
+            "retry_after_seconds": 1,
+        },
+        "dashboard": {
+            "priority": 1,
+            "routes": ["GET /api/v1/metrics", "GET /api/v1/metrics/calls"],
+            "max_concurrency": 4,
+            "max_queue": 16,
+            "queue_timeout_ms": 250,
+            "retry_after_seconds": 5,
+        },
+    }
+
+    # On-demand profiling of requests carrying a signed X-Profile header
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = ""
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_MAX_PROFILES: int = 50
+    PROFILING_SIGNATURE_MAX_AGE_SECONDS: float = 300.0
+
+    # Load listing pagination
+    LOAD_PAGE_SIZE: int = 100
+    LOAD_PAGE_MAX_SIZE: int = 1000
+
+    # Lexical half of hybrid load search: "bm25" scores every load in memory,
+    # "fts5" ranks and filters in SQLite and fuses the best candidates, so it
+    # only returns loads with at least one word of the query
+    SEARCH_LEXICAL_ENGINE: str = "bm25"
+    SEARCH_FTS5_CANDIDATES: int = 200
+
+    # Cached load reads and searches (0 disables caching; ETags still apply)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+
+    # Call ingestion write queue
+    WRITE_QUEUE_MAX_SIZE: int = 10000
+    WRITE_QUEUE_BATCH_SIZE: int = 500
+    WRITE_QUEUE_FLUSH_INTERVAL_MS: int = 50
+
+    # Lane rate statistics, maintained by the write queue; percentiles are
+    # within this relative error of the true value
+    LANE_STATS_RELATIVE_ACCURACY: float = 0.01
+
+    # Call transcript compression: "zlib", or "zstd" with the zstandard package
+    TRANSCRIPT_CODEC: str = "zlib"
+
+    # Carrier profiles kept in memory in front of the carrier_profiles table
+    CARRIER_PROFILE_CACHE_MAX_ENTRIES: int = 10000
+
+    # Saved searches: min_rate bucket width for the reverse index, per-listener
+    # SSE queue, keep-alive interval, and webhook callback timeout
+    SAVED_SEARCH_RATE_BUCKET_SIZE: float = 250.0
+    SAVED_SEARCH_EVENT_QUEUE_SIZE: int = 100
+    SAVED_SEARCH_KEEPALIVE_SECONDS: float = 15.0
+    SAVED_SEARCH_CALLBACK_TIMEOUT_SECONDS: float = 5.0
+    # Hosts callbacks may target; empty allows any host with public addresses
+    SAVED_SEARCH_CALLBACK_HOSTS: List[str] = []
+
     ENVIRONMENT: str = "development"
     APP_DEBUG: bool = True
 
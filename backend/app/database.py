@@ -1,18 +1,175 @@
-from sqlalchemy import create_engine
+import sqlite3
+from functools import lru_cache
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.query_log import SlowQueryLog
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}
-    if "sqlite" in settings.DATABASE_URL
-    else {},
-    echo=settings.APP_DEBUG,
-)
+
+def get_profile(name: str = None) -> Dict[str, Any]:
+    """Look up a named engine profile from settings."""
+    name = name or settings.DB_PROFILE
+    try:
+        return settings.DB_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB_PROFILE {name!r}; expected one of {sorted(settings.DB_PROFILES)}"
+        )
+
+
+def is_sqlite_memory(url: str) -> bool:
+    return url.startswith("sqlite") and (
+        url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+    )
+
+
+def apply_pragmas(engine: Engine, pragmas: Dict[str, Any], read_only: bool = False):
+    """Run the profile's PRAGMA statements on every new SQLite connection."""
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            # journal_mode is persistent and needs write access, so leave it to
+            # the writer engine
+            if read_only and name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_fts5() -> bool:
+    """Whether the linked SQLite library was built with the FTS5 extension."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(body)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def dialect_insert(db: Session):
+    """The ``insert`` construct with ``ON CONFLICT`` support for ``db``'s dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def pool_options(url: str, profile: Dict[str, Any], read_only: bool) -> Dict[str, Any]:
+    if is_sqlite_memory(url):
+        return {}
+    return {
+        "pool_size": profile.get("read_pool_size" if read_only else "pool_size", 5),
+        "max_overflow": profile.get("max_overflow", 10),
+        "pool_timeout": profile.get("pool_timeout", 30),
+        "pool_pre_ping": not url.startswith("sqlite"),
+    }
+
+
+def create_db_engine(url: str, profile: Dict[str, Any], read_only: bool = False):
+    """Create an engine sized and tuned according to ``profile``."""
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+
+    engine = create_engine(url, **options, **pool_options(url, profile, read_only))
+
+    if url.startswith("sqlite"):
+        apply_pragmas(engine, profile.get("pragmas", {}), read_only=read_only)
+
+    return engine
+
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver URL for its asyncio driver (aiosqlite / asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    driver = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgres": "postgresql+asyncpg",
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+    }.get(scheme, scheme)
+    return f"{driver}{sep}{rest}"
+
+
+def create_async_db_engine(url: str, profile: Dict[str, Any], read_only: bool = False):
+    """Create an asyncio engine with the same tuning as ``create_db_engine``."""
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+
+    pool = pool_options(url, profile, read_only)
+    if pool:
+        options["poolclass"] = AsyncAdaptedQueuePool
+
+    engine = create_async_engine(to_async_url(url), **options, **pool)
+
+    if url.startswith("sqlite"):
+        apply_pragmas(engine.sync_engine, profile.get("pragmas", {}), read_only)
+
+    return engine
+
+
+profile = get_profile()
+
+engine = create_db_engine(settings.DATABASE_URL, profile)
+
+# Read-only endpoints use their own pool so they never queue behind the
+# webhook/ingest writer. SQLite connections are opened with query_only, and in
+# WAL mode readers do not block on the writer. An in-memory database cannot be
+# shared across engines, so it falls back to the writer engine.
+if is_sqlite_memory(settings.DATABASE_URL) and not settings.READ_DATABASE_URL:
+    read_engine = engine
+else:
+    read_engine = create_db_engine(
+        settings.READ_DATABASE_URL or settings.DATABASE_URL, profile, read_only=True
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Asyncio engines for the hot request paths, so waiting on the database does
+# not hold one of Starlette's threadpool slots.
+async_engine = create_async_db_engine(settings.DATABASE_URL, profile)
+if is_sqlite_memory(settings.DATABASE_URL) and not settings.READ_DATABASE_URL:
+    async_read_engine = async_engine
+else:
+    async_read_engine = create_async_db_engine(
+        settings.READ_DATABASE_URL or settings.DATABASE_URL, profile, read_only=True
+    )
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, autoflush=False, expire_on_commit=False
+)
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine, "writer")
+    slow_query_log.install(async_engine.sync_engine, "async-writer")
+    if read_engine is not engine:
+        slow_query_log.install(read_engine, "reader")
+    if async_read_engine is not async_engine:
+        slow_query_log.install(async_read_engine.sync_engine, "async-reader")
 
 Base = declarative_base()
 
@@ -26,8 +183,51 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Dependency for getting a read-only database session."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Dependency for getting a read-only asyncio database session."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines():
+    """Close pooled asyncio connections on shutdown."""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
 def init_db():
     """Initialize database tables."""
-    from app.models import Load, Call, Negotiation  # noqa: F401
+    from app.models import (  # noqa: F401
+        Load,
+        Call,
+        CallTranscript,
+        Negotiation,
+        CarrierVerification,
+        CarrierProfile,
+        LaneStat,
+        SavedSearch,
+    )
+
+    from app.load_fts import FTS5, ensure_load_fts
+    from app.transcripts import migrate_inline_transcripts
 
     Base.metadata.create_all(bind=engine)
+    migrate_inline_transcripts(engine, settings.TRANSCRIPT_CODEC)
+    if settings.SEARCH_LEXICAL_ENGINE == FTS5:
+        ensure_load_fts(engine)
@@ -0,0 +1,265 @@
+"""
+FMCSA QCMobile API client.
+
+A single ``httpx.AsyncClient`` is created per process in the app lifespan so
+carrier verifications reuse pooled keep-alive (and HTTP/2) connections instead
+of paying DNS, TCP and TLS setup on every call. ``FMCSAUpstream`` wraps it
+with the rate limiter, a circuit breaker and per-request deadlines.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+from app.circuit_breaker import CircuitBreaker, LatencyWindow
+from app.config import settings
+from app.instrumentation import FMCSA_UPSTREAM_DURATION, FMCSA_UPSTREAM_ERRORS
+from app.rate_limit import TokenBucket
+from app.schemas import FMCSAVerifyResponse
+
+logger = logging.getLogger(__name__)
+
+CARRIER_NOT_FOUND = "Carrier not found or invalid MC number"
+MC_NOT_FOUND = "MC number not found in FMCSA database"
+
+
+def create_fmcsa_client() -> httpx.AsyncClient:
+    """Create the app-scoped FMCSA client with pooling limits and timeouts."""
+    return httpx.AsyncClient(
+        http2=settings.FMCSA_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.FMCSA_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.FMCSA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.FMCSA_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.FMCSA_TIMEOUT_SECONDS,
+            connect=settings.FMCSA_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def create_rate_limiter() -> TokenBucket:
+    """Create the process-wide limiter that keeps us inside FMCSA's quota."""
+    return TokenBucket(
+        rate=settings.FMCSA_RATE_LIMIT_PER_SECOND,
+        burst=settings.FMCSA_RATE_LIMIT_BURST,
+    )
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.FMCSA_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.FMCSA_BREAKER_RESET_SECONDS,
+        half_open_max_calls=settings.FMCSA_BREAKER_HALF_OPEN_CALLS,
+    )
+
+
+# Absolute (time.monotonic) deadline of the request being served, if any
+request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "fmcsa_request_deadline", default=None
+)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+async def fetch_carrier(
+    client: httpx.AsyncClient,
+    mc_number: str,
+    timeout: Optional[float] = None,
+) -> FMCSAVerifyResponse:
+    """
+    Look up a carrier upstream and parse the result.
+
+    Transport errors (timeouts, connection failures) propagate as ``httpx``
+    exceptions so callers can decide how to surface them. ``timeout`` caps the
+    client's configured timeouts for this request.
+    """
+    params = {"webKey": settings.FMCSA_API_KEY}
+    url = f"{settings.FMCSA_API_URL}/{mc_number}"
+
+    if timeout is None:
+        response = await client.get(url, params=params)
+    else:
+        response = await client.get(
+            url,
+            params=params,
+            timeout=httpx.Timeout(
+                min(timeout, settings.FMCSA_TIMEOUT_SECONDS),
+                connect=min(timeout, settings.FMCSA_CONNECT_TIMEOUT_SECONDS),
+            ),
+        )
+    logger.debug("FMCSA API response status %s for %s", response.status_code, mc_number)
+
+    return parse_carrier_response(mc_number, response)
+
+
+class FMCSAUpstream:
+    """
+    FMCSA lookups guarded by the rate limiter, circuit breaker and deadline.
+
+    Transport errors, timeouts and error responses (anything that is neither
+    a carrier nor a definitive not-found) count as breaker failures. While the
+    breaker is open, ``fetch`` raises ``CircuitOpenError`` without calling
+    upstream. Each call is bounded by the current request's remaining budget.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        rate_limiter: Optional[TokenBucket] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        latency: Optional[LatencyWindow] = None,
+    ):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyWindow()
+
+    async def fetch(self, mc_number: str) -> FMCSAVerifyResponse:
+        self.breaker.before_call()
+        try:
+            result = await self._fetch(mc_number)
+        except (httpx.RequestError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            FMCSA_UPSTREAM_ERRORS.inc()
+            if isinstance(e, asyncio.TimeoutError):
+                raise httpx.TimeoutException("FMCSA request exceeded its budget")
+            raise
+        except BaseException:
+            # Cancelled by the caller: neither a success nor a failure
+            self.breaker.release()
+            raise
+
+        if result.is_valid or is_not_found(result):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+            FMCSA_UPSTREAM_ERRORS.inc()
+        return result
+
+    async def _fetch(self, mc_number: str) -> FMCSAVerifyResponse:
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            raise asyncio.TimeoutError
+
+        async with asyncio.timeout(budget):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                return await fetch_carrier(
+                    self.client, mc_number, timeout=remaining_budget()
+                )
+            finally:
+                elapsed = time.perf_counter() - start
+                self.latency.record(elapsed)
+                FMCSA_UPSTREAM_DURATION.observe(elapsed)
+
+
+def is_not_found(result: FMCSAVerifyResponse) -> bool:
+    """True when FMCSA definitively reported that the carrier does not exist."""
+    error = (result.details or {}).get("error")
+    return not result.is_valid and error in (CARRIER_NOT_FOUND, MC_NOT_FOUND)
+
+
+def parse_carrier_response(
+    mc_number: str, response: httpx.Response
+) -> FMCSAVerifyResponse:
+    """Translate an FMCSA API response into a verification result."""
+    if response.status_code == 200:
+        try:
+            data = response.json()
+        except Exception as e:
+            return FMCSAVerifyResponse(
+                mc_number=mc_number,
+                is_valid=False,
+                details={
+                    "error": "Failed to parse FMCSA API response",
+                    "raw_response": response.text[:500],
+                    "parse_error": str(e),
+                },
+            )
+
+        if not isinstance(data, dict):
+            return FMCSAVerifyResponse(
+                mc_number=mc_number,
+                is_valid=False,
+                details={
+                    "error": "FMCSA API returned unexpected format",
+                    "raw_response": str(data)[:500],
+                },
+            )
+
+        content = data.get("content")
+
+        if content is None:
+            # Content is null - carrier might not exist or API structure is different
+            # Check if there's other data in the response
+            return FMCSAVerifyResponse(
+                mc_number=mc_number,
+                is_valid=False,
+                details={
+                    "error": CARRIER_NOT_FOUND,
+                    "raw_response": data,
+                },
+            )
+
+        # Content exists, parse carrier info according to FMCSA API documentation
+        # See: https://mobile.fmcsa.dot.gov/QCDevsite/docs/apiElements
+        if isinstance(content, dict):
+            carrier_info = content
+        else:
+            carrier_info = {}
+
+        # Determine operating status from FMCSA fields
+        # allowToOperate: Y or N, outOfService: Y or N
+        allow_to_operate = carrier_info.get("allowToOperate", "").upper()
+        out_of_service = carrier_info.get("outOfService", "").upper()
+
+        if out_of_service == "Y":
+            operating_status = "OUT_OF_SERVICE"
+        elif allow_to_operate == "Y":
+            operating_status = "ACTIVE"
+        elif allow_to_operate == "N":
+            operating_status = "NOT_ALLOWED"
+        else:
+            operating_status = "UNKNOWN"
+
+        return FMCSAVerifyResponse(
+            mc_number=mc_number,
+            is_valid=True,
+            carrier_name=carrier_info.get("legalName") or carrier_info.get("dbaName"),
+            operating_status=operating_status,
+            details=data,
+        )
+    elif response.status_code == 404:
+        return FMCSAVerifyResponse(
+            mc_number=mc_number,
+            is_valid=False,
+            details={"error": MC_NOT_FOUND},
+        )
+    else:
+        # API error, but still return response
+        return FMCSAVerifyResponse(
+            mc_number=mc_number,
+            is_valid=False,
+            details={
+                "error": f"FMCSA API returned status {response.status_code}",
+                "message": (
+                    response.text[:200]
+                    if hasattr(response, "text")
+                    else "Unknown error"
+                ),
+            },
+        )
@@ -0,0 +1,156 @@
+"""
+Prometheus metrics: request latency, in-flight requests, admission control
+queueing and shedding, retriever stage timings and FMCSA upstream latency.
+
+Exposed in the text exposition format at ``/metrics/prometheus``.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Spans fast cached reads through cold hybrid searches and FMCSA timeouts
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Admitted requests currently running, by priority class.",
+    ["priority_class"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for a slot, by priority class.",
+    ["priority_class"],
+)
+ADMISSION_QUEUE_DURATION = Histogram(
+    "admission_queue_duration_seconds",
+    "Time requests waited for a slot before being admitted.",
+    ["priority_class"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 by admission control.",
+    ["priority_class", "reason"],
+)
+
+RETRIEVER_STAGE_DURATION = Histogram(
+    "retriever_stage_duration_seconds",
+    "Time spent in each stage of hybrid load retrieval.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+FMCSA_UPSTREAM_DURATION = Histogram(
+    "fmcsa_upstream_request_duration_seconds",
+    "Latency of requests to the FMCSA API.",
+    buckets=LATENCY_BUCKETS,
+)
+FMCSA_UPSTREAM_ERRORS = Counter(
+    "fmcsa_upstream_errors_total",
+    "FMCSA requests that failed or returned an error response.",
+)
+FMCSA_CIRCUIT_OPEN = Gauge(
+    "fmcsa_circuit_open",
+    "1 while the FMCSA circuit breaker is open or half-open, else 0.",
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@contextmanager
+def retriever_stage(stage: str):
+    """Time one retriever stage into ``retriever_stage_duration_seconds``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        RETRIEVER_STAGE_DURATION.labels(stage).observe(time.perf_counter() - start)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The matched route's full path template, e.g. ``/api/v1/loads/{load_id}``.
+
+    Routes from included routers may only know their path relative to the
+    router prefix, so the prefix is recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+
+    params = {k: str(v) for k, v in scope.get("path_params", {}).items()}
+    try:
+        concrete = path_format.format(**params)
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = scope["path"]
+    if concrete and path.endswith(concrete):
+        return path[: len(path) - len(concrete)] + path_format
+    return path_format
+
+
+class PrometheusMiddleware:
+    """
+    Record latency per route template and the number of in-flight requests.
+
+    Routes are labelled by their template (``/api/v1/loads/{load_id}``), never
+    the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method, route_template(scope), str(status)
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,390 @@
+"""
+Materialized rate statistics per lane and equipment type.
+
+For every origin → destination × equipment lane the ``lane_stats`` table holds
+three rate series: what loads booked for (``Call.final_rate``), carriers'
+opening asks (``Call.initial_rate``) and every negotiation offer
+(``Negotiation.rate``). Each series keeps a count, a mean and a DDSketch for
+percentiles, for the rate itself and per loaded mile.
+
+The call write queue applies the changes from each batch inside the batch's
+own transaction, then publishes the new summaries to an in-memory store, so a
+lookup during a call is a dict access rather than a scan of call history.
+Stats follow the lane of the load at the time of the write; after editing
+loads' origin, destination, equipment or miles, rebuild them from history.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Call, LaneStat, Load, Negotiation
+from app.sketches import DDSketch
+
+logger = logging.getLogger(__name__)
+
+BOOKED = "booked"
+INITIAL = "initial"
+OFFERS = "offers"
+SERIES = (BOOKED, INITIAL, OFFERS)
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+def lane_key(origin: str, destination: str, equipment_type: str) -> str:
+    """Case- and whitespace-insensitive key for a lane."""
+    return "|".join(
+        part.strip().casefold() for part in (origin, destination, equipment_type)
+    )
+
+
+@dataclass(frozen=True)
+class Lane:
+    origin: str
+    destination: str
+    equipment_type: str
+    miles: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        return lane_key(self.origin, self.destination, self.equipment_type)
+
+
+class RateDistribution:
+    """Count, mean and percentile sketch of a set of values."""
+
+    def __init__(self, sketch: DDSketch, total: float = 0.0):
+        self.sketch = sketch
+        self.total = total
+
+    @property
+    def count(self) -> int:
+        return self.sketch.count
+
+    def add(self, value: float):
+        self.sketch.add(value)
+        self.total += value
+
+    def remove(self, value: float) -> bool:
+        if not self.sketch.remove(value):
+            return False
+        self.total = self.total - value if self.count else 0.0
+        return True
+
+    def summary(self, digits: int) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0, "mean": None, "percentiles": None}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, digits),
+            "percentiles": {
+                f"p{p}": round(self.sketch.quantile(p / 100), digits)
+                for p in PERCENTILES
+            },
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RateDistribution":
+        return cls(DDSketch.from_dict(data["sketch"]), data["total"])
+
+
+class RateSeries:
+    """One rate series of a lane, both absolute and per loaded mile."""
+
+    def __init__(self, rates: RateDistribution, per_mile: RateDistribution):
+        self.rates = rates
+        self.per_mile = per_mile
+
+    @classmethod
+    def empty(cls, relative_accuracy: float) -> "RateSeries":
+        return cls(
+            RateDistribution(DDSketch(relative_accuracy)),
+            RateDistribution(DDSketch(relative_accuracy)),
+        )
+
+    def add(self, rate: float, miles: Optional[float]):
+        self.rates.add(rate)
+        if miles:
+            self.per_mile.add(rate / miles)
+
+    def remove(self, rate: float, miles: Optional[float]) -> bool:
+        if not self.rates.remove(rate):
+            return False
+        if miles:
+            self.per_mile.remove(rate / miles)
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        return {**self.rates.summary(2), "per_mile": self.per_mile.summary(3)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rates": self.rates.to_dict(), "per_mile": self.per_mile.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RateSeries":
+        return cls(
+            RateDistribution.from_dict(data["rates"]),
+            RateDistribution.from_dict(data["per_mile"]),
+        )
+
+
+class LaneStats:
+    """All rate series for one lane."""
+
+    def __init__(
+        self,
+        lane: Lane,
+        series: Dict[str, RateSeries],
+        updated_at: Optional[datetime] = None,
+    ):
+        self.lane = lane
+        self.series = series
+        self.updated_at = updated_at
+
+    @classmethod
+    def empty(cls, lane: Lane, relative_accuracy: float) -> "LaneStats":
+        return cls(lane, {name: RateSeries.empty(relative_accuracy) for name in SERIES})
+
+    @classmethod
+    def from_row(cls, row: LaneStat) -> "LaneStats":
+        lane = Lane(row.origin, row.destination, row.equipment_type)
+        series = {name: RateSeries.from_dict(data) for name, data in row.stats.items()}
+        return cls(lane, series, row.updated_at)
+
+    def add(self, series: str, rate: float, miles: Optional[float]):
+        self.series[series].add(rate, miles)
+
+    def remove(self, series: str, rate: float, miles: Optional[float]) -> bool:
+        return self.series[series].remove(rate, miles)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "origin": self.lane.origin,
+            "destination": self.lane.destination,
+            "equipment_type": self.lane.equipment_type,
+            "updated_at": self.updated_at,
+            **{name: series.summary() for name, series in self.series.items()},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: series.to_dict() for name, series in self.series.items()}
+
+    def to_row(self) -> LaneStat:
+        return LaneStat(
+            lane_key=self.lane.key,
+            origin=self.lane.origin,
+            destination=self.lane.destination,
+            equipment_type=self.lane.equipment_type,
+            stats=self.to_dict(),
+            updated_at=self.updated_at,
+        )
+
+
+class LaneDeltas:
+    """Rate additions and removals collected while applying a write batch."""
+
+    def __init__(self):
+        self.changes: List[Tuple[str, str, float, int]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def add(self, load_id: Optional[str], series: str, rate: Optional[float]):
+        self._record(load_id, series, rate, 1)
+
+    def remove(self, load_id: Optional[str], series: str, rate: Optional[float]):
+        self._record(load_id, series, rate, -1)
+
+    def _record(self, load_id, series, rate, sign):
+        if load_id is None or rate is None or rate < 0:
+            return
+        self.changes.append((load_id, series, rate, sign))
+
+    def record_calls(
+        self,
+        db: Session,
+        changes: List[Tuple[Call, Optional[Tuple[Optional[str], Any, Any]]]],
+    ):
+        """
+        Record rate changes for upserted calls.
+
+        ``changes`` pairs each call, after its fields were applied, with its
+        ``(load_id, initial_rate, final_rate)`` beforehand, or None if new.
+        A call that moves to a different load takes its recorded negotiation
+        offers with it.
+        """
+        moved: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        for call, previous in changes:
+            old_load, old_initial, old_final = previous or (None, None, None)
+            for series, old_rate, new_rate in (
+                (INITIAL, old_initial, call.initial_rate),
+                (BOOKED, old_final, call.final_rate),
+            ):
+                if (old_load, old_rate) != (call.load_id, new_rate):
+                    self.remove(old_load, series, old_rate)
+                    self.add(call.load_id, series, new_rate)
+            if previous is not None and old_load != call.load_id:
+                moved[call.id] = (old_load, call.load_id)
+
+        if moved:
+            offers = db.query(Negotiation.call_id, Negotiation.rate).filter(
+                Negotiation.call_id.in_(moved)
+            )
+            for call_pk, rate in offers:
+                old_load, new_load = moved[call_pk]
+                self.remove(old_load, OFFERS, rate)
+                self.add(new_load, OFFERS, rate)
+
+
+class LaneStatsStore:
+    """
+    In-memory, ready-to-serve summaries of the ``lane_stats`` table.
+
+    Summaries are only replaced after the transaction that wrote them has
+    committed, so readers never see stats the database does not hold.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def get(
+        self, origin: str, destination: str, equipment_type: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._summaries.get(lane_key(origin, destination, equipment_type))
+
+    def load(self, db: Session) -> int:
+        """Load every materialized lane; returns the number of lanes."""
+        self._summaries = {
+            row.lane_key: LaneStats.from_row(row).summary()
+            for row in db.query(LaneStat)
+        }
+        return len(self._summaries)
+
+    def publish(self, stats: Dict[str, LaneStats]):
+        """Expose lanes written by a committed transaction."""
+        for key, lane_stats in stats.items():
+            self._summaries[key] = lane_stats.summary()
+
+    def apply(self, db: Session, deltas: LaneDeltas) -> Dict[str, LaneStats]:
+        """
+        Apply ``deltas`` to the ``lane_stats`` rows in ``db``'s transaction.
+
+        The caller commits, then passes the result to ``publish``.
+        """
+        if not deltas:
+            return {}
+
+        load_ids = {load_id for load_id, *_ in deltas.changes}
+        lanes = {
+            row.load_id: Lane(
+                row.origin, row.destination, row.equipment_type, row.miles
+            )
+            for row in db.query(
+                Load.load_id,
+                Load.origin,
+                Load.destination,
+                Load.equipment_type,
+                Load.miles,
+            ).filter(Load.load_id.in_(load_ids))
+        }
+        keys = {lane.key for lane in lanes.values()}
+        rows = {
+            row.lane_key: row
+            for row in db.query(LaneStat).filter(LaneStat.lane_key.in_(keys))
+        }
+
+        stats: Dict[str, LaneStats] = {}
+        for load_id, series, rate, sign in deltas.changes:
+            lane = lanes.get(load_id)
+            if lane is None:
+                continue
+            lane_stats = stats.get(lane.key)
+            if lane_stats is None:
+                row = rows.get(lane.key)
+                lane_stats = (
+                    LaneStats.from_row(row)
+                    if row is not None
+                    else LaneStats.empty(lane, self.relative_accuracy)
+                )
+                stats[lane.key] = lane_stats
+            if sign > 0:
+                lane_stats.add(series, rate, lane.miles)
+            elif not lane_stats.remove(series, rate, lane.miles):
+                logger.warning(
+                    "Lane stats for %s have no %s rate %s to remove; "
+                    "rebuild them if loads were edited",
+                    lane.key,
+                    series,
+                    rate,
+                )
+
+        now = datetime.now(timezone.utc)
+        for key, lane_stats in stats.items():
+            lane_stats.updated_at = now
+            row = rows.get(key)
+            if row is None:
+                db.add(lane_stats.to_row())
+            else:
+                row.stats = lane_stats.to_dict()
+                row.updated_at = now
+        return stats
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every lane from call and negotiation history, replacing the
+        table and the in-memory summaries. Returns the number of lanes.
+        """
+        stats: Dict[str, LaneStats] = {}
+
+        def record(row, series: str, rate: Optional[float]):
+            if rate is None or rate < 0:
+                return
+            lane = Lane(row.origin, row.destination, row.equipment_type, row.miles)
+            lane_stats = stats.get(lane.key)
+            if lane_stats is None:
+                lane_stats = stats[lane.key] = LaneStats.empty(
+                    lane, self.relative_accuracy
+                )
+            lane_stats.add(series, rate, lane.miles)
+
+        lane_columns = (Load.origin, Load.destination, Load.equipment_type, Load.miles)
+        calls = db.query(Call.initial_rate, Call.final_rate, *lane_columns).join(
+            Load, Call.load_id == Load.load_id
+        )
+        for row in calls.yield_per(1000):
+            record(row, INITIAL, row.initial_rate)
+            record(row, BOOKED, row.final_rate)
+
+        offers = (
+            db.query(Negotiation.rate, *lane_columns)
+            .join(Call, Negotiation.call_id == Call.id)
+            .join(Load, Call.load_id == Load.load_id)
+        )
+        for row in offers.yield_per(1000):
+            record(row, OFFERS, row.rate)
+
+        now = datetime.now(timezone.utc)
+        db.query(LaneStat).delete()
+        for lane_stats in stats.values():
+            lane_stats.updated_at = now
+            db.add(lane_stats.to_row())
+        db.commit()
+
+        self._summaries = {key: s.summary() for key, s in stats.items()}
+        return len(stats)
+
+
+lane_stats = LaneStatsStore(settings.LANE_STATS_RELATIVE_ACCURACY)
@@ -0,0 +1,103 @@
+"""
+SQLite FTS5 index over load text for the ``fts5`` lexical search engine.
+
+``loads_fts`` is an external-content FTS5 table over the retriever's text
+fields: it stores only the inverted index and reads text from ``loads`` by
+rowid. Triggers keep it in step with every insert, upsert, update and delete,
+so nothing is rebuilt in memory when a worker starts.
+
+Search runs ``bm25()`` ranking and the structured filters in one query and
+returns only the best candidates, which are then fused with embedding
+similarity by ``FTS5LoadRetriever``.
+
+``loads`` has no INTEGER PRIMARY KEY, so ``VACUUM`` may renumber its rowids;
+run ``rebuild_load_fts`` after vacuuming.
+"""
+
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import Select, column, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Engine
+
+from app.retrievers import DEFAULT_TEXT_FIELDS
+
+BM25 = "bm25"
+FTS5 = "fts5"
+
+FTS_TABLE = "loads_fts"
+
+TERM = re.compile(r"\w+")
+
+loads_fts = table(FTS_TABLE, column("rowid"))
+
+
+def fts_ddl(text_fields: List[str]) -> List[str]:
+    fields = ", ".join(text_fields)
+    new = ", ".join(f"new.{f}" for f in text_fields)
+    old = ", ".join(f"old.{f}" for f in text_fields)
+    delete_old = (
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {fields}) "
+        f"VALUES ('delete', old.rowid, {old});"
+    )
+    insert_new = f"INSERT INTO {FTS_TABLE}(rowid, {fields}) VALUES (new.rowid, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({fields}, "
+        "content='loads', content_rowid='rowid', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON loads "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON loads "
+        f"BEGIN {delete_old} END",
+        # Only text edits touch the index; availability flips do not
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {fields} "
+        f"ON loads BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_load_fts(engine: Engine, text_fields: List[str] = None) -> bool:
+    """
+    Create the FTS5 table and its triggers if missing, indexing existing
+    loads once. Returns True if the index was created. No-op off SQLite.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    created = not inspect(engine).has_table(FTS_TABLE)
+    with engine.begin() as conn:
+        for statement in fts_ddl(text_fields or DEFAULT_TEXT_FIELDS):
+            conn.execute(text(statement))
+        if created:
+            conn.execute(
+                text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            )
+    return created
+
+
+def rebuild_load_fts(engine: Engine):
+    """Reindex every load from the ``loads`` table."""
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def match_expression(query_dict: Dict[str, Any]) -> str:
+    """
+    An FTS5 query matching any word of the search values in any field, like
+    the in-memory BM25 engine; words are quoted so user input is never parsed
+    as query syntax.
+    """
+    query_text = " ".join(str(v) for v in query_dict.values() if v)
+    terms = dict.fromkeys(term.lower() for term in TERM.findall(query_text))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def candidates_query(query: Select, match: str, limit: int) -> Select:
+    """
+    Extend a ``select`` over ``loads`` (with its filters) to the ``limit``
+    best bm25 matches, adding a higher-is-better ``bm25`` column.
+    """
+    return (
+        query.add_columns((-func.bm25(literal_column(FTS_TABLE))).label(BM25))
+        .join(loads_fts, loads_fts.c.rowid == literal_column("loads.rowid"))
+        .where(literal_column(FTS_TABLE).op("MATCH")(match))
+        .order_by(func.bm25(literal_column(FTS_TABLE)))
+        .limit(limit)
+    )
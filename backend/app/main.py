@@ -2,21 +2,89 @@
 Main FastAPI application for Inbound Carrier Sales Automation.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from app.database import init_db
-from app.routers import loads, fmcsa, metrics
+from app.admission import AdmissionMiddleware
+from app.carrier_cache import CarrierVerificationCache
+from app.carrier_profiles import carrier_profiles
+from app.database import AsyncSessionLocal, SessionLocal, dispose_engines, init_db
+from app.routers import (
+    loads,
+    fmcsa,
+    metrics,
+    calls,
+    carriers,
+    webhooks,
+    admin,
+    saved_searches,
+)
 from app.config import settings
+from app.circuit_breaker import CLOSED, LatencyWindow
+from app.fmcsa_client import (
+    FMCSAUpstream,
+    create_circuit_breaker,
+    create_fmcsa_client,
+    create_rate_limiter,
+)
+from app.instrumentation import FMCSA_CIRCUIT_OPEN, PrometheusMiddleware
+from app.lane_stats import lane_stats
+from app.profiling import ProfilingMiddleware, profile_store
+from app.saved_searches import saved_search_index, search_notifier
+from app.write_queue import CallWriteQueue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """
+    Initialize the database, FMCSA client and cache, and call write queue
+    with the lane stats and carrier profiles it maintains, and load the
+    saved search index.
+    """
     init_db()
+    with SessionLocal() as db:
+        saved_search_index.load(db)
+
+    app.state.fmcsa_client = create_fmcsa_client()
+    app.state.fmcsa_upstream = FMCSAUpstream(
+        app.state.fmcsa_client,
+        rate_limiter=create_rate_limiter(),
+        breaker=create_circuit_breaker(),
+        latency=LatencyWindow(settings.FMCSA_LATENCY_WINDOW),
+    )
+    breaker = app.state.fmcsa_upstream.breaker
+    FMCSA_CIRCUIT_OPEN.set_function(lambda: float(breaker.state != CLOSED))
+    app.state.carrier_cache = CarrierVerificationCache(
+        fetch=app.state.fmcsa_upstream.fetch,
+        session_factory=AsyncSessionLocal,
+        ttl=settings.FMCSA_CACHE_TTL_SECONDS,
+        negative_ttl=settings.FMCSA_NEGATIVE_CACHE_TTL_SECONDS,
+        stale_ttl=settings.FMCSA_CACHE_STALE_SECONDS,
+        max_entries=settings.FMCSA_CACHE_MAX_ENTRIES,
+    )
+
+    app.state.write_queue = CallWriteQueue(
+        SessionLocal,
+        max_size=settings.WRITE_QUEUE_MAX_SIZE,
+        batch_size=settings.WRITE_QUEUE_BATCH_SIZE,
+        flush_interval=settings.WRITE_QUEUE_FLUSH_INTERVAL_MS / 1000,
+        lane_stats=lane_stats,
+        carrier_profiles=carrier_profiles,
+        transcript_codec=settings.TRANSCRIPT_CODEC,
+    )
+    app.state.write_queue.materialize()
+    app.state.write_queue.start()
+
     yield
 
+    await app.state.write_queue.stop()
+    await search_notifier.aclose()
+    await app.state.carrier_cache.close()
+    await app.state.fmcsa_client.aclose()
+    await dispose_engines()
+
 
 app = FastAPI(
     title="Inbound Carrier Sales API",
@@ -25,6 +93,11 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Admission control between live-call and dashboard traffic; added before
+# CORS so shed 503s still carry CORS headers
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware, classes=settings.ADMISSION_CLASSES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -34,10 +107,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and in-flight metrics, exported at /metrics/prometheus
+if settings.PROMETHEUS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
+# Opt-in sampling profiler for requests with a signed X-Profile header
+if settings.PROFILING_ENABLED and settings.PROFILING_SECRET:
+    app.add_middleware(
+        ProfilingMiddleware,
+        secret=settings.PROFILING_SECRET,
+        store=profile_store,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+        max_age=settings.PROFILING_SIGNATURE_MAX_AGE_SECONDS,
+    )
+
 # Include routers
 app.include_router(loads.router, prefix="/api/v1/loads", tags=["loads"])
 app.include_router(fmcsa.router, prefix="/api/v1/fmcsa", tags=["fmcsa"])
 app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
+app.include_router(calls.router, prefix="/api/v1/calls", tags=["calls"])
+app.include_router(carriers.router, prefix="/api/v1/carriers", tags=["carriers"])
+app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["webhooks"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+app.include_router(
+    saved_searches.router, prefix="/api/v1/saved-searches", tags=["saved-searches"]
+)
 
 
 @app.get("/")
@@ -54,3 +148,9 @@ async def health():
         "service": "inbound-carrier-sales-api",
         "version": "0.1.0",
     }
+
+
+@app.get("/metrics/prometheus", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, retrieval and FMCSA metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
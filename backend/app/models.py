@@ -1,10 +1,10 @@
 """
 SQLAlchemy database models.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, JSON, LargeBinary, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, sqlite_has_fts5
 
 
 class Load(Base):
@@ -52,7 +52,7 @@ class Call(Base):
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
-    transcript = Column(Text)
+    # Transcripts are stored compressed in call_transcripts
     
     # Classification
     outcome = Column(String)  # "accepted", "rejected", "transferred", "no_match", etc.
@@ -89,3 +89,98 @@ class Negotiation(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+
+class CallTranscript(Base):
+    """Compressed call transcript, kept out of the calls table."""
+
+    __tablename__ = "call_transcripts"
+
+    call_id = Column(Integer, ForeignKey("calls.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)  # "zlib" or "zstd"
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed length in characters
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Contentless FTS5 index over transcripts, rowid = calls.id (see app/transcripts.py).
+# Skipped when SQLite was built without FTS5; transcript search is then disabled.
+event.listen(
+    CallTranscript.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS call_transcripts_fts "
+        "USING fts5(body, content='', tokenize='porter unicode61')"
+    ).execute_if(dialect="sqlite", callable_=lambda *args, **kw: sqlite_has_fts5()),
+)
+event.listen(
+    CallTranscript.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS call_transcripts_fts").execute_if(dialect="sqlite"),
+)
+
+
+class CarrierVerification(Base):
+    """Cached FMCSA verification result, persisted so it survives restarts."""
+
+    __tablename__ = "carrier_verifications"
+
+    mc_number = Column(String, primary_key=True)
+    is_valid = Column(Boolean, nullable=False)
+    carrier_name = Column(String)
+    operating_status = Column(String)
+    details = Column(JSON)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class CarrierProfile(Base):
+    """Running call and negotiation totals for one carrier."""
+
+    __tablename__ = "carrier_profiles"
+
+    mc_number = Column(String, primary_key=True)
+    carrier_name = Column(String)
+    total_calls = Column(Integer, nullable=False, default=0)
+    accepted_calls = Column(Integer, nullable=False, default=0)
+    calls_by_outcome = Column(JSON, nullable=False, default=dict)
+    negotiation_rounds_total = Column(Integer, nullable=False, default=0)
+    # Calls with a final rate on a known load, and the sum of their discounts
+    # off loadboard_rate as a fraction
+    rated_calls = Column(Integer, nullable=False, default=0)
+    discount_total = Column(Float, nullable=False, default=0.0)
+    last_call_id = Column(String)
+    last_call_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+
+
+class LaneStat(Base):
+    """Materialized rate statistics for one lane and equipment type."""
+
+    __tablename__ = "lane_stats"
+
+    lane_key = Column(String, primary_key=True)  # normalized origin|destination|equipment
+    origin = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
+    equipment_type = Column(String, nullable=False)
+    stats = Column(JSON, nullable=False)  # serialized rate series and sketches
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class SavedSearch(Base):
+    """Standing load search; new loads that match are pushed to subscribers."""
+
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    origin = Column(String)
+    destination = Column(String)
+    equipment_type = Column(String)
+    commodity_type = Column(String)
+    min_rate = Column(Float)
+    max_rate = Column(Float)
+    min_rate_per_mile = Column(Float)
+    callback_url = Column(String)  # Matches are POSTed here, if set
+    callback_secret = Column(String)  # Sent back as X-Webhook-Secret
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
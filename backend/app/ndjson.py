@@ -0,0 +1,59 @@
+"""
+Helpers for bulk endpoints that accept a JSON array or an NDJSON stream.
+"""
+
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, Request
+
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+)
+
+
+def is_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    return content_type in NDJSON_CONTENT_TYPES
+
+
+async def read_bulk_rows(request: Request, key: str) -> List[Any]:
+    """
+    Read rows from the request body.
+
+    Accepts an NDJSON stream, a JSON array, or a JSON object holding the array
+    under ``key``. NDJSON lines that fail to parse are returned as
+    ``ValueError`` instances so callers can report them per row.
+    """
+    if is_ndjson(request):
+        rows: List[Any] = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            rows.extend(parse_ndjson_line(line) for line in lines if line.strip())
+        if buffer.strip():
+            rows.append(parse_ndjson_line(buffer))
+        return rows
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if isinstance(body, dict) and isinstance(body.get(key), list):
+        body = body[key]
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Expected a JSON array of {key} or an NDJSON stream",
+        )
+    return body
+
+
+def parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
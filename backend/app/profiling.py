@@ -0,0 +1,229 @@
+"""
+On-demand request profiling.
+
+With PROFILING_ENABLED and a PROFILING_SECRET set, a request carrying a valid
+``X-Profile`` header runs under pyinstrument's sampling profiler. The
+speedscope output is kept in a bounded in-memory store keyed by request id,
+returned to the caller in ``X-Profile-Id``, and served by the admin API.
+
+The header value is ``<unix timestamp>.<signature>``, where the signature is
+the hex HMAC-SHA256 of ``"<timestamp>:<METHOD>:<path>"`` under the secret,
+with ``?<query>`` appended to the path when the request has a query string
+(raw, exactly as sent). A signature only profiles the one request it was made
+for, only once, and expires after PROFILING_SIGNATURE_MAX_AGE_SECONDS; used
+signatures are remembered until then so a replayed header is served normally.
+
+pyinstrument samples only the thread it starts on. Work offloaded with this
+module's ``run_in_threadpool`` is profiled in its worker thread too, and the
+sessions are combined before rendering. One request is profiled at a time;
+a signed request arriving while another is being profiled is served normally.
+"""
+
+import functools
+import hashlib
+import hmac
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from fastapi.concurrency import run_in_threadpool as starlette_run_in_threadpool
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from pyinstrument.session import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+T = TypeVar("T")
+
+
+@dataclass
+class ActiveProfile:
+    """Set for the duration of a profiled request."""
+
+    interval: float
+    thread_sessions: List[Session] = field(default_factory=list)
+
+
+active_profile: ContextVar[Optional[ActiveProfile]] = ContextVar(
+    "active_profile", default=None
+)
+
+
+def sign(secret: str, timestamp: int, method: str, path: str, query: str = "") -> str:
+    target = f"{path}?{query}" if query else path
+    message = f"{timestamp}:{method.upper()}:{target}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def profile_header(secret: str, method: str, path: str, query: str = "") -> str:
+    """Build an ``X-Profile`` header value, e.g. for scripts and tests."""
+    timestamp = int(time.time())
+    return f"{timestamp}.{sign(secret, timestamp, method, path, query)}"
+
+
+def verify_signature(
+    secret: str, value: str, method: str, path: str, max_age: float, query: str = ""
+) -> bool:
+    try:
+        timestamp_text, signature = value.split(".", 1)
+        timestamp = int(timestamp_text)
+    except ValueError:
+        return False
+    if abs(time.time() - timestamp) > max_age:
+        return False
+    expected = sign(secret, timestamp, method, path, query)
+    return hmac.compare_digest(signature, expected)
+
+
+class ProfileStore:
+    """The most recent ``size`` profiles, oldest evicted first."""
+
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]):
+        self._profiles[profile["request_id"]] = profile
+        while len(self._profiles) > self.size:
+            self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(request_id)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Profile summaries (without the speedscope body), newest first."""
+        summaries = [
+            {k: v for k, v in p.items() if k != "speedscope"}
+            for p in reversed(self._profiles.values())
+        ]
+        return summaries[:limit] if limit else summaries
+
+    def clear(self):
+        self._profiles.clear()
+
+
+def profiled(func: Callable[..., T]) -> Callable[..., T]:
+    """Wrap a function run in a worker thread so it joins the request's profile."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = active_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        profiler = Profiler(interval=profile.interval, async_mode="disabled")
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.thread_sessions.append(profiler.stop())
+
+    return wrapper
+
+
+async def run_in_threadpool(func: Callable[..., T], *args, **kwargs) -> T:
+    """``fastapi.concurrency.run_in_threadpool`` that is visible to profiles."""
+    return await starlette_run_in_threadpool(profiled(func), *args, **kwargs)
+
+
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry a valid signed ``X-Profile`` header."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret: str,
+        store: ProfileStore,
+        interval: float = 0.001,
+        max_age: float = 300.0,
+    ):
+        self.app = app
+        self.secret = secret
+        self.store = store
+        self.interval = interval
+        self.max_age = max_age
+        self.running = False
+        # Signatures already used to profile, with when they expire
+        self._used: Dict[str, float] = {}
+
+    def should_profile(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or not self.secret or self.running:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                return self.claim(
+                    value.decode("latin-1"),
+                    scope["method"],
+                    scope["path"],
+                    scope.get("query_string", b"").decode("latin-1"),
+                )
+        return False
+
+    def claim(self, value: str, method: str, path: str, query: str) -> bool:
+        """Accept a valid header value the first time it is seen."""
+        if not verify_signature(self.secret, value, method, path, self.max_age, query):
+            return False
+        # Keyed by signature: "0123.<sig>" and "123.<sig>" are the same header
+        timestamp_text, signature = value.split(".", 1)
+        now = time.time()
+        self._used = {s: until for s, until in self._used.items() if until >= now}
+        if signature in self._used:
+            return False
+        self._used[signature] = int(timestamp_text) + self.max_age
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_profile_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self.running = True
+        profile = ActiveProfile(self.interval)
+        token = active_profile.set(profile)
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session = profiler.stop()
+            duration = time.perf_counter() - start
+            active_profile.reset(token)
+            self.running = False
+            for thread_session in profile.thread_sessions:
+                session = Session.combine(session, thread_session)
+            self.store.add(
+                {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 3),
+                    "recorded_at": datetime.now(timezone.utc),
+                    "thread_sessions": len(profile.thread_sessions),
+                    "speedscope": SpeedscopeRenderer().render(session),
+                }
+            )
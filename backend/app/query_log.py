@@ -0,0 +1,115 @@
+"""
+Slow-query log with EXPLAIN QUERY PLAN capture.
+
+Engine event hooks time every statement. Statements slower than the
+configured threshold are kept in a bounded ring buffer, together with their
+parameters and, on SQLite, the query plan, so full table scans show up as
+soon as they get slow.
+"""
+
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+MAX_PARAMETERS_LENGTH = 500
+
+
+def is_full_scan(detail: str) -> bool:
+    """True for plan steps that read a whole table rather than an index range."""
+    return detail.startswith("SCAN ") and "USING" not in detail
+
+
+class SlowQueryLog:
+    """Ring buffer of statements that exceeded ``threshold_ms``."""
+
+    def __init__(self, threshold_ms: float = 100.0, size: int = 200, explain=True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.entries: deque = deque(maxlen=size)
+        self.statements = 0
+        self.slow_statements = 0
+
+    def install(self, engine: Engine, name: str):
+        """Attach timing hooks to a (sync) engine."""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(
+            engine,
+            "after_cursor_execute",
+            lambda *args: self._after_execute(name, *args),
+        )
+        event.listen(engine, "handle_error", self._on_error)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent slow statements first."""
+        entries = list(reversed(self.entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        self.entries.clear()
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if conn.info.get("explaining"):
+            return
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(
+        self, name, conn, cursor, statement, parameters, context, executemany
+    ):
+        if conn.info.get("explaining"):
+            return
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        self.statements += 1
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        self.slow_statements += 1
+        plan = None
+        if (
+            self.explain
+            and not executemany
+            and conn.dialect.name == "sqlite"
+            and statement.lstrip().upper().startswith(EXPLAINABLE)
+        ):
+            plan = self._explain(conn, statement, parameters)
+
+        if executemany:
+            params = f"<executemany: {len(parameters)} parameter sets>"
+        else:
+            params = repr(parameters)[:MAX_PARAMETERS_LENGTH]
+
+        self.entries.append(
+            {
+                "recorded_at": datetime.now(timezone.utc),
+                "engine": name,
+                "duration_ms": round(elapsed_ms, 3),
+                "statement": statement,
+                "parameters": params,
+                "executemany": executemany,
+                "plan": plan,
+                "full_scan": any(is_full_scan(step) for step in plan or []),
+            }
+        )
+
+    def _on_error(self, context):
+        conn = context.connection
+        if conn is None or conn.info.get("explaining"):
+            return
+        if conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    def _explain(self, conn, statement, parameters) -> Optional[List[str]]:
+        conn.info["explaining"] = True
+        try:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in rows]
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            conn.info["explaining"] = False
@@ -0,0 +1,51 @@
+"""
+Token-bucket rate limiter for upstream APIs.
+"""
+
+import asyncio
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens per second, holding at most ``burst``.
+
+    ``acquire`` waits until a token is available. Waiters are served in
+    arrival order, so one caller cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting; False if the bucket is empty."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait for and take one token."""
+        # The lock queues waiters fairly; only the head of the queue sleeps
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self.tokens) / self.rate)
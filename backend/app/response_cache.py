@@ -0,0 +1,127 @@
+"""
+ETags and an in-process response cache for load reads.
+
+Every load write bumps a load-board version counter. ETags are derived from
+that version plus the request's cache key, so they are strong validators
+without hashing response bodies: ``If-None-Match`` can be answered with 304
+before touching the database, and cached bodies from an older version are
+never served.
+
+The counter lives in this process, which matches the single-worker
+deployment. Writes made outside the API (e.g. the seed script) are picked up
+on restart, since the version also carries the process start time.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+HIT = "HIT"
+MISS = "MISS"
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """Serialized response bodies keyed by request, valid for one board version."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.epoch = format(int(time.time()), "x")
+        self.version = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        # Writes run in the threadpool, reads on the event loop
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self):
+        """Record a load write: every ETag changes and cached bodies are dropped."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def etag(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f'"{self.epoch}.{self.version}-{digest}"'
+
+    def get(self, key: str, etag: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.etag != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: str,
+        etag: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """Store a body under the ETag computed before it was read from the DB."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if etag != self.etag(key):
+                return  # A write landed while this response was being built
+            self._entries[key] = CachedResponse(etag, body, headers or {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    # If-None-Match uses the weak comparison
+    return "*" in candidates or etag in (c.removeprefix("W/") for c in candidates)
+
+
+def cache_headers(etag: str, cache_status: Optional[str] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if cache_status:
+        headers["X-Cache"] = cache_status
+    return headers
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def json_response(
+    body: bytes,
+    etag: str,
+    cache_status: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**cache_headers(etag, cache_status), **(headers or {})},
+    )
@@ -0,0 +1,23 @@
+"""
+orjson-based JSON serialization for list endpoints.
+
+List endpoints select plain columns into dicts and encode them here, skipping
+ORM hydration and per-row Pydantic validation.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# UTC datetimes as "Z", matching Pydantic's output for the same values
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
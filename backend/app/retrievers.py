@@ -1,7 +1,104 @@
+import threading
+from functools import lru_cache
+
 import numpy as np
 from rank_bm25 import BM25Okapi
 from sentence_transformers import SentenceTransformer, util
-from typing import List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple, Dict, Any
+
+from app.instrumentation import retriever_stage
+
+DEFAULT_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_TEXT_FIELDS = [
+    "origin",
+    "destination",
+    "equipment_type",
+    "commodity_type",
+    "notes",
+]
+
+
+@lru_cache(maxsize=None)
+def load_embed_model(embed_model: str) -> SentenceTransformer:
+    """Load a sentence-transformers model once per process."""
+    return SentenceTransformer(embed_model)
+
+
+def load_document(load: Any, text_fields: List[str]) -> str:
+    """Build the searchable text for a load object or row mapping."""
+    if isinstance(load, dict):
+        return " ".join(str(load.get(f) or "") for f in text_fields)
+    return " ".join(str(getattr(load, f, None) or "") for f in text_fields)
+
+
+def load_key(load: Any) -> Any:
+    return load.get("load_id") if isinstance(load, dict) else load.load_id
+
+
+class LoadEmbeddingIndex:
+    """
+    Process-wide cache of load embeddings keyed by ``load_id``.
+
+    An entry is reused as long as the load's document text is unchanged, so
+    searches only encode new or edited loads, and bulk ingestion can refresh
+    the whole batch with a single ``encode`` call.
+    """
+
+    def __init__(
+        self,
+        text_fields: List[str] = None,
+        embed_model: str = DEFAULT_EMBED_MODEL,
+    ):
+        self.text_fields = text_fields or DEFAULT_TEXT_FIELDS
+        self.embed_model = embed_model
+        self._entries: Dict[Any, Tuple[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, loads: Iterable[Any]):
+        """Encode every load whose document text changed, in one batch."""
+        loads = list(loads)
+        self.embed(
+            [load_key(x) for x in loads],
+            [load_document(x, self.text_fields) for x in loads],
+        )
+
+    def remove(self, load_ids: Iterable[Any]):
+        with self._lock:
+            for load_id in load_ids:
+                self._entries.pop(load_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def embed(self, keys: List[Any], documents: List[str]) -> np.ndarray:
+        """Return normalized embeddings for ``documents``, encoding only misses."""
+        with self._lock:
+            cached = [self._entries.get(key) for key in keys]
+
+        missing = {}
+        for key, doc, entry in zip(keys, documents, cached):
+            if entry is None or entry[0] != doc:
+                missing[key] = doc
+
+        if missing:
+            vectors = load_embed_model(self.embed_model).encode(
+                list(missing.values()), normalize_embeddings=True
+            )
+            fresh = dict(zip(missing, zip(missing.values(), vectors)))
+            with self._lock:
+                self._entries.update(fresh)
+            cached = [
+                fresh[key] if key in fresh else entry
+                for key, entry in zip(keys, cached)
+            ]
+
+        if not cached:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([entry[1] for entry in cached])
 
 
 class HybridLoadRetriever:
@@ -11,25 +108,25 @@ class HybridLoadRetriever:
         self,
         loads: List[Any],
         text_fields: List[str] = None,
-        embed_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        embed_model: str = DEFAULT_EMBED_MODEL,
+        embedding_index: LoadEmbeddingIndex = None,
     ):
         self.loads = loads
-        self.text_fields = text_fields or [
-            "origin",
-            "destination",
-            "equipment_type",
-            "commodity_type",
-            "notes",
-        ]
-
-        corpus = [
-            " ".join(str(getattr(x, f) or "") for f in self.text_fields) for x in loads
-        ]
-        tokenized_corpus = [doc.lower().split() for doc in corpus]
-        self.bm25 = BM25Okapi(tokenized_corpus)
-
-        self.model = SentenceTransformer(embed_model)
-        self.embeddings = self.model.encode(corpus, normalize_embeddings=True)
+        self.text_fields = text_fields or list(DEFAULT_TEXT_FIELDS)
+
+        with retriever_stage("bm25_index"):
+            corpus = [load_document(x, self.text_fields) for x in loads]
+            tokenized_corpus = [doc.lower().split() for doc in corpus]
+            self.bm25 = BM25Okapi(tokenized_corpus)
+
+        self.model = load_embed_model(embed_model)
+        with retriever_stage("corpus_embed"):
+            if embedding_index is not None:
+                self.embeddings = embedding_index.embed(
+                    [load_key(x) for x in loads], corpus
+                )
+            else:
+                self.embeddings = self.model.encode(corpus, normalize_embeddings=True)
 
     def search(
         self,
@@ -55,17 +152,83 @@ class HybridLoadRetriever:
         if not query_text.strip():
             return []
 
-        tokenized_query = query_text.lower().split()
+        with retriever_stage("tokenize"):
+            tokenized_query = query_text.lower().split()
+
+        with retriever_stage("bm25"):
+            bm25_scores = np.array(self.bm25.get_scores(tokenized_query))
+
+        with retriever_stage("encode"):
+            query_emb = self.model.encode([query_text], normalize_embeddings=True)
+
+        with retriever_stage("cosine"):
+            embed_scores = util.cos_sim(query_emb, self.embeddings)[0].cpu().numpy()
+
+        with retriever_stage("fusion"):
+            if bm25_scores.max() > 0:
+                bm25_scores = bm25_scores / bm25_scores.max()
+
+            scores = bm25_weight * bm25_scores + embed_weight * embed_scores
+            top_indices = np.argsort(scores)[::-1][:top_k]
+
+        return [(self.loads[i], float(scores[i])) for i in top_indices]
+
+
+class FTS5LoadRetriever:
+    """
+    Fuses candidates already ranked by SQLite FTS5 with embedding similarity.
+
+    Candidates are load rows carrying a higher-is-better ``bm25`` score from
+    the database, so nothing is indexed in memory and only the candidates'
+    embeddings are looked up.
+    """
+
+    def __init__(
+        self,
+        candidates: List[Dict[str, Any]],
+        text_fields: List[str] = None,
+        embed_model: str = DEFAULT_EMBED_MODEL,
+        embedding_index: LoadEmbeddingIndex = None,
+    ):
+        self.loads = candidates
+        self.text_fields = text_fields or list(DEFAULT_TEXT_FIELDS)
+        self.model = load_embed_model(embed_model)
+        # An empty shared index is falsy, so test for None explicitly
+        if embedding_index is None:
+            embedding_index = LoadEmbeddingIndex(self.text_fields, embed_model)
+        self.embedding_index = embedding_index
+
+    def search(
+        self,
+        query_dict: Dict[str, Any],
+        top_k: int = 5,
+        bm25_weight: float = 0.5,
+        embed_weight: float = 0.5,
+    ) -> List[Tuple[Any, float]]:
+        """Same contract and weights as ``HybridLoadRetriever.search``."""
+        query_text = " ".join(str(v) for v in query_dict.values() if v)
+
+        if not query_text.strip() or not self.loads:
+            return []
+
+        with retriever_stage("corpus_embed"):
+            embeddings = self.embedding_index.embed(
+                [load_key(x) for x in self.loads],
+                [load_document(x, self.text_fields) for x in self.loads],
+            )
 
-        bm25_scores = np.array(self.bm25.get_scores(tokenized_query))
+        with retriever_stage("encode"):
+            query_emb = self.model.encode([query_text], normalize_embeddings=True)
 
-        query_emb = self.model.encode([query_text], normalize_embeddings=True)
-        embed_scores = util.cos_sim(query_emb, self.embeddings)[0].cpu().numpy()
+        with retriever_stage("cosine"):
+            embed_scores = util.cos_sim(query_emb, embeddings)[0].cpu().numpy()
 
-        if bm25_scores.max() > 0:
-            bm25_scores = bm25_scores / bm25_scores.max()
+        with retriever_stage("fusion"):
+            bm25_scores = np.array([x["bm25"] for x in self.loads], dtype=np.float32)
+            if bm25_scores.max() > 0:
+                bm25_scores = bm25_scores / bm25_scores.max()
 
-        scores = bm25_weight * bm25_scores + embed_weight * embed_scores
-        top_indices = np.argsort(scores)[::-1][:top_k]
+            scores = bm25_weight * bm25_scores + embed_weight * embed_scores
+            top_indices = np.argsort(scores)[::-1][:top_k]
 
         return [(self.loads[i], float(scores[i])) for i in top_indices]
@@ -0,0 +1,109 @@
+"""
+Operational and diagnostics endpoints.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+
+from app.config import settings
+from app.database import slow_query_log
+from app.profiling import profile_store, run_in_threadpool
+from app.schemas import (
+    CarrierProfileRebuildResponse,
+    LaneStatsRebuildResponse,
+    ProfileListResponse,
+    SlowQueryLogResponse,
+)
+
+router = APIRouter()
+
+
+def verify_api_key(x_api_key: str = Header(...)):
+    """Verify API key from header."""
+    if x_api_key != settings.API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return x_api_key
+
+
+@router.get(
+    "/slow-queries",
+    response_model=SlowQueryLogResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def get_slow_queries(limit: Optional[int] = None):
+    """Recent statements over SLOW_QUERY_THRESHOLD_MS, newest first, with query plans."""
+    return SlowQueryLogResponse(
+        threshold_ms=slow_query_log.threshold_ms,
+        statements=slow_query_log.statements,
+        slow_statements=slow_query_log.slow_statements,
+        entries=slow_query_log.recent(limit),
+    )
+
+
+@router.delete("/slow-queries", dependencies=[Depends(verify_api_key)])
+async def clear_slow_queries():
+    """Empty the slow-query ring buffer."""
+    slow_query_log.clear()
+    return {"message": "Slow-query log cleared"}
+
+
+@router.get(
+    "/profiles",
+    response_model=ProfileListResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def list_profiles(limit: Optional[int] = None):
+    """Recently profiled requests, newest first."""
+    return ProfileListResponse(
+        enabled=settings.PROFILING_ENABLED and bool(settings.PROFILING_SECRET),
+        profiles=profile_store.recent(limit),
+    )
+
+
+@router.get("/profiles/{request_id}", dependencies=[Depends(verify_api_key)])
+async def get_profile(request_id: str):
+    """Speedscope JSON for one profiled request; open it at speedscope.app."""
+    profile = profile_store.get(request_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=profile["speedscope"],
+        media_type="application/json",
+        headers={
+            "Content-Disposition": f'attachment; filename="{request_id}.speedscope.json"'
+        },
+    )
+
+
+@router.delete("/profiles", dependencies=[Depends(verify_api_key)])
+async def clear_profiles():
+    """Drop all stored profiles."""
+    profile_store.clear()
+    return {"message": "Profiles cleared"}
+
+
+@router.post(
+    "/lane-stats/rebuild",
+    response_model=LaneStatsRebuildResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def rebuild_lane_stats(request: Request):
+    """Recompute lane rate statistics from full call history, e.g. after editing loads."""
+    write_queue = request.app.state.write_queue
+    return LaneStatsRebuildResponse(
+        lanes=await run_in_threadpool(write_queue.rebuild_lane_stats)
+    )
+
+
+@router.post(
+    "/carrier-profiles/rebuild",
+    response_model=CarrierProfileRebuildResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def rebuild_carrier_profiles(request: Request):
+    """Recompute carrier profiles from full call history, e.g. after editing loads."""
+    write_queue = request.app.state.write_queue
+    return CarrierProfileRebuildResponse(
+        carriers=await run_in_threadpool(write_queue.rebuild_carrier_profiles)
+    )
@@ -0,0 +1,146 @@
+"""
+Call and negotiation ingestion endpoints.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_read_db
+from app.schemas import (
+    CallCreate,
+    CallUpdate,
+    IngestAcknowledgement,
+    NegotiationCreate,
+    TranscriptResponse,
+    TranscriptSearchResult,
+    WriteQueueStats,
+)
+from app.config import settings
+from app.transcripts import fts_enabled, load_transcript, search_transcripts
+from app.write_queue import CallWriteQueue, QueueFullError
+
+router = APIRouter()
+
+
+def verify_api_key(x_api_key: str = Header(...)):
+    """Verify API key from header."""
+    if x_api_key != settings.API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return x_api_key
+
+
+def get_write_queue(request: Request) -> CallWriteQueue:
+    """Dependency for the app-scoped call write queue."""
+    return request.app.state.write_queue
+
+
+def queue_full():
+    return HTTPException(
+        status_code=503,
+        detail="Call ingestion queue is full, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post(
+    "/",
+    status_code=202,
+    response_model=IngestAcknowledgement,
+    dependencies=[Depends(verify_api_key)],
+)
+async def create_call(
+    call: CallCreate, write_queue: CallWriteQueue = Depends(get_write_queue)
+):
+    """Queue a new call for ingestion."""
+    try:
+        depth = write_queue.enqueue_call(call.model_dump(exclude_none=True))
+    except QueueFullError:
+        raise queue_full()
+    return IngestAcknowledgement(call_id=call.call_id, queue_depth=depth)
+
+
+@router.patch(
+    "/{call_id}",
+    status_code=202,
+    response_model=IngestAcknowledgement,
+    dependencies=[Depends(verify_api_key)],
+)
+async def update_call(
+    call_id: str,
+    call_update: CallUpdate,
+    write_queue: CallWriteQueue = Depends(get_write_queue),
+):
+    """Queue an update to a call, creating it if it has not been seen yet."""
+    fields = call_update.model_dump(exclude_unset=True)
+    fields["call_id"] = call_id
+    try:
+        depth = write_queue.enqueue_call(fields)
+    except QueueFullError:
+        raise queue_full()
+    return IngestAcknowledgement(call_id=call_id, queue_depth=depth)
+
+
+@router.post(
+    "/negotiations",
+    status_code=202,
+    response_model=IngestAcknowledgement,
+    dependencies=[Depends(verify_api_key)],
+)
+async def create_negotiation(
+    negotiation: NegotiationCreate,
+    write_queue: CallWriteQueue = Depends(get_write_queue),
+):
+    """
+    Queue a negotiation round for ingestion, keyed by the call's HappyRobot
+    ``call_id``. The call must already be committed or be written in the same
+    batch as the round; a round that reaches the writer before its call is
+    counted as failed and dropped, so post the call first.
+    """
+    try:
+        depth = write_queue.enqueue_negotiation(negotiation.model_dump())
+    except QueueFullError:
+        raise queue_full()
+    return IngestAcknowledgement(call_id=negotiation.call_id, queue_depth=depth)
+
+
+@router.get(
+    "/queue", response_model=WriteQueueStats, dependencies=[Depends(verify_api_key)]
+)
+async def get_queue_stats(write_queue: CallWriteQueue = Depends(get_write_queue)):
+    """Report ingestion queue depth and commit lag."""
+    return write_queue.stats()
+
+
+@router.get(
+    "/transcripts/search",
+    response_model=List[TranscriptSearchResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def search_call_transcripts(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Calls whose transcripts mention every word of ``q``, with highlighted snippets."""
+    if not fts_enabled(db):
+        raise HTTPException(
+            status_code=501, detail="Transcript search requires SQLite FTS5"
+        )
+    return await search_transcripts(db, q, limit)
+
+
+@router.get(
+    "/{call_id}/transcript",
+    response_model=TranscriptResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def get_call_transcript(
+    call_id: str, db: AsyncSession = Depends(get_async_read_db)
+):
+    """A call's full transcript."""
+    transcript = await load_transcript(db, call_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return TranscriptResponse(call_id=call_id, transcript=transcript)
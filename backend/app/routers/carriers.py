@@ -0,0 +1,63 @@
+"""
+Carrier history endpoints.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.carrier_cache import CarrierVerificationCache, to_datetime
+from app.carrier_profiles import carrier_profiles, new_profile, summarize
+from app.config import settings
+from app.database import get_async_read_db
+from app.models import CarrierProfile
+from app.routers.fmcsa import get_carrier_cache
+from app.schemas import CarrierFMCSAStatus, CarrierProfileResponse
+
+router = APIRouter()
+
+
+def verify_api_key(x_api_key: str = Header(...)):
+    """Verify API key from header."""
+    if x_api_key != settings.API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return x_api_key
+
+
+@router.get(
+    "/{mc_number}",
+    response_model=CarrierProfileResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def get_carrier_profile(
+    mc_number: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    carrier_cache: CarrierVerificationCache = Depends(get_carrier_cache),
+):
+    """
+    A carrier's call history and last known FMCSA status, for call start.
+
+    Served from the profile LRU, or one primary-key read of the materialized
+    profile; never triggers an FMCSA lookup.
+    """
+    profile = carrier_profiles.get(mc_number)
+    if profile is None:
+        row = await db.get(CarrierProfile, mc_number)
+        if row is not None:
+            profile = summarize(row)
+            carrier_profiles.fill(mc_number, profile)
+
+    verification = await carrier_cache.last_known_good(mc_number)
+    if profile is None and verification is None:
+        raise HTTPException(status_code=404, detail="Carrier not found")
+
+    fmcsa = None
+    if verification is not None:
+        fmcsa = CarrierFMCSAStatus(
+            is_valid=verification.result.is_valid,
+            carrier_name=verification.result.carrier_name,
+            operating_status=verification.result.operating_status,
+            verified_at=to_datetime(verification.fetched_at),
+        )
+    return CarrierProfileResponse(
+        **(profile or summarize(new_profile(mc_number))), fmcsa=fmcsa
+    )
@@ -2,9 +2,24 @@
 FMCSA API integration endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Header, Depends
-from app.schemas import FMCSAVerifyRequest, FMCSAVerifyResponse
+import asyncio
+import math
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Header, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from app.schemas import (
+    FMCSABulkVerifyResult,
+    FMCSAHealthResponse,
+    FMCSAVerifyRequest,
+    FMCSAVerifyResponse,
+)
 from app.config import settings
+from app.carrier_cache import STALE, CarrierVerificationCache
+from app.circuit_breaker import CircuitOpenError
+from app.fmcsa_client import FMCSAUpstream, request_deadline
+from app.ndjson import read_bulk_rows
 import httpx
 
 router = APIRouter()
@@ -16,15 +31,78 @@ def verify_api_key(x_api_key: str = Header(...)):
     return x_api_key
 
 
+def get_carrier_cache(request: Request) -> CarrierVerificationCache:
+    """Dependency for the app-scoped carrier verification cache."""
+    return request.app.state.carrier_cache
+
+
+def get_fmcsa_upstream(request: Request) -> FMCSAUpstream:
+    return request.app.state.fmcsa_upstream
+
+
+def request_budget(budget_ms: Optional[float]) -> float:
+    """Seconds this request may spend on FMCSA, from the caller's budget."""
+    if budget_ms is None:
+        budget_ms = settings.FMCSA_DEFAULT_BUDGET_MS
+    return max(0.0, (budget_ms - settings.FMCSA_BUDGET_RESERVE_MS) / 1000)
+
+
+async def verify_with_fallback(
+    cache: CarrierVerificationCache, mc_number: str, budget: Optional[float]
+) -> Tuple[FMCSAVerifyResponse, str, Optional[str]]:
+    """
+    Verify through the cache within ``budget`` seconds.
+
+    Returns ``(result, cache_status, fallback)``. When upstream cannot answer
+    (breaker open, deadline hit, transport error) the last known result is
+    served as STALE and ``fallback`` names the reason; with no stored result
+    the error is re-raised.
+    """
+    token = None
+    if budget is not None:
+        token = request_deadline.set(time.monotonic() + budget)
+    try:
+        async with asyncio.timeout(budget):
+            result, cache_status = await cache.get(mc_number)
+        return result, cache_status, None
+    except (CircuitOpenError, httpx.RequestError, TimeoutError) as e:
+        entry = await cache.last_known_good(mc_number)
+        if entry is None:
+            raise
+        if isinstance(e, CircuitOpenError):
+            reason = "circuit_open"
+        elif isinstance(e, (TimeoutError, httpx.TimeoutException)):
+            reason = "timeout"
+        else:
+            reason = "upstream_error"
+        return entry.result, STALE, reason
+    finally:
+        if token is not None:
+            request_deadline.reset(token)
+
+
 @router.post(
     "/verify",
     response_model=FMCSAVerifyResponse,
     dependencies=[Depends(verify_api_key)],
 )
-async def verify_mc_number(request: FMCSAVerifyRequest):
+async def verify_mc_number(
+    request: FMCSAVerifyRequest,
+    response: Response,
+    cache: CarrierVerificationCache = Depends(get_carrier_cache),
+    x_request_budget_ms: Optional[float] = Header(None),
+):
     """
     Verify a motor carrier MC number using FMCSA API.
 
+    Results are served from the verification cache when possible; the
+    X-Cache response header reports HIT, STALE or MISS.
+
+    The lookup is bounded by the caller's remaining budget (X-Request-Budget-Ms,
+    default FMCSA_DEFAULT_BUDGET_MS). If FMCSA is unavailable or too slow, the
+    last known result is returned with X-Cache: STALE and an X-FMCSA-Fallback
+    header; without one, an open circuit fails fast with 503.
+
     Requires FMCSA_API_KEY to be configured in environment variables.
     """
     mc_number = request.mc_number.strip()
@@ -36,103 +114,21 @@ async def verify_mc_number(request: FMCSAVerifyRequest):
         )
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            params = {"webKey": settings.FMCSA_API_KEY}
-            url = f"{settings.FMCSA_API_URL}/{mc_number}"
-
-            response = await client.get(url, params=params)
-
-            if settings.APP_DEBUG:
-                print(f"FMCSA API Response Status: {response.status_code}")
-                print(f"FMCSA API Response Headers: {dict(response.headers)}")
-
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                except Exception as e:
-                    return FMCSAVerifyResponse(
-                        mc_number=mc_number,
-                        is_valid=False,
-                        details={
-                            "error": "Failed to parse FMCSA API response",
-                            "raw_response": response.text[:500],
-                            "parse_error": str(e),
-                        },
-                    )
-
-                if not isinstance(data, dict):
-                    return FMCSAVerifyResponse(
-                        mc_number=mc_number,
-                        is_valid=False,
-                        details={
-                            "error": "FMCSA API returned unexpected format",
-                            "raw_response": str(data)[:500],
-                        },
-                    )
-
-                content = data.get("content")
-
-                if content is None:
-                    # Content is null - carrier might not exist or API structure is different
-                    # Check if there's other data in the response
-                    return FMCSAVerifyResponse(
-                        mc_number=mc_number,
-                        is_valid=False,
-                        details={
-                            "error": "Carrier not found or invalid MC number",
-                            "raw_response": data,
-                        },
-                    )
-
-                # Content exists, parse carrier info according to FMCSA API documentation
-                # See: https://mobile.fmcsa.dot.gov/QCDevsite/docs/apiElements
-                if isinstance(content, dict):
-                    carrier_info = content
-                else:
-                    carrier_info = {}
-
-                # Determine operating status from FMCSA fields
-                # allowToOperate: Y or N, outOfService: Y or N
-                allow_to_operate = carrier_info.get("allowToOperate", "").upper()
-                out_of_service = carrier_info.get("outOfService", "").upper()
-
-                if out_of_service == "Y":
-                    operating_status = "OUT_OF_SERVICE"
-                elif allow_to_operate == "Y":
-                    operating_status = "ACTIVE"
-                elif allow_to_operate == "N":
-                    operating_status = "NOT_ALLOWED"
-                else:
-                    operating_status = "UNKNOWN"
-
-                return FMCSAVerifyResponse(
-                    mc_number=mc_number,
-                    is_valid=True,
-                    carrier_name=carrier_info.get("legalName")
-                    or carrier_info.get("dbaName"),
-                    operating_status=operating_status,
-                    details=data,
-                )
-            elif response.status_code == 404:
-                return FMCSAVerifyResponse(
-                    mc_number=mc_number,
-                    is_valid=False,
-                    details={"error": "MC number not found in FMCSA database"},
-                )
-            else:
-                # API error, but still return response
-                return FMCSAVerifyResponse(
-                    mc_number=mc_number,
-                    is_valid=False,
-                    details={
-                        "error": f"FMCSA API returned status {response.status_code}",
-                        "message": response.text[:200]
-                        if hasattr(response, "text")
-                        else "Unknown error",
-                    },
-                )
-
-    except httpx.TimeoutException:
+        result, cache_status, fallback = await verify_with_fallback(
+            cache, mc_number, request_budget(x_request_budget_ms)
+        )
+        response.headers["X-Cache"] = cache_status
+        if fallback:
+            response.headers["X-FMCSA-Fallback"] = fallback
+        return result
+
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="FMCSA API is unavailable",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
+    except (TimeoutError, httpx.TimeoutException):
         raise HTTPException(status_code=504, detail="FMCSA API request timed out")
     except httpx.RequestError as e:
         raise HTTPException(
@@ -142,3 +138,121 @@ async def verify_mc_number(request: FMCSAVerifyRequest):
         raise HTTPException(
             status_code=500, detail=f"Error verifying MC number: {str(e)}"
         )
+
+
+@router.get(
+    "/health",
+    response_model=FMCSAHealthResponse,
+    dependencies=[Depends(verify_api_key)],
+)
+async def fmcsa_health(
+    cache: CarrierVerificationCache = Depends(get_carrier_cache),
+    upstream: FMCSAUpstream = Depends(get_fmcsa_upstream),
+):
+    """Circuit breaker state, rolling upstream latency and cache counters."""
+    return FMCSAHealthResponse(
+        breaker=upstream.breaker.stats(),
+        latency=upstream.latency.stats(),
+        cache=cache.stats(),
+    )
+
+
+def bulk_mc_number(row: Any) -> Optional[str]:
+    """Accept a bare MC number or an object with an ``mc_number`` field."""
+    if isinstance(row, dict):
+        row = row.get("mc_number")
+    if isinstance(row, int) and not isinstance(row, bool):
+        row = str(row)
+    if isinstance(row, str) and row.strip():
+        return row.strip()
+    return None
+
+
+async def verify_one(
+    cache: CarrierVerificationCache,
+    semaphore: asyncio.Semaphore,
+    index: int,
+    mc_number: str,
+) -> FMCSABulkVerifyResult:
+    async with semaphore:
+        try:
+            result, cache_status, fallback = await verify_with_fallback(
+                cache, mc_number, None
+            )
+        except CircuitOpenError:
+            error = "FMCSA API is unavailable"
+        except httpx.TimeoutException:
+            error = "FMCSA API request timed out"
+        except httpx.RequestError as e:
+            error = f"Error connecting to FMCSA API: {str(e)}"
+        except Exception as e:
+            error = f"Error verifying MC number: {str(e)}"
+        else:
+            return FMCSABulkVerifyResult(
+                index=index,
+                mc_number=mc_number,
+                cache=cache_status,
+                fallback=fallback,
+                result=result,
+            )
+    return FMCSABulkVerifyResult(index=index, mc_number=mc_number, error=error)
+
+
+async def stream_bulk_results(
+    cache: CarrierVerificationCache, rows: List[Any]
+) -> AsyncIterator[str]:
+    semaphore = asyncio.Semaphore(settings.FMCSA_BULK_CONCURRENCY)
+    invalid: List[FMCSABulkVerifyResult] = []
+    tasks: List[asyncio.Task] = []
+    for index, row in enumerate(rows):
+        mc_number = bulk_mc_number(row)
+        if mc_number is None:
+            error = str(row) if isinstance(row, ValueError) else "Missing mc_number"
+            invalid.append(FMCSABulkVerifyResult(index=index, error=error))
+        else:
+            tasks.append(
+                asyncio.create_task(verify_one(cache, semaphore, index, mc_number))
+            )
+
+    try:
+        for result in invalid:
+            yield result.model_dump_json() + "\n"
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            yield result.model_dump_json() + "\n"
+    finally:
+        # If the client goes away, stop issuing upstream requests for the rest
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/verify:bulk", dependencies=[Depends(verify_api_key)])
+async def verify_mc_numbers_bulk(
+    request: Request,
+    cache: CarrierVerificationCache = Depends(get_carrier_cache),
+):
+    """
+    Verify many MC numbers, streaming one NDJSON result per line.
+
+    Accepts a JSON array (or ``{"mc_numbers": [...]}``) or an NDJSON stream of
+    MC numbers or ``{"mc_number": ...}`` objects. Results are written as they
+    complete, not in input order; each carries the ``index`` of its input row.
+    Cached verifications are returned without going upstream; upstream calls
+    run at most FMCSA_BULK_CONCURRENCY at a time and share the FMCSA rate limit.
+    """
+    if not settings.FMCSA_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="FMCSA_API_KEY is not configured. Please set it in your .env file.",
+        )
+
+    rows = await read_bulk_rows(request, "mc_numbers")
+    if len(rows) > settings.FMCSA_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.FMCSA_BULK_MAX_ITEMS} MC numbers per request",
+        )
+
+    return StreamingResponse(
+        stream_bulk_results(cache, rows), media_type="application/x-ndjson"
+    )
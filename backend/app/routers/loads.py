@@ -2,18 +2,62 @@
 Load management endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Header,
+    Request,
+    Response,
+)
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
 
-from app.database import get_db
+from app.database import dialect_insert, get_async_read_db, get_db
 from app.models import Load
-from app.schemas import LoadCreate, LoadResponse, LoadSearchParams
+from app.ndjson import read_bulk_rows
+from app.profiling import run_in_threadpool
+from app.schemas import (
+    BulkLoadResponse,
+    BulkLoadResult,
+    LoadCreate,
+    LoadResponse,
+    LoadSearchParams,
+)
 from app.config import settings
-from app.retrievers import HybridLoadRetriever
+from app.response_cache import (
+    HIT,
+    MISS,
+    ResponseCache,
+    etag_matches,
+    json_response,
+    not_modified,
+)
+from app.instrumentation import retriever_stage
+from app.load_fts import FTS5, candidates_query, match_expression
+from app.responses import dumps
+from app.saved_searches import saved_search_index, search_notifier
+from app.retrievers import FTS5LoadRetriever, HybridLoadRetriever, LoadEmbeddingIndex
 
 router = APIRouter()
 
+# Load embeddings shared across searches; refreshed once per bulk batch
+embedding_index = LoadEmbeddingIndex()
+
+# ETags and cached bodies for load reads; bumped on every load write
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+# Columns returned by load reads, selected directly instead of hydrating ORM
+# objects and validating each one through LoadResponse
+LOAD_COLUMNS = [getattr(Load, name) for name in LoadResponse.model_fields]
+
 
 def verify_api_key(x_api_key: str = Header(...)):
     """Verify API key from header."""
@@ -23,32 +67,208 @@ def verify_api_key(x_api_key: str = Header(...)):
 
 
 @router.post("/", response_model=LoadResponse, dependencies=[Depends(verify_api_key)])
-def create_load(load: LoadCreate, db: Session = Depends(get_db)):
-    """Create a new load."""
+def create_load(
+    load: LoadCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """Create a new load and push it to matching saved searches."""
     db_load = Load(**load.model_dump())
     db.add(db_load)
     db.commit()
+    response_cache.bump()
+    if saved_search_index:
+        background_tasks.add_task(search_notifier.notify, [load.model_dump()])
     db.refresh(db_load)
     return db_load
 
 
+def upsert_statement(db: Session):
+    """Build an ``INSERT ... ON CONFLICT (load_id) DO UPDATE`` for the bound dialect."""
+    stmt = dialect_insert(db)(Load.__table__)
+    updates = {
+        field: stmt.excluded[field]
+        for field in LoadCreate.model_fields
+        if field != "load_id"
+    }
+    updates["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(index_elements=["load_id"], set_=updates)
+
+
+def bulk_upsert(db: Session, rows: List[Any]) -> BulkLoadResponse:
+    """Validate rows and upsert them in chunks with executemany, one commit."""
+    results: List[BulkLoadResult] = []
+    valid: Dict[str, Dict[str, Any]] = {}
+
+    for index, row in enumerate(rows):
+        if isinstance(row, Exception):
+            results.append(
+                BulkLoadResult(index=index, status="invalid", errors=[str(row)])
+            )
+            continue
+        try:
+            load = LoadCreate.model_validate(row)
+        except ValidationError as e:
+            results.append(
+                BulkLoadResult(
+                    index=index,
+                    load_id=row.get("load_id") if isinstance(row, dict) else None,
+                    status="invalid",
+                    errors=[
+                        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    ],
+                )
+            )
+            continue
+
+        if load.load_id in valid:
+            previous = valid.pop(load.load_id)
+            results[previous["index"]].status = "duplicate"
+        result = BulkLoadResult(index=index, load_id=load.load_id, status="pending")
+        valid[load.load_id] = {"index": len(results), "row": load.model_dump()}
+        results.append(result)
+
+    stmt = upsert_statement(db)
+    pending = list(valid.items())
+    chunk_size = settings.BULK_UPSERT_CHUNK_SIZE
+    try:
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start : start + chunk_size]
+            existing = set(
+                db.execute(
+                    select(Load.load_id).where(Load.load_id.in_([k for k, _ in chunk]))
+                ).scalars()
+            )
+            db.execute(stmt, [entry["row"] for _, entry in chunk])
+            for load_id, entry in chunk:
+                results[entry["index"]].status = (
+                    "updated" if load_id in existing else "created"
+                )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    created = sum(1 for r in results if r.status == "created")
+    updated = sum(1 for r in results if r.status == "updated")
+    return BulkLoadResponse(
+        created=created,
+        updated=updated,
+        failed=sum(1 for r in results if r.status == "invalid"),
+        results=results,
+    )
+
+
+@router.post(
+    "/bulk", response_model=BulkLoadResponse, dependencies=[Depends(verify_api_key)]
+)
+async def bulk_upsert_loads(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """
+    Upsert a batch of loads from a JSON array or an NDJSON stream.
+
+    Rows are validated individually and reported with a per-row status; valid
+    rows are written with a single executemany upsert per chunk and one commit.
+    Search embeddings for the batch are refreshed once, after the response,
+    and created loads are pushed to matching saved searches.
+    """
+    rows = await read_bulk_rows(request, "loads")
+    response = await run_in_threadpool(bulk_upsert, db, rows)
+
+    written = [
+        rows[r.index] for r in response.results if r.status in ("created", "updated")
+    ]
+    if written:
+        response_cache.bump()
+        background_tasks.add_task(embedding_index.update, written)
+    if saved_search_index:
+        created = [
+            LoadCreate.model_validate(rows[r.index]).model_dump()
+            for r in response.results
+            if r.status == "created"
+        ]
+        if created:
+            background_tasks.add_task(search_notifier.notify, created)
+
+    return response
+
+
+def encode_cursor(load_id: str) -> str:
+    return base64.urlsafe_b64encode(load_id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def rank_loads(
+    loads: List[Dict[str, Any]], query_dict: Dict[str, Any], top_k: int
+) -> List[Dict[str, Any]]:
+    """Score loads with the hybrid retriever; CPU-bound, so run off the event loop."""
+    retriever = HybridLoadRetriever(loads, embedding_index=embedding_index)
+    results = retriever.search(query_dict, top_k=top_k)
+    return [load for load, score in results]
+
+
+def rank_candidates(
+    candidates: List[Dict[str, Any]], query_dict: Dict[str, Any], top_k: int
+) -> List[Dict[str, Any]]:
+    """Fuse FTS5 candidates with embedding similarity; run off the event loop."""
+    retriever = FTS5LoadRetriever(candidates, embedding_index=embedding_index)
+    results = retriever.search(query_dict, top_k=top_k)
+    return [{k: v for k, v in load.items() if k != "bm25"} for load, score in results]
+
+
 @router.get(
     "/", response_model=List[LoadResponse], dependencies=[Depends(verify_api_key)]
 )
-def search_loads(
+async def search_loads(
+    request: Request,
     params: LoadSearchParams = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    """Search for available loads using hybrid BM25 + embedding retrieval."""
-    query = db.query(Load)
+    """
+    Search for available loads using hybrid BM25 + embedding retrieval.
 
-    if params.available_only:
-        query = query.filter(Load.is_available)
+    Without a text query this is a listing ordered by load_id and paginated
+    with ``limit`` (default LOAD_PAGE_SIZE, at most LOAD_PAGE_MAX_SIZE) and
+    ``cursor``; the cursor for the next page is returned in X-Next-Cursor.
 
-    loads = query.all()
+    Responses carry an ETag tied to the load-board version: a matching
+    If-None-Match gets 304, and repeated parameter sets are served from the
+    response cache until the next load write.
+    """
+    key = "search:" + json.dumps(params.model_dump(), sort_keys=True)
+    etag = response_cache.etag(key)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = response_cache.get(key, etag)
+    if cached is not None:
+        return json_response(cached.body, etag, HIT, cached.headers)
+
+    rows, next_cursor = await find_loads(params, db)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    body = dumps(rows)
+    response_cache.put(key, etag, body, headers)
+    return json_response(body, etag, MISS, headers)
 
-    if not loads:
-        return []
+
+async def find_loads(
+    params: LoadSearchParams, db: AsyncSession
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Rows matching a search, plus the next cursor for paginated listings."""
+    query = select(*LOAD_COLUMNS)
+
+    if params.available_only:
+        query = query.where(Load.is_available)
 
     query_dict = {}
     if params.origin:
@@ -61,39 +281,115 @@ def search_loads(
         query_dict["commodity_type"] = params.commodity_type
 
     if not query_dict:
-        if params.min_rate:
-            loads = [x for x in loads if x.loadboard_rate >= params.min_rate]
-        if params.max_rate:
-            loads = [x for x in loads if x.loadboard_rate <= params.max_rate]
-        return loads
-
-    retriever = HybridLoadRetriever(loads)
-    top_k = params.top_k or 10
-    results = retriever.search(query_dict, top_k=top_k)
+        return await list_loads_page(query, params, db)
 
-    matched_loads = [load for load, score in results]
+    top_k = min(params.top_k or 10, settings.LOAD_PAGE_MAX_SIZE)
+    if settings.SEARCH_LEXICAL_ENGINE == FTS5:
+        return await search_fts5(query, query_dict, params, top_k, db), None
+
+    loads = [dict(row) for row in (await db.execute(query)).mappings()]
+
+    if not loads:
+        return [], None
+
+    matched_loads = await run_in_threadpool(rank_loads, loads, query_dict, top_k)
 
     if params.min_rate:
         matched_loads = [
-            x for x in matched_loads if x.loadboard_rate >= params.min_rate
+            x for x in matched_loads if x["loadboard_rate"] >= params.min_rate
         ]
     if params.max_rate:
         matched_loads = [
-            x for x in matched_loads if x.loadboard_rate <= params.max_rate
+            x for x in matched_loads if x["loadboard_rate"] <= params.max_rate
         ]
 
-    return matched_loads
+    return matched_loads, None
+
+
+async def search_fts5(
+    query,
+    query_dict: Dict[str, Any],
+    params: LoadSearchParams,
+    top_k: int,
+    db: AsyncSession,
+) -> List[Dict[str, Any]]:
+    """
+    Rank and filter in one FTS5 query, then fuse only the best candidates
+    with embeddings. Rate filters apply before ``top_k`` here.
+
+    Only loads sharing at least one word with the query are candidates, so a
+    load that is merely semantically close is not returned, unlike the
+    ``bm25`` engine which scores every load.
+    """
+    match = match_expression(query_dict)
+    if not match:
+        return []
+
+    if params.min_rate:
+        query = query.where(Load.loadboard_rate >= params.min_rate)
+    if params.max_rate:
+        query = query.where(Load.loadboard_rate <= params.max_rate)
+
+    limit = max(settings.SEARCH_FTS5_CANDIDATES, top_k)
+    with retriever_stage("fts5"):
+        candidates = [
+            dict(row)
+            for row in (
+                await db.execute(candidates_query(query, match, limit))
+            ).mappings()
+        ]
+
+    if not candidates:
+        return []
+    return await run_in_threadpool(rank_candidates, candidates, query_dict, top_k)
+
+
+async def list_loads_page(
+    query, params: LoadSearchParams, db: AsyncSession
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One keyset page of a listing, with rate filters applied in SQL."""
+    limit = min(params.limit or settings.LOAD_PAGE_SIZE, settings.LOAD_PAGE_MAX_SIZE)
+
+    if params.min_rate:
+        query = query.where(Load.loadboard_rate >= params.min_rate)
+    if params.max_rate:
+        query = query.where(Load.loadboard_rate <= params.max_rate)
+    if params.cursor:
+        query = query.where(Load.load_id > decode_cursor(params.cursor))
+
+    # One extra row tells us whether there is a next page
+    query = query.order_by(Load.load_id).limit(limit + 1)
+    rows = [dict(row) for row in (await db.execute(query)).mappings()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["load_id"])
+    return rows, next_cursor
 
 
 @router.get(
     "/{load_id}", response_model=LoadResponse, dependencies=[Depends(verify_api_key)]
 )
-def get_load(load_id: str, db: Session = Depends(get_db)):
-    """Get a specific load by ID."""
-    load = db.query(Load).filter(Load.load_id == load_id).first()
+async def get_load(
+    load_id: str, request: Request, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a specific load by ID. Supports If-None-Match like search."""
+    key = f"load:{load_id}"
+    etag = response_cache.etag(key)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = response_cache.get(key, etag)
+    if cached is not None:
+        return json_response(cached.body, etag, HIT)
+
+    query = select(*LOAD_COLUMNS).where(Load.load_id == load_id)
+    load = (await db.execute(query)).mappings().first()
     if not load:
         raise HTTPException(status_code=404, detail="Load not found")
-    return load
+    body = dumps(dict(load))
+    response_cache.put(key, etag, body)
+    return json_response(body, etag, MISS)
 
 
 @router.put(
@@ -113,6 +409,7 @@ def update_load(
         setattr(load, key, value)
 
     db.commit()
+    response_cache.bump()
     db.refresh(load)
     return load
 
@@ -126,4 +423,6 @@ def delete_load(load_id: str, db: Session = Depends(get_db)):
 
     db.delete(load)
     db.commit()
+    response_cache.bump()
+    embedding_index.remove([load_id])
     return {"message": "Load deleted successfully"}
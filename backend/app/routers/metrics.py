@@ -2,101 +2,119 @@
 Metrics and analytics endpoints.
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_async_read_db
+from app.lane_stats import lane_stats
 from app.models import Call, Load
-from app.schemas import MetricsResponse
+from app.responses import ORJSONResponse
+from app.schemas import LaneStatsResponse, MetricsResponse
 
 router = APIRouter()
 
 
+def count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
 @router.get("/", response_model=MetricsResponse)
-def get_metrics(db: Session = Depends(get_db)):
+async def get_metrics(db: AsyncSession = Depends(get_async_read_db)):
     """Get comprehensive metrics for the dashboard."""
 
-    total_calls = db.query(Call).count()
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=now.weekday())
+    month_start = today_start.replace(day=1)
 
-    calls_by_outcome = (
-        db.query(Call.outcome, func.count(Call.id))
-        .filter(Call.outcome.isnot(None))
+    # All per-call aggregates in a single pass over calls
+    totals = (
+        await db.execute(
+            select(
+                func.count(Call.id).label("total_calls"),
+                func.avg(Call.duration_seconds).label("avg_duration"),
+                func.avg(
+                    case((Call.negotiation_rounds > 0, Call.negotiation_rounds))
+                ).label("avg_rounds"),
+                count_where(Call.outcome == "accepted").label("accepted_calls"),
+                func.count(func.distinct(Call.load_id)).label("loads_matched"),
+                func.avg(Call.final_rate).label("avg_rate"),
+                count_where(Call.created_at >= today_start).label("calls_today"),
+                count_where(Call.created_at >= week_start).label("calls_this_week"),
+                count_where(Call.created_at >= month_start).label("calls_this_month"),
+            )
+        )
+    ).one()
+
+    calls_by_outcome = await db.execute(
+        select(Call.outcome, func.count(Call.id))
+        .where(Call.outcome.isnot(None))
         .group_by(Call.outcome)
-        .all()
     )
     outcome_dict = {outcome: count for outcome, count in calls_by_outcome}
 
-    calls_by_sentiment = (
-        db.query(Call.sentiment, func.count(Call.id))
-        .filter(Call.sentiment.isnot(None))
+    calls_by_sentiment = await db.execute(
+        select(Call.sentiment, func.count(Call.id))
+        .where(Call.sentiment.isnot(None))
         .group_by(Call.sentiment)
-        .all()
     )
     sentiment_dict = {sentiment: count for sentiment, count in calls_by_sentiment}
 
-    avg_duration = (
-        db.query(func.avg(Call.duration_seconds))
-        .filter(Call.duration_seconds.isnot(None))
-        .scalar()
-    )
-
-    avg_rounds = (
-        db.query(func.avg(Call.negotiation_rounds))
-        .filter(Call.negotiation_rounds > 0)
-        .scalar()
+    total_loads_available = await db.scalar(
+        select(func.count()).select_from(Load).where(Load.is_available)
     )
 
-    accepted_calls = db.query(Call).filter(Call.outcome == "accepted").count()
-    conversion_rate = (accepted_calls / total_calls * 100) if total_calls > 0 else None
-
-    total_loads_available = db.query(Load).filter(Load.is_available).count()
-    total_loads_matched = (
-        db.query(Call).filter(Call.load_id.isnot(None)).distinct(Call.load_id).count()
+    total_calls = totals.total_calls
+    conversion_rate = (
+        (totals.accepted_calls / total_calls * 100) if total_calls > 0 else None
     )
 
-    avg_rate = (
-        db.query(func.avg(Call.final_rate)).filter(Call.final_rate.isnot(None)).scalar()
-    )
-
-    now = datetime.utcnow()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = today_start - timedelta(days=now.weekday())
-    month_start = today_start.replace(day=1)
-
-    calls_today = db.query(Call).filter(Call.created_at >= today_start).count()
-    calls_this_week = db.query(Call).filter(Call.created_at >= week_start).count()
-    calls_this_month = db.query(Call).filter(Call.created_at >= month_start).count()
-
     return MetricsResponse(
         total_calls=total_calls,
         calls_by_outcome=outcome_dict,
         calls_by_sentiment=sentiment_dict,
-        average_duration_seconds=float(avg_duration) if avg_duration else None,
-        average_negotiation_rounds=float(avg_rounds) if avg_rounds else None,
+        average_duration_seconds=(
+            float(totals.avg_duration) if totals.avg_duration else None
+        ),
+        average_negotiation_rounds=(
+            float(totals.avg_rounds) if totals.avg_rounds else None
+        ),
         conversion_rate=conversion_rate,
         total_loads_available=total_loads_available,
-        total_loads_matched=total_loads_matched,
-        average_rate=float(avg_rate) if avg_rate else None,
-        calls_today=calls_today,
-        calls_this_week=calls_this_week,
-        calls_this_month=calls_this_month,
+        total_loads_matched=totals.loads_matched,
+        average_rate=float(totals.avg_rate) if totals.avg_rate else None,
+        calls_today=totals.calls_today,
+        calls_this_week=totals.calls_this_week,
+        calls_this_month=totals.calls_this_month,
     )
 
 
-@router.get("/calls")
-def get_calls(
-    limit: int = 100,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+@router.get("/calls", response_class=ORJSONResponse)
+async def get_calls(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get recent calls with pagination."""
-    calls = (
-        db.query(Call)
+    calls = await db.execute(
+        select(*Call.__table__.columns)
         .order_by(Call.created_at.desc())
         .limit(limit)
         .offset(offset)
-        .all()
     )
-    return calls
+    return ORJSONResponse([dict(row) for row in calls.mappings()])
+
+
+@router.get("/lanes", response_model=LaneStatsResponse)
+async def get_lane_stats(origin: str, destination: str, equipment_type: str):
+    """
+    Booked rates, opening asks and negotiation offers for a lane, with
+    percentiles and rate per mile. Served from memory, without touching the
+    database.
+    """
+    stats = lane_stats.get(origin, destination, equipment_type)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No history for this lane")
+    return stats
@@ -0,0 +1,111 @@
+"""
+Saved search endpoints: register standing searches and stream their matches.
+"""
+
+import asyncio
+from typing import AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.models import SavedSearch
+from app.responses import dumps
+from app.saved_searches import callback_url_error, saved_search_index, search_notifier
+from app.schemas import SavedSearchCreate, SavedSearchResponse
+
+router = APIRouter()
+
+
+def verify_api_key(x_api_key: str = Header(...)):
+    """Verify API key from header."""
+    if x_api_key != settings.API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return x_api_key
+
+
+def to_response(search: SavedSearch) -> SavedSearchResponse:
+    response = SavedSearchResponse.model_validate(search)
+    response.listeners = search_notifier.broker.listeners(search.id)
+    return response
+
+
+@router.post(
+    "/", response_model=SavedSearchResponse, dependencies=[Depends(verify_api_key)]
+)
+def create_saved_search(search: SavedSearchCreate, db: Session = Depends(get_db)):
+    """Register a standing search; loads created from now on are matched against it."""
+    if search.callback_url:
+        error = callback_url_error(search.callback_url, search_notifier.allowed_hosts)
+        if error:
+            raise HTTPException(status_code=422, detail=f"callback_url {error}")
+    db_search = SavedSearch(**search.model_dump())
+    db.add(db_search)
+    db.commit()
+    db.refresh(db_search)
+    saved_search_index.add(db_search)
+    return to_response(db_search)
+
+
+@router.get(
+    "/",
+    response_model=List[SavedSearchResponse],
+    dependencies=[Depends(verify_api_key)],
+)
+def list_saved_searches(db: Session = Depends(get_read_db)):
+    """List saved searches with their current number of SSE listeners."""
+    return [
+        to_response(search) for search in db.query(SavedSearch).order_by(SavedSearch.id)
+    ]
+
+
+@router.delete("/{search_id}", dependencies=[Depends(verify_api_key)])
+def delete_saved_search(search_id: int, db: Session = Depends(get_db)):
+    """Delete a saved search and stop matching it."""
+    search = db.get(SavedSearch, search_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    db.delete(search)
+    db.commit()
+    saved_search_index.remove(search_id)
+    return {"message": "Saved search deleted successfully"}
+
+
+async def match_events(request: Request, search_id: int) -> AsyncIterator[bytes]:
+    queue = search_notifier.broker.subscribe(search_id)
+    try:
+        yield b": subscribed\n\n"
+        while not await request.is_disconnected():
+            if saved_search_index.get(search_id) is None:
+                yield b"event: deleted\ndata: {}\n\n"
+                return
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.SAVED_SEARCH_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comments keep proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+                continue
+            yield b"event: match\ndata: " + dumps(event) + b"\n\n"
+    finally:
+        search_notifier.broker.unsubscribe(search_id, queue)
+
+
+@router.get("/{search_id}/events", dependencies=[Depends(verify_api_key)])
+async def stream_matches(search_id: int, request: Request):
+    """
+    Server-Sent Events stream of this search's matches, one ``match`` event
+    per ingest with the matching loads. Replaces polling ``GET /loads``.
+    """
+    if saved_search_index.get(search_id) is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    return StreamingResponse(
+        match_events(request, search_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,101 @@
+"""
+HappyRobot webhook endpoints.
+"""
+
+import hmac
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Header
+from pydantic import ValidationError
+
+from app.schemas import CallUpdate, HappyRobotWebhook, IngestAcknowledgement
+from app.config import settings
+from app.routers.calls import get_write_queue, queue_full
+from app.write_queue import CallWriteQueue, QueueFullError
+
+router = APIRouter()
+
+# Carrier identity fields that may be supplied through webhook metadata or
+# extracted data; everything else is validated through ``CallUpdate``
+IDENTITY_FIELDS = ("carrier_mc_number", "carrier_name", "phone_number")
+
+
+def verify_webhook_secret(x_webhook_secret: Optional[str] = Header(None)):
+    """Validate the shared secret HappyRobot sends with each webhook."""
+    if not settings.HAPPYROBOT_WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=500,
+            detail="HAPPYROBOT_WEBHOOK_SECRET is not configured. Please set it in your .env file.",
+        )
+    if not x_webhook_secret or not hmac.compare_digest(
+        x_webhook_secret, settings.HAPPYROBOT_WEBHOOK_SECRET
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    return x_webhook_secret
+
+
+def webhook_to_call_fields(payload: HappyRobotWebhook) -> Dict[str, Any]:
+    """
+    Map a HappyRobot webhook payload onto ``Call`` columns.
+
+    Extracted values that fail validation are dropped rather than rejecting the
+    whole webhook, so a malformed rate does not make HappyRobot retry forever.
+    """
+    identity: Dict[str, Any] = {}
+    raw: Dict[str, Any] = {}
+
+    for source in (payload.metadata or {}, payload.extracted_data or {}):
+        if source.get("mc_number") is not None:
+            identity["carrier_mc_number"] = str(source["mc_number"])
+        for key, value in source.items():
+            if value is None:
+                continue
+            if key in IDENTITY_FIELDS:
+                identity[key] = str(value)
+            elif key in CallUpdate.model_fields:
+                raw[key] = value
+
+    classification = payload.classification or {}
+    for key in ("outcome", "sentiment"):
+        if classification.get(key):
+            raw[key] = classification[key]
+
+    if payload.transcript is not None:
+        raw["transcript"] = payload.transcript
+    if payload.extracted_data is not None:
+        raw["extracted_data"] = payload.extracted_data
+
+    try:
+        update = CallUpdate.model_validate(raw)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+        update = CallUpdate.model_validate(
+            {k: v for k, v in raw.items() if k not in invalid}
+        )
+
+    return {
+        "call_id": payload.call_id,
+        **identity,
+        **update.model_dump(exclude_none=True),
+    }
+
+
+@router.post(
+    "/happyrobot",
+    status_code=202,
+    response_model=IngestAcknowledgement,
+    dependencies=[Depends(verify_webhook_secret)],
+)
+async def happyrobot_webhook(
+    payload: HappyRobotWebhook,
+    write_queue: CallWriteQueue = Depends(get_write_queue),
+):
+    """Acknowledge a HappyRobot call webhook and queue it for ingestion."""
+    if not payload.call_id:
+        raise HTTPException(status_code=422, detail="call_id is required")
+
+    try:
+        depth = write_queue.enqueue_call(webhook_to_call_fields(payload))
+    except QueueFullError:
+        raise queue_full()
+    return IngestAcknowledgement(call_id=payload.call_id, queue_depth=depth)
@@ -0,0 +1,402 @@
+"""
+Standing load searches, matched against new loads as they are ingested.
+
+A saved search is compiled into a reverse index with one dimension per
+criterion: equipment words, origin and destination words, and buckets of
+``min_rate``. A new load looks up each dimension once and only the searches
+present in all of them are evaluated in full, so ingest cost grows with the
+number of plausible matches rather than the number of saved searches.
+
+Text criteria match on words: every word of the saved value must appear in
+the load's field, case-insensitively, so ``"Flatbed"`` matches ``"Flatbed
+48ft"`` and ``"Houston TX"`` matches ``"Houston, TX"``.
+
+Matches are pushed to Server-Sent Event listeners and to the search's
+callback URL. Both are in-process: listeners only hear about loads ingested
+by the worker they are connected to.
+
+Callback URLs are supplied by API clients, so they may only target public
+addresses: hosts resolving to private, loopback, link-local or otherwise
+reserved addresses (such as the 169.254.169.254 metadata endpoint) are
+refused. The callback is then sent to the address that was checked, with the
+original Host header and TLS server name, so the host cannot be re-resolved
+elsewhere in between (DNS rebinding). With ``SAVED_SEARCH_CALLBACK_HOSTS``
+set, only those hosts are allowed, and they are trusted wherever they resolve.
+"""
+
+import asyncio
+import bisect
+import ipaddress
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import SavedSearch
+from app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+
+TEXT_FIELDS = ("equipment_type", "origin", "destination", "commodity_type")
+
+
+def words(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(word.casefold() for word in WORD.findall(value or ""))
+
+
+def is_public_address(address: str) -> bool:
+    return ipaddress.ip_address(address).is_global
+
+
+def callback_url_error(url: str, allowed_hosts: Iterable[str] = ()) -> Optional[str]:
+    """
+    Why ``url`` cannot be a callback target, judged without DNS lookups, or
+    None. ``SearchNotifier`` also checks what the host resolves to.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".")
+    if parts.scheme not in ("http", "https") or not host:
+        return "must be an http(s) URL with a host"
+    allowed_hosts = {h.lower() for h in allowed_hosts}
+    if allowed_hosts:
+        return None if host in allowed_hosts else f"host {host} is not allowed"
+    if host == "localhost" or host.endswith(".localhost"):
+        return "must not target a local address"
+    try:
+        public = is_public_address(host)
+    except ValueError:
+        return None
+    return None if public else "must not target a private or reserved address"
+
+
+@dataclass(frozen=True)
+class CompiledSearch:
+    """A saved search reduced to what matching needs."""
+
+    id: int
+    name: str
+    terms: Dict[str, FrozenSet[str]]
+    min_rate: Optional[float]
+    max_rate: Optional[float]
+    min_rate_per_mile: Optional[float]
+    callback_url: Optional[str]
+    callback_secret: Optional[str]
+
+    @classmethod
+    def of(cls, search: SavedSearch) -> "CompiledSearch":
+        return cls(
+            id=search.id,
+            name=search.name,
+            terms={field: words(getattr(search, field)) for field in TEXT_FIELDS},
+            min_rate=search.min_rate,
+            max_rate=search.max_rate,
+            min_rate_per_mile=search.min_rate_per_mile,
+            callback_url=search.callback_url,
+            callback_secret=search.callback_secret,
+        )
+
+    def matches(self, load: Dict[str, Any], load_words: Dict[str, FrozenSet[str]]):
+        for field, terms in self.terms.items():
+            if not terms <= load_words[field]:
+                return False
+        rate = load["loadboard_rate"]
+        if self.min_rate is not None and rate < self.min_rate:
+            return False
+        if self.max_rate is not None and rate > self.max_rate:
+            return False
+        if self.min_rate_per_mile is not None:
+            miles = load.get("miles")
+            if not miles or rate / miles < self.min_rate_per_mile:
+                return False
+        return True
+
+
+class WordIndex:
+    """
+    Searches keyed by one word of a text criterion, plus those without it.
+
+    The longest word is indexed, as the one least likely to be shared.
+    """
+
+    def __init__(self):
+        self.by_word: Dict[str, Set[int]] = {}
+        self.unconstrained: Set[int] = set()
+
+    def add(self, search_id: int, terms: FrozenSet[str]):
+        if not terms:
+            self.unconstrained.add(search_id)
+            return
+        self.by_word.setdefault(self.key(terms), set()).add(search_id)
+
+    def remove(self, search_id: int, terms: FrozenSet[str]):
+        if not terms:
+            self.unconstrained.discard(search_id)
+            return
+        ids = self.by_word.get(self.key(terms), set())
+        ids.discard(search_id)
+        if not ids:
+            self.by_word.pop(self.key(terms), None)
+
+    def candidates(self, load_words: FrozenSet[str]) -> Set[int]:
+        found = set(self.unconstrained)
+        for word in load_words:
+            found.update(self.by_word.get(word, ()))
+        return found
+
+    @staticmethod
+    def key(terms: FrozenSet[str]) -> str:
+        return max(terms, key=lambda word: (len(word), word))
+
+
+class RateIndex:
+    """Searches bucketed by ``min_rate``; a load selects the buckets up to its rate."""
+
+    def __init__(self, bucket_size: float):
+        self.bucket_size = bucket_size
+        self.buckets: Dict[int, Set[int]] = {}
+        self.keys: List[int] = []
+
+    def bucket(self, rate: Optional[float]) -> int:
+        return int((rate or 0) // self.bucket_size)
+
+    def add(self, search_id: int, min_rate: Optional[float]):
+        bucket = self.bucket(min_rate)
+        if bucket not in self.buckets:
+            bisect.insort(self.keys, bucket)
+            self.buckets[bucket] = set()
+        self.buckets[bucket].add(search_id)
+
+    def remove(self, search_id: int, min_rate: Optional[float]):
+        bucket = self.bucket(min_rate)
+        ids = self.buckets.get(bucket)
+        if ids is None:
+            return
+        ids.discard(search_id)
+        if not ids:
+            del self.buckets[bucket]
+            self.keys.remove(bucket)
+
+    def candidates(self, rate: float) -> Set[int]:
+        found: Set[int] = set()
+        for bucket in self.keys[: bisect.bisect_right(self.keys, self.bucket(rate))]:
+            found |= self.buckets[bucket]
+        return found
+
+
+class SavedSearchIndex:
+    """
+    Reverse index over compiled saved searches.
+
+    Searches are registered and removed from API handlers in the threadpool
+    and matched on the event loop, so every operation takes a lock.
+    """
+
+    def __init__(self, rate_bucket_size: float = 250.0):
+        self.rate_bucket_size = rate_bucket_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.searches: Dict[int, CompiledSearch] = {}
+        self.words = {field: WordIndex() for field in TEXT_FIELDS}
+        self.rates = RateIndex(self.rate_bucket_size)
+
+    def __len__(self) -> int:
+        return len(self.searches)
+
+    def get(self, search_id: int) -> Optional[CompiledSearch]:
+        return self.searches.get(search_id)
+
+    def add(self, search: SavedSearch):
+        compiled = CompiledSearch.of(search)
+        with self._lock:
+            self._remove(compiled.id)
+            self.searches[compiled.id] = compiled
+            for field, index in self.words.items():
+                index.add(compiled.id, compiled.terms[field])
+            self.rates.add(compiled.id, compiled.min_rate)
+
+    def remove(self, search_id: int):
+        with self._lock:
+            self._remove(search_id)
+
+    def _remove(self, search_id: int):
+        compiled = self.searches.pop(search_id, None)
+        if compiled is None:
+            return
+        for field, index in self.words.items():
+            index.remove(search_id, compiled.terms[field])
+        self.rates.remove(search_id, compiled.min_rate)
+
+    def load(self, db: Session) -> int:
+        """Replace the index with every saved search in the database."""
+        searches = db.query(SavedSearch).all()
+        with self._lock:
+            self._reset()
+        for search in searches:
+            self.add(search)
+        return len(searches)
+
+    def match(
+        self, loads: Iterable[Dict[str, Any]]
+    ) -> List[Tuple[CompiledSearch, List[Dict[str, Any]]]]:
+        """Group ``loads`` by the saved searches they satisfy."""
+        matched: Dict[int, List[Dict[str, Any]]] = {}
+        with self._lock:
+            if not self.searches:
+                return []
+            for load in loads:
+                load_words = {field: words(load.get(field)) for field in TEXT_FIELDS}
+                dimensions = sorted(
+                    [
+                        index.candidates(load_words[field])
+                        for field, index in self.words.items()
+                    ]
+                    + [self.rates.candidates(load["loadboard_rate"])],
+                    key=len,
+                )
+                for search_id in set.intersection(*dimensions):
+                    if self.searches[search_id].matches(load, load_words):
+                        matched.setdefault(search_id, []).append(load)
+            return [(self.searches[i], loads) for i, loads in matched.items()]
+
+
+class MatchBroker:
+    """
+    Fan-out of match events to Server-Sent Event listeners.
+
+    Each listener gets a bounded queue; events for a listener that has
+    fallen behind are dropped and counted rather than buffered.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._listeners: Dict[int, Set[asyncio.Queue]] = {}
+        self.dropped = 0
+
+    def subscribe(self, search_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._listeners.setdefault(search_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, search_id: int, queue: asyncio.Queue):
+        listeners = self._listeners.get(search_id, set())
+        listeners.discard(queue)
+        if not listeners:
+            self._listeners.pop(search_id, None)
+
+    def listeners(self, search_id: int) -> int:
+        return len(self._listeners.get(search_id, ()))
+
+    def publish(self, search_id: int, event: Dict[str, Any]):
+        for queue in self._listeners.get(search_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+
+class SearchNotifier:
+    """Delivers matches for newly ingested loads to listeners and callbacks."""
+
+    def __init__(
+        self,
+        index: SavedSearchIndex,
+        broker: MatchBroker,
+        callback_timeout: float = 5.0,
+        allowed_hosts: Iterable[str] = (),
+    ):
+        self.index = index
+        self.broker = broker
+        self.callback_timeout = callback_timeout
+        self.allowed_hosts = list(allowed_hosts)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.callback_timeout)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def notify(self, loads: List[Dict[str, Any]]):
+        """Match ``loads`` and push each saved search its matches."""
+        callbacks = []
+        for search, matched in self.index.match(loads):
+            event = {
+                "saved_search_id": search.id,
+                "name": search.name,
+                "loads": matched,
+            }
+            self.broker.publish(search.id, event)
+            if search.callback_url:
+                callbacks.append(self.post_callback(search, event))
+        await asyncio.gather(*callbacks)
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port)
+        return [info[4][0] for info in infos]
+
+    async def callback_address(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        ``(address, error)``: the checked address to connect to for ``url``,
+        or why it is refused. ``callback_url_error`` applies first, then every
+        address the host resolves to must be public. Allowlisted hosts are not
+        pinned, so the address is None for them.
+        """
+        error = callback_url_error(url, self.allowed_hosts)
+        if error or self.allowed_hosts:
+            return None, error
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            addresses = await self.resolve(parts.hostname, port)
+        except OSError as e:
+            return None, f"host does not resolve: {e}"
+        addresses = [a.split("%")[0] for a in addresses]
+        if not addresses or not all(is_public_address(a) for a in addresses):
+            return None, "must not target a private or reserved address"
+        return addresses[0], None
+
+    async def post_callback(self, search: CompiledSearch, event: Dict[str, Any]):
+        address, error = await self.callback_address(search.callback_url)
+        if error:
+            logger.warning("Saved search %s callback refused: %s", search.id, error)
+            return
+        headers = {"Content-Type": "application/json"}
+        if search.callback_secret:
+            headers["X-Webhook-Secret"] = search.callback_secret
+        request = self.client().build_request(
+            "POST", search.callback_url, content=dumps(event), headers=headers
+        )
+        if address is not None:
+            # Host was set from the original URL; keep it for TLS as well
+            if request.url.scheme == "https":
+                request.extensions["sni_hostname"] = request.url.host
+            request.url = request.url.copy_with(host=address)
+        try:
+            response = await self.client().send(request)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Saved search %s callback failed: %s", search.id, e)
+
+
+saved_search_index = SavedSearchIndex(settings.SAVED_SEARCH_RATE_BUCKET_SIZE)
+search_notifier = SearchNotifier(
+    saved_search_index,
+    MatchBroker(settings.SAVED_SEARCH_EVENT_QUEUE_SIZE),
+    callback_timeout=settings.SAVED_SEARCH_CALLBACK_TIMEOUT_SECONDS,
+    allowed_hosts=settings.SAVED_SEARCH_CALLBACK_HOSTS,
+)
@@ -3,7 +3,7 @@ Pydantic schemas for request/response validation.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -36,6 +36,20 @@ class LoadResponse(LoadBase):
         from_attributes = True
 
 
+class BulkLoadResult(BaseModel):
+    index: int
+    load_id: Optional[str] = None
+    status: str  # "created", "updated", "duplicate", "invalid"
+    errors: Optional[List[str]] = None
+
+
+class BulkLoadResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkLoadResult]
+
+
 class LoadSearchParams(BaseModel):
     origin: Optional[str] = None
     destination: Optional[str] = None
@@ -46,6 +60,10 @@ class LoadSearchParams(BaseModel):
     max_rate: Optional[float] = None
     available_only: bool = True
     top_k: Optional[int] = 10  # Number of results to return from neural search
+    # Listings without a text query are paginated; the next cursor is returned
+    # in the X-Next-Cursor header
+    cursor: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1)
 
 
 class FMCSAVerifyRequest(BaseModel):
@@ -60,6 +78,51 @@ class FMCSAVerifyResponse(BaseModel):
     details: Optional[Dict[str, Any]] = None
 
 
+class FMCSABulkVerifyResult(BaseModel):
+    """One NDJSON line of a bulk verification response."""
+
+    index: int
+    mc_number: Optional[str] = None
+    cache: Optional[str] = None  # HIT, STALE or MISS
+    fallback: Optional[str] = None  # Why a stale result was served, if it was
+    result: Optional[FMCSAVerifyResponse] = None
+    error: Optional[str] = None
+
+
+class CircuitBreakerStats(BaseModel):
+    state: str  # closed, open or half_open
+    consecutive_failures: int
+    retry_after_seconds: float
+    successes: int
+    failures: int
+    rejected: int
+    times_opened: int
+
+
+class UpstreamLatencyStats(BaseModel):
+    count: int
+    window: int
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+
+
+class CarrierCacheStats(BaseModel):
+    entries: int
+    hits: int
+    stale_hits: int
+    misses: int
+    upstream_requests: int
+    inflight: int
+
+
+class FMCSAHealthResponse(BaseModel):
+    breaker: CircuitBreakerStats
+    latency: UpstreamLatencyStats
+    cache: CarrierCacheStats
+
+
 class CallCreate(BaseModel):
     call_id: str
     carrier_mc_number: str
@@ -90,7 +153,6 @@ class CallResponse(BaseModel):
     started_at: datetime
     ended_at: Optional[datetime] = None
     duration_seconds: Optional[int] = None
-    transcript: Optional[str] = None
     outcome: Optional[str] = None
     sentiment: Optional[str] = None
     extracted_data: Optional[Dict[str, Any]] = None
@@ -104,8 +166,23 @@ class CallResponse(BaseModel):
         from_attributes = True
 
 
+class TranscriptResponse(BaseModel):
+    call_id: str
+    transcript: str
+
+
+class TranscriptSearchResult(BaseModel):
+    call_id: str
+    carrier_mc_number: Optional[str] = None
+    load_id: Optional[str] = None
+    outcome: Optional[str] = None
+    started_at: Optional[datetime] = None
+    score: float
+    snippet: str  # Matching words wrapped in <mark> tags
+
+
 class NegotiationCreate(BaseModel):
-    call_id: int
+    call_id: str  # HappyRobot call_id, as sent to POST /calls/
     round_number: int
     offer_type: str
     rate: float
@@ -133,13 +210,105 @@ class MetricsResponse(BaseModel):
     average_negotiation_rounds: Optional[float] = None
     conversion_rate: Optional[float] = None
     total_loads_available: int
-    total_loads_matched: int
+    total_loads_matched: int  # distinct load_ids across all calls
     average_rate: Optional[float] = None
     calls_today: int
     calls_this_week: int
     calls_this_month: int
 
 
+class RatePercentiles(BaseModel):
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
+class RateDistribution(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    percentiles: Optional[RatePercentiles] = None
+
+
+class LaneRateSeries(RateDistribution):
+    per_mile: RateDistribution
+
+
+class LaneStatsResponse(BaseModel):
+    origin: str
+    destination: str
+    equipment_type: str
+    updated_at: Optional[datetime] = None
+    booked: LaneRateSeries
+    initial: LaneRateSeries
+    offers: LaneRateSeries
+
+
+class LaneStatsRebuildResponse(BaseModel):
+    lanes: int
+
+
+class CarrierFMCSAStatus(BaseModel):
+    is_valid: bool
+    carrier_name: Optional[str] = None
+    operating_status: Optional[str] = None
+    verified_at: datetime
+
+
+class CarrierProfileResponse(BaseModel):
+    mc_number: str
+    carrier_name: Optional[str] = None
+    total_calls: int
+    accepted_calls: int
+    acceptance_rate: Optional[float] = None
+    calls_by_outcome: Dict[str, int]
+    average_negotiation_rounds: Optional[float] = None
+    rated_calls: int
+    # Mean of (loadboard_rate - final_rate) / loadboard_rate over rated calls
+    average_discount: Optional[float] = None
+    last_call_id: Optional[str] = None
+    last_call_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    fmcsa: Optional[CarrierFMCSAStatus] = None
+
+
+class CarrierProfileRebuildResponse(BaseModel):
+    carriers: int
+
+
+class SavedSearchCreate(BaseModel):
+    name: str
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    equipment_type: Optional[str] = None
+    commodity_type: Optional[str] = None
+    min_rate: Optional[float] = Field(None, ge=0)
+    max_rate: Optional[float] = Field(None, ge=0)
+    min_rate_per_mile: Optional[float] = Field(None, ge=0)
+    # Matches are POSTed here as well as streamed to SSE listeners
+    callback_url: Optional[str] = Field(None, pattern=r"^https?://")
+    callback_secret: Optional[str] = None
+
+
+class SavedSearchResponse(BaseModel):
+    id: int
+    name: str
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    equipment_type: Optional[str] = None
+    commodity_type: Optional[str] = None
+    min_rate: Optional[float] = None
+    max_rate: Optional[float] = None
+    min_rate_per_mile: Optional[float] = None
+    callback_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    listeners: int = 0
+
+    class Config:
+        from_attributes = True
+
+
 class HappyRobotWebhook(BaseModel):
     workflow_id: Optional[str] = None
     run_id: Optional[str] = None
@@ -148,3 +317,57 @@ class HappyRobotWebhook(BaseModel):
     classification: Optional[Dict[str, Any]] = None
     extracted_data: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
+
+
+class IngestAcknowledgement(BaseModel):
+    status: str = "queued"
+    call_id: Optional[str] = None
+    queue_depth: int
+
+
+class WriteQueueStats(BaseModel):
+    depth: int
+    max_size: int
+    enqueued: int
+    committed: int
+    duplicates_merged: int
+    failed: int
+    batches: int
+    last_batch_size: int
+    oldest_pending_seconds: Optional[float] = None
+    last_lag_seconds: Optional[float] = None
+    max_lag_seconds: Optional[float] = None
+
+
+class SlowQueryEntry(BaseModel):
+    recorded_at: datetime
+    engine: str
+    duration_ms: float
+    statement: str
+    parameters: Optional[str] = None
+    executemany: bool = False
+    plan: Optional[List[str]] = None
+    full_scan: bool = False
+
+
+class SlowQueryLogResponse(BaseModel):
+    threshold_ms: float
+    statements: int
+    slow_statements: int
+    entries: List[SlowQueryEntry]
+
+
+class ProfileSummary(BaseModel):
+    request_id: str
+    method: str
+    path: str
+    query: str = ""
+    status: int
+    duration_ms: float
+    recorded_at: datetime
+    thread_sessions: int = 0
+
+
+class ProfileListResponse(BaseModel):
+    enabled: bool
+    profiles: List[ProfileSummary]
@@ -0,0 +1,102 @@
+"""
+Streaming quantile sketch for rate distributions.
+
+A DDSketch keeps counts in logarithmically sized buckets, so any quantile is
+within ``relative_accuracy`` of the true value however many values are added,
+and memory grows with the spread of values rather than their number. Unlike
+most sketches, buckets are plain counts, so a value can be removed again when
+the record it came from is corrected.
+"""
+
+import math
+from typing import Any, Dict
+
+# Values at or below this are counted in a dedicated zero bucket
+MIN_INDEXABLE_VALUE = 1e-9
+
+
+class DDSketch:
+    """Relative-error quantile sketch over non-negative values."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        if value < 0:
+            raise ValueError("DDSketch only accepts non-negative values")
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def remove(self, value: float, count: int = 1) -> bool:
+        """
+        Remove previously added occurrences of ``value``.
+
+        Returns False, leaving the sketch unchanged, if its bucket does not
+        hold ``count`` values.
+        """
+        if value < 0:
+            return False
+        if value <= MIN_INDEXABLE_VALUE:
+            if self.zero_count < count:
+                return False
+            self.zero_count -= count
+        else:
+            key = self._key(value)
+            held = self.bins.get(key, 0)
+            if held < count:
+                return False
+            if held == count:
+                del self.bins[key]
+            else:
+                self.bins[key] = held - count
+        self.count -= count
+        return True
+
+    def quantile(self, q: float) -> float:
+        """Approximate ``q``-quantile (0 <= q <= 1); NaN for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "bins": {str(key): count for key, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
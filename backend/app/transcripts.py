@@ -0,0 +1,264 @@
+"""
+Compressed call transcript storage and full-text search.
+
+Transcripts live in ``call_transcripts``, one compressed blob per call, so the
+``calls`` table stays narrow for metrics and listings. Text is indexed in a
+contentless SQLite FTS5 table keyed by ``calls.id``: the index holds only
+terms, not a second copy of every transcript. FTS5 cannot build snippets
+without the text, so search ranks with ``bm25()`` in SQL, then decompresses
+just the returned transcripts and highlights them here.
+
+Search is only available on SQLite builds with FTS5; elsewhere transcripts
+are stored but not indexed.
+
+Transcripts are compressed with zlib, or zstd when TRANSCRIPT_CODEC is
+``zstd`` and the ``zstandard`` package is installed. Each row records its
+codec, so changing the setting only affects newly written transcripts.
+"""
+
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import sqlite_has_fts5
+from app.models import Call, CallTranscript
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+FTS_TABLE = "call_transcripts_fts"
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+TERM = re.compile(r"\w+")
+# Rough inverse of the porter tokenizer, so "tarping" highlights "tarp"
+SUFFIXES = ("ing", "ed", "es", "s", "er")
+
+
+def compress(value: str, codec: str = ZLIB) -> bytes:
+    data = value.encode("utf-8")
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("TRANSCRIPT_CODEC=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor().compress(data)
+    if codec == ZLIB:
+        return zlib.compress(data)
+    raise ValueError(f"Unknown transcript codec {codec!r}")
+
+
+def decompress(data: bytes, codec: str) -> str:
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Reading zstd transcripts requires zstandard")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def fts_enabled(db: Union[Session, AsyncSession]) -> bool:
+    """Transcript search needs SQLite built with FTS5."""
+    return db.get_bind().dialect.name == "sqlite" and sqlite_has_fts5()
+
+
+def save_transcripts(db: Session, transcripts: Dict[int, str], codec: str = ZLIB):
+    """
+    Store transcripts keyed by ``calls.id`` and reindex them, in ``db``'s
+    transaction. An empty string removes a call's transcript.
+    """
+    if not transcripts:
+        return
+    existing = {
+        row.call_id: row
+        for row in db.query(CallTranscript).filter(
+            CallTranscript.call_id.in_(transcripts)
+        )
+    }
+    index = fts_enabled(db)
+    now = datetime.now(timezone.utc)
+
+    for call_pk, value in transcripts.items():
+        row = existing.get(call_pk)
+        if row is not None:
+            if index:
+                # A contentless index can only forget terms it is given back
+                db.execute(
+                    text(
+                        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) "
+                        "VALUES ('delete', :rowid, :body)"
+                    ),
+                    {"rowid": call_pk, "body": decompress(row.data, row.codec)},
+                )
+            if not value:
+                db.delete(row)
+                continue
+        elif not value:
+            continue
+
+        data = compress(value, codec)
+        if row is None:
+            db.add(
+                CallTranscript(
+                    call_id=call_pk,
+                    codec=codec,
+                    data=data,
+                    size=len(value),
+                    updated_at=now,
+                )
+            )
+        else:
+            row.codec, row.data, row.size, row.updated_at = codec, data, len(value), now
+        if index:
+            db.execute(
+                text(f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (:rowid, :body)"),
+                {"rowid": call_pk, "body": value},
+            )
+
+
+async def load_transcript(db: AsyncSession, call_id: str) -> Optional[str]:
+    """Decompressed transcript of a call by its HappyRobot ``call_id``."""
+    row = (
+        await db.execute(
+            select(CallTranscript.codec, CallTranscript.data)
+            .join(Call, Call.id == CallTranscript.call_id)
+            .where(Call.call_id == call_id)
+        )
+    ).first()
+    return decompress(row.data, row.codec) if row is not None else None
+
+
+def query_terms(query: str) -> List[str]:
+    return [term.lower() for term in TERM.findall(query)]
+
+
+def match_expression(terms: List[str]) -> str:
+    """An FTS5 query requiring every term, with query syntax neutralized."""
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def stem(term: str) -> str:
+    for suffix in SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[: -len(suffix)]
+    return term
+
+
+def snippet(body: str, terms: List[str], width: int = 160) -> str:
+    """
+    A window of roughly ``width`` characters around the first match, with
+    every matching word wrapped in ``<mark>`` tags.
+    """
+    if not terms:
+        return body[:width]
+    pattern = re.compile(
+        r"\b(?:" + "|".join(re.escape(stem(t)) for t in terms) + r")\w*",
+        re.IGNORECASE,
+    )
+    first = pattern.search(body)
+    center = first.start() if first else 0
+    start = max(0, center - width // 3)
+    end = min(len(body), start + width)
+    # Widen to word boundaries so the window never cuts a word in half
+    while start > 0 and not body[start - 1].isspace():
+        start -= 1
+    while end < len(body) and not body[end].isspace():
+        end += 1
+
+    window = pattern.sub(
+        lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}", body[start:end]
+    )
+    return f"{'…' if start else ''}{window.strip()}{'…' if end < len(body) else ''}"
+
+
+async def search_transcripts(
+    db: AsyncSession, query: str, limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Calls whose transcripts contain every word of ``query``, best match
+    first, each with a highlighted snippet. Only the returned transcripts
+    are decompressed.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    ranked = await db.execute(
+        text(
+            f"SELECT rowid, bm25({FTS_TABLE}) AS bm25 FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :match ORDER BY bm25 LIMIT :limit"
+        ),
+        {"match": match_expression(terms), "limit": limit},
+    )
+    # bm25() is lower-is-better; report higher-is-better scores
+    scores = {row.rowid: -row.bm25 for row in ranked}
+    if not scores:
+        return []
+
+    rows = await db.execute(
+        select(
+            Call.call_id,
+            Call.id,
+            Call.carrier_mc_number,
+            Call.load_id,
+            Call.outcome,
+            Call.started_at,
+            CallTranscript.codec,
+            CallTranscript.data,
+        )
+        .join(CallTranscript, CallTranscript.call_id == Call.id)
+        .where(Call.id.in_(scores))
+    )
+    results = [
+        {
+            "call_id": row.call_id,
+            "carrier_mc_number": row.carrier_mc_number,
+            "load_id": row.load_id,
+            "outcome": row.outcome,
+            "started_at": row.started_at,
+            "score": scores[row.id],
+            "snippet": snippet(decompress(row.data, row.codec), terms),
+        }
+        for row in rows
+    ]
+    results.sort(key=lambda result: result["score"], reverse=True)
+    return results
+
+
+def migrate_inline_transcripts(engine: Engine, codec: str = ZLIB) -> int:
+    """
+    Move transcripts out of the legacy ``calls.transcript`` column into
+    ``call_transcripts`` and drop the column. Returns the number moved.
+    """
+    columns = {column["name"] for column in inspect(engine).get_columns("calls")}
+    if "transcript" not in columns:
+        return 0
+
+    moved = 0
+    last_id = 0
+    with Session(engine) as db:
+        while True:
+            rows = db.execute(
+                text(
+                    "SELECT id, transcript FROM calls WHERE id > :last_id "
+                    "AND transcript IS NOT NULL ORDER BY id LIMIT 500"
+                ),
+                {"last_id": last_id},
+            ).all()
+            if not rows:
+                break
+            save_transcripts(db, {row.id: row.transcript for row in rows}, codec)
+            db.flush()
+            moved += len(rows)
+            last_id = rows[-1].id
+        db.execute(text("ALTER TABLE calls DROP COLUMN transcript"))
+        db.commit()
+    return moved
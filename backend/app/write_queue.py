@@ -0,0 +1,391 @@
+"""
+Bounded in-process write queue for call ingestion.
+
+Ingestion endpoints enqueue writes and acknowledge immediately. A single
+writer task drains the queue and applies each batch in one transaction, so an
+end-of-call burst costs one SQLite commit instead of one per request. Lane
+rate statistics, carrier profiles and compressed, indexed transcripts are
+written in the same transaction.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.carrier_profiles import CallSnapshot, CarrierProfileStore
+from app.lane_stats import OFFERS, LaneDeltas, LaneStatsStore
+from app.models import Call, Negotiation
+from app.transcripts import ZLIB, save_transcripts
+
+logger = logging.getLogger(__name__)
+
+CALL = "call"
+NEGOTIATION = "negotiation"
+
+
+class QueueFullError(Exception):
+    """Raised when the write queue is at capacity."""
+
+
+class BatchResult(NamedTuple):
+    """Outcome of applying one batch: ops written, dropped and merged."""
+
+    committed: int
+    failed: int
+    duplicates_merged: int
+
+
+@dataclass
+class WriteOp:
+    """A single pending write."""
+
+    kind: str
+    payload: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class CallWriteQueue:
+    """Group-commit writer for calls and negotiation rounds."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        lane_stats: Optional[LaneStatsStore] = None,
+        carrier_profiles: Optional[CarrierProfileStore] = None,
+        transcript_codec: str = ZLIB,
+    ):
+        self.session_factory = session_factory
+        self.lane_stats = lane_stats if lane_stats is not None else LaneStatsStore()
+        self.carrier_profiles = (
+            carrier_profiles if carrier_profiles is not None else CarrierProfileStore()
+        )
+        self.transcript_codec = transcript_codec
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "asyncio.Queue[WriteOp]" = asyncio.Queue(maxsize=max_size)
+        self._pending: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        # Serializes batch commits with lane stats and carrier profile rebuilds
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.committed = 0
+        self.duplicates_merged = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_lag: Optional[float] = None
+        self.max_lag: Optional[float] = None
+
+    def enqueue_call(self, fields: Dict[str, Any]) -> int:
+        """Queue an upsert of call fields keyed by ``call_id``."""
+        return self._enqueue(WriteOp(CALL, fields))
+
+    def enqueue_negotiation(self, fields: Dict[str, Any]) -> int:
+        """
+        Queue a negotiation round. Its call must be committed or in the same
+        batch by the time it is written, or the round is dropped as failed.
+        """
+        return self._enqueue(WriteOp(NEGOTIATION, fields))
+
+    def _enqueue(self, op: WriteOp) -> int:
+        try:
+            self._queue.put_nowait(op)
+        except asyncio.QueueFull:
+            raise QueueFullError("Write queue is full")
+        self._pending.append(op.enqueued_at)
+        self.enqueued += 1
+        return self._queue.qsize()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, throughput and lag."""
+        oldest = self._pending[0] if self._pending else None
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "committed": self.committed,
+            "duplicates_merged": self.duplicates_merged,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_batch_size": self.last_batch_size,
+            "oldest_pending_seconds": time.monotonic() - oldest
+            if oldest is not None
+            else None,
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+        }
+
+    def start(self):
+        """Start the background writer task."""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the writer once it has written its current batch and everything
+        still queued. The writer is never cancelled, so no acknowledged write
+        is dropped and no write is still running when this returns.
+        """
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    def flush(self):
+        """
+        Write everything queued so far on the calling thread, in batches of
+        ``batch_size``. For tests and scripts that do not run the writer task.
+        """
+        while True:
+            batch = self._drain_nowait(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    async def _run(self):
+        while True:
+            op = await self._next()
+            if op is None:
+                return
+            batch = [op]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                batch.extend(self._drain_nowait(self.batch_size - len(batch)))
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                op = await self._next(remaining)
+                if op is None:
+                    break
+                batch.append(op)
+
+            await asyncio.to_thread(self._write, batch)
+
+    async def _next(self, timeout: Optional[float] = None) -> Optional[WriteOp]:
+        """
+        The next queued op, or None on timeout or once stopping with the
+        queue empty.
+        """
+        if self._queue.empty():
+            get = asyncio.ensure_future(self._queue.get())
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            try:
+                await asyncio.wait(
+                    {get, stopping},
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                stopping.cancel()
+                if not get.done():
+                    # A get that has not finished has not taken an op yet
+                    get.cancel()
+            if not get.done():
+                return None
+            op = get.result()
+        else:
+            op = self._queue.get_nowait()
+        self._pending.popleft()
+        return op
+
+    def _drain_nowait(self, limit: int) -> List[WriteOp]:
+        ops = []
+        while len(ops) < limit:
+            try:
+                ops.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+            self._pending.popleft()
+        return ops
+
+    def _write(self, batch: List[WriteOp]):
+        """Commit a batch, falling back to per-op commits if it fails."""
+        try:
+            results = [self.apply_batch(batch)]
+        except Exception:
+            logger.exception("Group commit of %d writes failed", len(batch))
+            results = []
+            for op in batch:
+                try:
+                    results.append(self.apply_batch([op]))
+                except Exception:
+                    logger.exception("Dropping %s write: %s", op.kind, op.payload)
+                    results.append(BatchResult(0, 1, 0))
+
+        lag = time.monotonic() - batch[0].enqueued_at
+        self.committed += sum(result.committed for result in results)
+        self.failed += sum(result.failed for result in results)
+        self.duplicates_merged += sum(result.duplicates_merged for result in results)
+        self.batches += 1
+        self.last_batch_size = len(batch)
+        self.last_lag = lag
+        self.max_lag = lag if self.max_lag is None else max(self.max_lag, lag)
+
+    def rebuild_lane_stats(self) -> int:
+        """Recompute lane statistics from history; returns the number of lanes."""
+        return self._rebuild(self.lane_stats.rebuild)
+
+    def rebuild_carrier_profiles(self) -> int:
+        """Recompute carrier profiles from history; returns the number of carriers."""
+        return self._rebuild(self.carrier_profiles.rebuild)
+
+    def _rebuild(self, rebuild: Callable[[Session], int]) -> int:
+        with self._lock:
+            db = self.session_factory()
+            try:
+                return rebuild(db)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def materialize(self):
+        """
+        Load lane stats, building them and carrier profiles from call history
+        if they have never been materialized.
+        """
+        db = self.session_factory()
+        try:
+            lanes_loaded = self.lane_stats.load(db)
+            profiles_materialized = self.carrier_profiles.is_materialized(db)
+        finally:
+            db.close()
+        if not lanes_loaded:
+            self.rebuild_lane_stats()
+        if not profiles_materialized:
+            self.rebuild_carrier_profiles()
+
+    def apply_batch(self, batch: List[WriteOp]) -> BatchResult:
+        """Apply a batch of writes in a single transaction."""
+        with self._lock:
+            return self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[WriteOp]) -> BatchResult:
+        call_fields: Dict[str, Dict[str, Any]] = {}
+        # Keyed by the HappyRobot call_id, resolved to calls.id below
+        negotiations: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+        failed = merged = 0
+
+        for op in batch:
+            if op.kind == CALL:
+                call_id = op.payload["call_id"]
+                if call_id in call_fields:
+                    merged += 1
+                call_fields.setdefault(call_id, {}).update(op.payload)
+            else:
+                key = (
+                    op.payload["call_id"],
+                    op.payload["round_number"],
+                    op.payload["offer_type"],
+                )
+                if key in negotiations:
+                    merged += 1
+                negotiations[key] = op.payload
+
+        deltas = LaneDeltas()
+        # Each written call's profile fields before this batch touched it
+        before: Dict[Call, Optional[CallSnapshot]] = {}
+        db = self.session_factory()
+        try:
+            if call_fields:
+                existing = {
+                    call.call_id: call
+                    for call in db.query(Call).filter(Call.call_id.in_(call_fields))
+                }
+                changes = []
+                transcripts: Dict[Call, str] = {}
+                for call_id, fields in call_fields.items():
+                    transcript = fields.pop("transcript", None)
+                    call = existing.get(call_id)
+                    if call is None:
+                        call = Call(**fields)
+                        db.add(call)
+                        changes.append((call, None))
+                        before[call] = None
+                    else:
+                        before[call] = CallSnapshot.of(call)
+                        previous = (call.load_id, call.initial_rate, call.final_rate)
+                        for key, value in fields.items():
+                            setattr(call, key, value)
+                        changes.append((call, previous))
+                    if transcript is not None:
+                        transcripts[call] = transcript
+                db.flush()
+                save_transcripts(
+                    db,
+                    {call.id: value for call, value in transcripts.items()},
+                    self.transcript_codec,
+                )
+                deltas.record_calls(db, changes)
+
+            if negotiations:
+                calls = {
+                    call.call_id: call
+                    for call in db.query(Call).filter(
+                        Call.call_id.in_({key[0] for key in negotiations})
+                    )
+                }
+                recorded = set(
+                    db.query(
+                        Negotiation.call_id,
+                        Negotiation.round_number,
+                        Negotiation.offer_type,
+                    ).filter(
+                        Negotiation.call_id.in_([call.id for call in calls.values()])
+                    )
+                )
+                for (call_id, round_number, offer_type), fields in negotiations.items():
+                    call = calls.get(call_id)
+                    if call is None:
+                        logger.warning("Negotiation for unknown call %s", call_id)
+                        failed += 1
+                        continue
+                    if (call.id, round_number, offer_type) in recorded:
+                        merged += 1
+                        continue
+                    db.add(Negotiation(**{**fields, "call_id": call.id}))
+                    deltas.add(call.load_id, OFFERS, fields["rate"])
+                    if call not in before:
+                        before[call] = CallSnapshot.of(call)
+                    call.negotiation_rounds = max(
+                        call.negotiation_rounds or 0, fields["round_number"]
+                    )
+
+            lanes = self.lane_stats.apply(db, deltas)
+            profiles = self.carrier_profiles.apply(
+                db,
+                [
+                    (snapshot, CallSnapshot.of(call), call.call_id)
+                    for call, snapshot in before.items()
+                ],
+            )
+            db.commit()
+            self.lane_stats.publish(lanes)
+            self.carrier_profiles.publish(profiles)
+            return BatchResult(len(batch) - failed, failed, merged)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,371 @@
+"""
+Benchmark suite for search, metrics and ingestion across corpus sizes.
+
+Each benchmark runs against a freshly generated corpus per size and reports
+p50/p95/p99 latency, throughput and the process peak RSS. Results are written
+as JSON; pass ``--baseline`` to compare against an earlier run and exit non-zero
+when any p95 regresses by more than ``--threshold``.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# The app reads its settings at import time, so point it at a scratch database
+# and keep SQL echo off before anything from ``app`` is imported.
+if "DATABASE_URL" not in os.environ:
+    bench_dir = tempfile.mkdtemp(prefix="carrier-sales-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{bench_dir}/bench.db"
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("APP_DEBUG", "false")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Call, Load, Negotiation  # noqa: E402
+from app.retrievers import HybridLoadRetriever, LoadEmbeddingIndex  # noqa: E402
+from app.routers import loads as loads_router  # noqa: E402
+from scripts.seed_loads import CITIES, EQUIPMENT, generate, generate_loads  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+HEADERS = {"x-api-key": settings.API_KEY}
+
+
+def peak_rss_mb() -> float:
+    """Process high-water RSS in MiB (``ru_maxrss`` is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(
+    name: str,
+    size: int,
+    fn: Callable[[int], Any],
+    iterations: int,
+    warmup: int = 1,
+) -> Dict[str, Any]:
+    """Time ``fn(i)`` over ``iterations`` calls and summarize the latencies."""
+    for i in range(warmup):
+        fn(i)
+
+    rss_before = peak_rss_mb()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    result = {
+        "name": name,
+        "size": size,
+        "iterations": iterations,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "throughput_per_s": round(iterations / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+    print(
+        f"  {name:<24} n={iterations:<5} p50={result['p50_ms']:>10.2f}ms "
+        f"p95={result['p95_ms']:>10.2f}ms p99={result['p99_ms']:>10.2f}ms "
+        f"{result['throughput_per_s']:>9}/s rss={result['peak_rss_mb']}MiB"
+    )
+    return result
+
+
+def reset_corpus(size: int, seed: int):
+    """Replace the scratch database contents with a generated corpus."""
+    db = SessionLocal()
+    try:
+        db.query(Negotiation).delete()
+        db.query(Call).delete()
+        db.query(Load).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    loads_router.embedding_index.clear()
+    loads_router.response_cache.bump()
+    generate(size, size * 2, seed=seed, prefix=f"BENCH{size}")
+
+
+def random_query(rng: random.Random) -> Dict[str, str]:
+    """A search shaped like the carrier-call traffic: lane plus equipment."""
+    origin, destination = rng.sample(CITIES, 2)
+    query = {"origin": f"{origin[0]}, {origin[1]}"}
+    if rng.random() < 0.6:
+        query["destination"] = f"{destination[0]}, {destination[1]}"
+    if rng.random() < 0.5:
+        query["equipment_type"] = rng.choice(EQUIPMENT)[0]
+    return query
+
+
+def uncached_get(client: TestClient, url: str, **kwargs):
+    """GET with the load response cache invalidated, to time the full path."""
+    loads_router.response_cache.bump()
+    return client.get(url, headers=HEADERS, **kwargs).raise_for_status()
+
+
+def run_size(
+    client: TestClient,
+    size: int,
+    seed: int,
+    iterations: int,
+    only: Optional[List[str]],
+) -> List[Dict[str, Any]]:
+    print(f"\nCorpus: {size} loads, {size * 2} calls")
+    reset_corpus(size, seed)
+    rng = random.Random(seed)
+    results = []
+
+    def enabled(name: str) -> bool:
+        return not only or name in only
+
+    if enabled("retriever_build") or enabled("retriever_search"):
+        db = SessionLocal()
+        try:
+            loads = db.query(Load).filter(Load.is_available).all()
+        finally:
+            db.close()
+
+        if enabled("retriever_build"):
+            results.append(
+                measure(
+                    "retriever_build",
+                    size,
+                    lambda i: HybridLoadRetriever(loads),
+                    iterations=max(1, min(iterations, iterations * 1000 // size)),
+                    warmup=0,
+                )
+            )
+        if enabled("retriever_search"):
+            index = LoadEmbeddingIndex()
+            retriever = HybridLoadRetriever(loads, embedding_index=index)
+            queries = [random_query(rng) for _ in range(iterations)]
+            results.append(
+                measure(
+                    "retriever_search",
+                    size,
+                    lambda i: retriever.search(queries[i], top_k=10),
+                    iterations,
+                )
+            )
+            del retriever, index
+        del loads
+
+    if enabled("search_loads"):
+        queries = [random_query(rng) for _ in range(iterations)]
+        results.append(
+            measure(
+                "search_loads",
+                size,
+                lambda i: uncached_get(client, "/api/v1/loads/", params=queries[i]),
+                iterations,
+            )
+        )
+
+    if enabled("list_loads"):
+        results.append(
+            measure(
+                "list_loads",
+                size,
+                lambda i: uncached_get(
+                    client, "/api/v1/loads/", params={"min_rate": 1500}
+                ),
+                iterations,
+            )
+        )
+
+    if enabled("list_loads_cached"):
+        results.append(
+            measure(
+                "list_loads_cached",
+                size,
+                lambda i: client.get(
+                    "/api/v1/loads/", params={"min_rate": 1500}, headers=HEADERS
+                ).raise_for_status(),
+                iterations,
+            )
+        )
+
+    if enabled("get_metrics"):
+        results.append(
+            measure(
+                "get_metrics",
+                size,
+                lambda i: client.get(
+                    "/api/v1/metrics/", headers=HEADERS
+                ).raise_for_status(),
+                iterations,
+            )
+        )
+
+    new_loads = [
+        {
+            **row,
+            "pickup_datetime": row["pickup_datetime"].isoformat(),
+            "delivery_datetime": row["delivery_datetime"].isoformat(),
+        }
+        for row in generate_loads(iterations + 1, seed + size, prefix=f"NEW{size}")
+    ]
+    for row in new_loads:
+        row.pop("is_available")
+
+    if enabled("create_load"):
+        results.append(
+            measure(
+                "create_load",
+                size,
+                lambda i: client.post(
+                    "/api/v1/loads/", json=new_loads[i], headers=HEADERS
+                ).raise_for_status(),
+                iterations,
+                warmup=0,
+            )
+        )
+
+    if enabled("bulk_upsert_1000"):
+        batch = [
+            {
+                **row,
+                "pickup_datetime": row["pickup_datetime"].isoformat(),
+                "delivery_datetime": row["delivery_datetime"].isoformat(),
+            }
+            for row in generate_loads(1000, seed, prefix=f"BULK{size}")
+        ]
+        results.append(
+            measure(
+                "bulk_upsert_1000",
+                size,
+                lambda i: client.post(
+                    "/api/v1/loads/bulk", json=batch, headers=HEADERS
+                ).raise_for_status(),
+                iterations=max(1, iterations // 10),
+            )
+        )
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Return a description of every p95 regression beyond ``threshold``."""
+    previous = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if not before or not before["p95_ms"]:
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(
+                f"{result['name']}@{result['size']}: p95 {before['p95_ms']}ms -> "
+                f"{result['p95_ms']}ms ({change:+.0%})"
+            )
+        print(
+            f"  {result['name']:<24} {result['size']:>7} "
+            f"{before['p95_ms']:>10.2f}ms -> {result['p95_ms']:>10.2f}ms "
+            f"({change:+.0%}){marker}"
+        )
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        help="Run only these benchmarks (e.g. search_loads get_metrics)",
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed fractional p95 regression versus the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results: List[Dict[str, Any]] = []
+
+    with TestClient(app) as client:
+        for size in sorted(args.sizes):
+            results.extend(
+                run_size(client, size, args.seed, args.iterations, args.only)
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        print(f"\nComparing p95 against {args.baseline}")
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions beyond threshold:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
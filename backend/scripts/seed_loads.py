@@ -1,14 +1,31 @@
 """
 Script to seed the database with sample load data.
+
+Run without arguments to insert the hand-written SAMPLE_LOADS, or with
+``--generate`` to bulk insert deterministic synthetic loads, calls and
+negotiation rounds at production scale:
+
+    python scripts/seed_loads.py --generate --loads 100000 --calls 250000 --seed 42
+
+Set ``DB_PROFILE=bulk_load`` to relax SQLite durability while seeding.
 """
+import argparse
+import math
+import random
 import sys
+import time
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.database import SessionLocal, init_db
-from app.models import Load
+from sqlalchemy import func, insert
+
+from app.carrier_profiles import carrier_profiles
+from app.database import SessionLocal, dialect_insert, init_db
+from app.lane_stats import lane_stats
+from app.models import Call, Load, Negotiation
 from datetime import datetime, timedelta
 
 # Sample loads data
@@ -122,6 +139,409 @@ def seed_loads():
         db.close()
 
 
+# Freight markets as (city, state, latitude, longitude)
+CITIES = [
+    ("Los Angeles", "CA", 34.05, -118.24),
+    ("Oakland", "CA", 37.80, -122.27),
+    ("Fresno", "CA", 36.74, -119.79),
+    ("Seattle", "WA", 47.61, -122.33),
+    ("Portland", "OR", 45.52, -122.68),
+    ("Phoenix", "AZ", 33.45, -112.07),
+    ("Las Vegas", "NV", 36.17, -115.14),
+    ("Salt Lake City", "UT", 40.76, -111.89),
+    ("Denver", "CO", 39.74, -104.99),
+    ("Albuquerque", "NM", 35.08, -106.65),
+    ("Dallas", "TX", 32.78, -96.80),
+    ("Houston", "TX", 29.76, -95.37),
+    ("San Antonio", "TX", 29.42, -98.49),
+    ("Laredo", "TX", 27.51, -99.51),
+    ("El Paso", "TX", 31.76, -106.49),
+    ("Oklahoma City", "OK", 35.47, -97.52),
+    ("Kansas City", "MO", 39.10, -94.58),
+    ("St. Louis", "MO", 38.63, -90.20),
+    ("Omaha", "NE", 41.26, -95.93),
+    ("Minneapolis", "MN", 44.98, -93.27),
+    ("Chicago", "IL", 41.88, -87.63),
+    ("Indianapolis", "IN", 39.77, -86.16),
+    ("Detroit", "MI", 42.33, -83.05),
+    ("Columbus", "OH", 39.96, -83.00),
+    ("Cincinnati", "OH", 39.10, -84.51),
+    ("Louisville", "KY", 38.25, -85.76),
+    ("Memphis", "TN", 35.15, -90.05),
+    ("Nashville", "TN", 36.16, -86.78),
+    ("Atlanta", "GA", 33.75, -84.39),
+    ("Savannah", "GA", 32.08, -81.09),
+    ("Charlotte", "NC", 35.23, -80.84),
+    ("Jacksonville", "FL", 30.33, -81.66),
+    ("Orlando", "FL", 28.54, -81.38),
+    ("Miami", "FL", 25.76, -80.19),
+    ("New Orleans", "LA", 29.95, -90.07),
+    ("Pittsburgh", "PA", 40.44, -79.99),
+    ("Philadelphia", "PA", 39.95, -75.17),
+    ("Newark", "NJ", 40.74, -74.17),
+    ("New York", "NY", 40.71, -74.01),
+    ("Boston", "MA", 42.36, -71.06),
+]
+
+# Equipment as (type, share of loads, base rate per mile, minimum charge)
+EQUIPMENT = [
+    ("Dry Van", 0.55, 2.20, 650.0),
+    ("Refrigerated", 0.20, 2.65, 800.0),
+    ("Flatbed", 0.15, 2.85, 850.0),
+    ("Step Deck", 0.05, 3.10, 950.0),
+    ("Power Only", 0.05, 1.85, 550.0),
+]
+
+# Commodities by equipment as (commodity, weight range in lbs, pieces range)
+COMMODITIES = {
+    "Dry Van": [
+        ("General Freight", (20000, 44000), (10, 30)),
+        ("Retail Goods", (15000, 40000), (20, 60)),
+        ("Electronics", (10000, 35000), (20, 40)),
+        ("Paper Products", (30000, 44000), (20, 26)),
+        ("Beverages", (38000, 45000), (20, 26)),
+    ],
+    "Refrigerated": [
+        ("Food Products", (30000, 43000), (18, 26)),
+        ("Fresh Produce", (35000, 44000), (20, 26)),
+        ("Frozen Foods", (35000, 43000), (18, 24)),
+        ("Pharmaceuticals", (5000, 20000), (10, 20)),
+    ],
+    "Flatbed": [
+        ("Construction Materials", (30000, 47000), (4, 20)),
+        ("Steel Coils", (38000, 47000), (2, 6)),
+        ("Lumber", (35000, 46000), (10, 20)),
+        ("Machinery", (15000, 45000), (1, 4)),
+    ],
+    "Step Deck": [
+        ("Heavy Equipment", (25000, 47000), (1, 3)),
+        ("Machinery", (15000, 45000), (1, 4)),
+    ],
+    "Power Only": [
+        ("Empty Trailer", (8000, 15000), (1, 1)),
+        ("General Freight", (20000, 40000), (10, 30)),
+    ],
+}
+
+NOTES = {
+    "Dry Van": [
+        "Standard dry van load, no special requirements",
+        "Drop and hook at shipper",
+        "Expedited delivery required",
+        "Floor loaded, driver assist unload",
+        "Appointment required at receiver",
+    ],
+    "Refrigerated": [
+        "Temperature controlled, must maintain 34-38°F",
+        "Continuous reefer, pre-cool trailer",
+        "Frozen, must maintain -10°F",
+        "Temperature controlled, must maintain 38-42°F",
+    ],
+    "Flatbed": [
+        "Requires tarping",
+        "Oversized load, requires tarping",
+        "Chains and straps required",
+        "Edge protection required",
+    ],
+    "Step Deck": [
+        "Oversized load, permits provided",
+        "Ramps required for loading",
+        "Requires tarping",
+    ],
+    "Power Only": [
+        "Trailer provided at shipper",
+        "Drop loaded trailer at receiver",
+    ],
+}
+
+DIMENSIONS = {
+    "Dry Van": "53' x 102\" x 110\"",
+    "Refrigerated": "53' x 102\" x 110\"",
+    "Flatbed": "48' x 102\" x 8'6\"",
+    "Step Deck": "48' x 102\" x 10'",
+    "Power Only": "53' x 102\" x 110\"",
+}
+
+# Call outcomes and sentiments as (value, weight)
+OUTCOMES = [
+    ("accepted", 0.30),
+    ("rejected", 0.30),
+    ("no_match", 0.15),
+    ("transferred", 0.15),
+    ("carrier_not_eligible", 0.10),
+]
+SENTIMENTS = [("positive", 0.35), ("neutral", 0.45), ("negative", 0.20)]
+
+ROAD_CIRCUITY = 1.18
+
+# Anchor for generated pickups and call history, so runs are reproducible
+DEFAULT_BASE_DATE = datetime(2025, 1, 1)
+
+
+def lane_miles(origin: Tuple, destination: Tuple) -> float:
+    """Approximate road miles between two cities from great-circle distance."""
+    lat1, lon1, lat2, lon2 = map(
+        math.radians, (origin[2], origin[3], destination[2], destination[3])
+    )
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 3958.8 * 2 * math.asin(math.sqrt(a)) * ROAD_CIRCUITY
+
+
+def weighted_choice(rng: random.Random, options: List[Tuple]) -> Tuple:
+    return rng.choices(options, weights=[o[1] for o in options])[0]
+
+
+def generate_loads(
+    count: int,
+    seed: int = 42,
+    base_date: Optional[datetime] = None,
+    prefix: str = "GEN",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ``count`` synthetic loads, deterministic for a given seed and base date.
+
+    Lanes run between real freight markets, equipment and commodities follow
+    a fixed mix, and rates scale with miles at an equipment-specific rate per
+    mile with lognormal noise.
+    """
+    rng = random.Random(seed)
+    base_date = base_date or DEFAULT_BASE_DATE
+
+    for i in range(count):
+        origin, destination = rng.sample(CITIES, 2)
+        miles = round(lane_miles(origin, destination))
+        equipment, _, rate_per_mile, minimum = weighted_choice(rng, EQUIPMENT)
+        commodity, weight_range, pieces_range = rng.choice(COMMODITIES[equipment])
+
+        # Short hauls price well above the linehaul rate per mile
+        short_haul_premium = 1 + 150 / (miles + 150)
+        rate = miles * rate_per_mile * short_haul_premium * rng.lognormvariate(0, 0.12)
+        rate = round(max(minimum, rate) / 25) * 25
+
+        pickup = base_date + timedelta(hours=rng.randint(6, 24 * 14))
+        transit_days = max(1, math.ceil(miles / 500))
+
+        yield {
+            "load_id": f"{prefix}-{i:07d}",
+            "origin": f"{origin[0]}, {origin[1]}",
+            "destination": f"{destination[0]}, {destination[1]}",
+            "pickup_datetime": pickup,
+            "delivery_datetime": pickup + timedelta(days=transit_days),
+            "equipment_type": equipment,
+            "loadboard_rate": float(rate),
+            "notes": rng.choice(NOTES[equipment]),
+            "weight": float(round(rng.uniform(*weight_range), -2)),
+            "commodity_type": commodity,
+            "num_of_pieces": rng.randint(*pieces_range),
+            "miles": float(miles),
+            "dimensions": DIMENSIONS[equipment],
+            "is_available": rng.random() < 0.85,
+        }
+
+
+def generate_calls(
+    count: int,
+    loads: List[Tuple[str, float]],
+    first_id: int = 1,
+    seed: int = 42,
+    base_date: Optional[datetime] = None,
+    prefix: str = "GEN",
+    carriers: int = 5000,
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    Yield ``count`` synthetic calls with their negotiation rounds.
+
+    ``loads`` holds ``(load_id, loadboard_rate)`` pairs to pitch. Carriers are
+    drawn from a skewed pool so a minority of MC numbers call repeatedly, and
+    calls are spread over the 90 days before ``base_date``.
+    """
+    rng = random.Random(seed + 1)
+    base_date = base_date or DEFAULT_BASE_DATE
+
+    for i in range(count):
+        call_pk = first_id + i
+        carrier = int(carriers * rng.random() ** 3)
+        mc_number = str(100000 + carrier * 7919 % 900000)
+        outcome = weighted_choice(rng, OUTCOMES)[0]
+        started_at = base_date - timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+        duration = int(rng.lognormvariate(5.0, 0.5))
+
+        call = {
+            "id": call_pk,
+            "call_id": f"{prefix}-CALL-{i:07d}",
+            "carrier_mc_number": mc_number,
+            "carrier_name": f"Carrier {carrier} Trucking LLC",
+            "phone_number": f"+1555{carrier:07d}",
+            "load_id": None,
+            "started_at": started_at,
+            "ended_at": started_at + timedelta(seconds=duration),
+            "duration_seconds": duration,
+            "outcome": outcome,
+            "sentiment": weighted_choice(rng, SENTIMENTS)[0],
+            "initial_rate": None,
+            "final_rate": None,
+            "negotiation_rounds": 0,
+            "created_at": started_at,
+        }
+        negotiations = []
+
+        if outcome in ("accepted", "rejected", "transferred") and loads:
+            load_id, loadboard_rate = rng.choice(loads)
+            ask = round(loadboard_rate * rng.uniform(1.03, 1.25) / 25) * 25
+            rounds = rng.randint(1, 3)
+            offer = loadboard_rate
+            for round_number in range(1, rounds + 1):
+                negotiations.append(
+                    {
+                        "call_id": call_pk,
+                        "round_number": round_number,
+                        "offer_type": "initial" if round_number == 1 else "counter",
+                        "rate": float(offer),
+                        "created_at": started_at
+                        + timedelta(seconds=duration * round_number // (rounds + 1)),
+                    }
+                )
+                offer = round((offer + ask) / 2 / 25) * 25
+
+            call.update(
+                load_id=load_id,
+                initial_rate=float(ask),
+                negotiation_rounds=rounds,
+            )
+            if outcome == "accepted":
+                call["final_rate"] = float(offer)
+                negotiations[-1]["offer_type"] = "accepted"
+            elif outcome == "rejected":
+                negotiations[-1]["offer_type"] = "rejected"
+
+        yield call, negotiations
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(
+    loads: int,
+    calls: int,
+    seed: int = 42,
+    base_date: Optional[datetime] = None,
+    prefix: str = "GEN",
+    batch_size: int = 5000,
+):
+    """
+    Bulk insert synthetic loads, calls and negotiations, then rebuild lane
+    stats and carrier profiles from the new history.
+    """
+    init_db()
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        pitched: List[Tuple[str, float]] = []
+        inserted = 0
+        for chunk in chunked(generate_loads(loads, seed, base_date, prefix), batch_size):
+            db.execute(
+                dialect_insert(db)(Load.__table__).on_conflict_do_nothing(), chunk
+            )
+            db.commit()
+            pitched.extend(
+                (row["load_id"], row["loadboard_rate"]) for row in chunk
+            )
+            inserted += len(chunk)
+            print(f"Inserted {inserted}/{loads} loads", end="\r")
+        if loads:
+            print()
+
+        if calls:
+            if db.query(Call.id).filter(Call.call_id == f"{prefix}-CALL-0000000").first():
+                print(f"Calls with prefix {prefix} already exist, skipping calls...")
+                calls = 0
+            elif not pitched:
+                pitched = [
+                    (load_id, rate)
+                    for load_id, rate in db.query(Load.load_id, Load.loadboard_rate)
+                ]
+
+        first_id = (db.query(func.max(Call.id)).scalar() or 0) + 1
+        inserted = 0
+        rounds = 0
+        generated = generate_calls(calls, pitched, first_id, seed, base_date, prefix)
+        for chunk in chunked(generated, batch_size):
+            db.execute(insert(Call.__table__), [call for call, _ in chunk])
+            negotiations = [n for _, rows in chunk for n in rows]
+            if negotiations:
+                db.execute(insert(Negotiation.__table__), negotiations)
+            db.commit()
+            inserted += len(chunk)
+            rounds += len(negotiations)
+            print(f"Inserted {inserted}/{calls} calls", end="\r")
+        if calls:
+            print()
+            # Workers only build these on startup when the tables are empty
+            lanes = lane_stats.rebuild(db)
+            carriers = carrier_profiles.rebuild(db)
+            print(f"Rebuilt {lanes} lane stats and {carriers} carrier profiles")
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"\nGenerated {loads} loads, {calls} calls and {rounds} negotiation "
+            f"rounds in {elapsed:.1f}s (seed={seed})"
+        )
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error generating data: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--generate",
+        action="store_true",
+        help="Generate synthetic data instead of inserting SAMPLE_LOADS",
+    )
+    parser.add_argument("--loads", type=int, default=10000, help="Loads to generate")
+    parser.add_argument("--calls", type=int, default=0, help="Calls to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--base-date",
+        type=datetime.fromisoformat,
+        default=DEFAULT_BASE_DATE,
+        help="Anchor date for pickups and call history "
+        f"(default: {DEFAULT_BASE_DATE.date()})",
+    )
+    parser.add_argument("--prefix", default="GEN", help="Prefix for generated ids")
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Rows per bulk insert"
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    seed_loads()
+    args = parse_args()
+    if args.generate:
+        generate(
+            args.loads,
+            args.calls,
+            seed=args.seed,
+            base_date=args.base_date,
+            prefix=args.prefix,
+            batch_size=args.batch_size,
+        )
+    else:
+        seed_loads()
 
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base, get_async_read_db, get_db
+from app.models import Load
+from app.response_cache import ResponseCache
+from app.routers import loads
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Scratch SQLite database with every table created."""
+    url = f"sqlite:///{tmp_path}/test.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def session_factory(database_url):
+    """Sessions on ``database_url`` that the write queue's thread can use too."""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    yield sessionmaker(autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def loads_api(tmp_path, monkeypatch):
+    """The loads router on a scratch SQLite database holding load L1."""
+    monkeypatch.setattr(settings, "API_KEY", "test-key")
+    monkeypatch.setattr(loads, "response_cache", ResponseCache(max_entries=10))
+
+    url = f"sqlite:///{tmp_path}/loads.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    with SessionLocal() as db:
+        db.add(
+            Load(
+                load_id="L1",
+                origin="Chicago, IL",
+                destination="Dallas, TX",
+                pickup_datetime=datetime(2025, 1, 1, 8),
+                delivery_datetime=datetime(2025, 1, 2, 8),
+                equipment_type="Dry Van",
+                loadboard_rate=2000.0,
+            )
+        )
+        db.commit()
+
+    def override_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def override_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(loads.router, prefix="/api/v1/loads")
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_async_read_db] = override_async_db
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+    await async_engine.dispose()
+    engine.dispose()
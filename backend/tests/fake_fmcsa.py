@@ -0,0 +1,45 @@
+"""
+Local stand-in for the FMCSA QCMobile API.
+
+Serve it through ``httpx.ASGITransport`` and switch ``mode`` to simulate
+healthy, slow, failing or not-found responses.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+OK = "ok"
+SLOW = "slow"
+ERROR = "error"
+NOT_FOUND = "not_found"
+
+
+class FakeFMCSA:
+    def __init__(self, mode: str = OK, delay: float = 0.0):
+        self.mode = mode
+        self.delay = delay
+        self.requests = 0
+        self.app = FastAPI()
+        self.app.get("/carriers/{mc_number}")(self.carrier)
+
+    async def carrier(self, mc_number: str):
+        self.requests += 1
+        if self.mode == SLOW:
+            await asyncio.sleep(self.delay)
+        if self.mode == ERROR:
+            return JSONResponse({"error": "internal"}, status_code=500)
+        if self.mode == NOT_FOUND:
+            return {"content": None}
+        return {
+            "content": {
+                "legalName": f"Carrier {mc_number}",
+                "allowToOperate": "Y",
+                "outOfService": "N",
+            }
+        }
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app))
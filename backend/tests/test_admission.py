@@ -0,0 +1,139 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.config import settings
+
+CLASSES = {
+    "live": {
+        "priority": 0,
+        "routes": ["GET /loads"],
+        "max_concurrency": 1,
+        "max_queue": 4,
+        "queue_timeout_ms": 1000,
+        "retry_after_seconds": 0.5,
+    },
+    "dashboard": {
+        "priority": 1,
+        "routes": ["GET /metrics", "GET /metrics/calls"],
+        "max_concurrency": 1,
+        "max_queue": 1,
+        "queue_timeout_ms": 50,
+        "retry_after_seconds": 5,
+    },
+}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def gated_app(gate: asyncio.Event) -> FastAPI:
+    """Endpoints that hold their admission slot until ``gate`` is set."""
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, classes=CLASSES)
+
+    async def wait():
+        await gate.wait()
+        return {"ok": True}
+
+    for path in ("/loads/", "/metrics/", "/metrics/calls", "/health"):
+        app.add_api_route(path, wait)
+    return app
+
+
+async def started(*tasks):
+    """Let ``tasks`` run until they are admitted or queued."""
+    await asyncio.sleep(0.01)
+    assert not any(task.done() for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_requests_queue_for_a_slot_then_shed_on_budget():
+    """Test FIFO handoff within the queue budget and 503s beyond it."""
+    gate = asyncio.Event()
+    transport = httpx.ASGITransport(app=gated_app(gate))
+    before = sample(
+        "admission_shed_total", priority_class="dashboard", reason="queue_timeout"
+    )
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        running = asyncio.create_task(c.get("/metrics/"))
+        await started(running)
+        queued = asyncio.create_task(c.get("/metrics/calls"))
+        await started(queued)
+        queue_full = await c.get("/metrics/")
+        # Still waiting when its 50ms budget runs out
+        timed_out = await queued
+        unlimited = asyncio.create_task(c.get("/health"))
+        handed_over = asyncio.create_task(c.get("/metrics/calls"))
+        await started(unlimited, handed_over)
+        gate.set()
+        responses = await asyncio.gather(running, unlimited, handed_over)
+
+    assert queue_full.status_code == 503
+    assert timed_out.status_code == 503
+    assert timed_out.headers["Retry-After"] == "5"
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert (
+        sample(
+            "admission_shed_total", priority_class="dashboard", reason="queue_timeout"
+        )
+        == before + 1
+    )
+    assert sample("admission_in_flight", priority_class="dashboard") == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_live_calls_preempt_dashboard_traffic():
+    """Test that dashboard requests are shed while live calls are queued."""
+    gate = asyncio.Event()
+    transport = httpx.ASGITransport(app=gated_app(gate))
+    before = sample(
+        "admission_shed_total", priority_class="dashboard", reason="preempted"
+    )
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        dashboard = asyncio.create_task(c.get("/metrics/"))
+        live = asyncio.create_task(c.get("/loads/"))
+        await started(dashboard, live)
+        dashboard_queued = asyncio.create_task(c.get("/metrics/calls"))
+        await started(dashboard_queued)
+
+        live_queued = asyncio.create_task(c.get("/loads/"))
+        preempted = await dashboard_queued
+        refused = await c.get("/metrics/")
+        gate.set()
+        responses = await asyncio.gather(dashboard, live, live_queued)
+
+    assert preempted.status_code == 503
+    assert refused.status_code == 503
+    assert (
+        sample("admission_shed_total", priority_class="dashboard", reason="preempted")
+        == before + 2
+    )
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert sample("admission_queue_depth", priority_class="live") == 0
+
+
+def test_default_classes_put_call_lookups_in_the_live_class():
+    """Test that every lookup made during a call is admitted as live traffic."""
+    controller = AdmissionController(settings.ADMISSION_CLASSES)
+
+    def class_of(method, path):
+        priority_class = controller.classify(method, path)
+        return priority_class.name if priority_class else None
+
+    assert class_of("GET", "/api/v1/loads/") == "live"
+    assert class_of("GET", "/api/v1/loads/LOAD-001") == "live"
+    assert class_of("GET", "/api/v1/carriers/123456") == "live"
+    assert class_of("POST", "/api/v1/fmcsa/verify") == "live"
+    assert class_of("GET", "/api/v1/metrics/lanes") == "live"
+    assert class_of("GET", "/api/v1/metrics/") == "dashboard"
+    assert class_of("GET", "/api/v1/metrics/calls") == "dashboard"
+    assert class_of("POST", "/api/v1/loads/bulk") is None
+    assert class_of("PUT", "/api/v1/loads/LOAD-001") is None
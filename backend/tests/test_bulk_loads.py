@@ -0,0 +1,129 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.routers import loads
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+def new_load(load_id: str, **fields) -> dict:
+    return {
+        "load_id": load_id,
+        "origin": "Houston, TX",
+        "destination": "Atlanta, GA",
+        "pickup_datetime": "2025-01-01T08:00:00",
+        "delivery_datetime": "2025-01-02T08:00:00",
+        "equipment_type": "Flatbed",
+        "loadboard_rate": 2400.0,
+        **fields,
+    }
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    """Rows passed to the embedding refresh, which would otherwise load the model."""
+    batches = []
+    monkeypatch.setattr(loads.embedding_index, "update", batches.append)
+    return batches
+
+
+@pytest.mark.asyncio
+async def test_bulk_json_array_reports_each_row(loads_api, refreshed):
+    """Test created, updated, duplicate and invalid rows from a JSON array."""
+    rows = [
+        new_load("L1", loadboard_rate=2100.0),
+        new_load("L2"),
+        {"load_id": "L3", "origin": "Houston, TX"},
+        new_load("L2", loadboard_rate=2600.0),
+        "not a load",
+    ]
+
+    response = await loads_api.post("/api/v1/loads/bulk", json=rows, headers=HEADERS)
+    body = response.json()
+    l1 = await loads_api.get("/api/v1/loads/L1", headers=HEADERS)
+    l2 = await loads_api.get("/api/v1/loads/L2", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert [(r["load_id"], r["status"]) for r in body["results"]] == [
+        ("L1", "updated"),
+        ("L2", "duplicate"),
+        ("L3", "invalid"),
+        ("L2", "created"),
+        (None, "invalid"),
+    ]
+    assert (body["created"], body["updated"], body["failed"]) == (1, 1, 2)
+    assert any("destination" in e for e in body["results"][2]["errors"])
+    # The last occurrence of a duplicated load_id wins
+    assert l2.json()["loadboard_rate"] == 2600.0
+    assert l1.json()["loadboard_rate"] == 2100.0
+    assert [[row["load_id"] for row in batch] for batch in refreshed] == [["L1", "L2"]]
+
+
+@pytest.mark.asyncio
+async def test_bulk_ndjson_stream_reports_bad_lines(loads_api, refreshed):
+    """Test an NDJSON body, including a line that is not JSON and blank lines."""
+    body = b"\n".join(
+        [
+            json.dumps(new_load("L2")).encode(),
+            b"{not json",
+            b"",
+            json.dumps({"loads": [new_load("L3")]}).encode(),
+            json.dumps(new_load("L1", equipment_type="Reefer")).encode(),
+        ]
+    )
+
+    response = await loads_api.post(
+        "/api/v1/loads/bulk",
+        content=body,
+        headers={**HEADERS, "Content-Type": "application/x-ndjson"},
+    )
+    results = response.json()["results"]
+    l1 = await loads_api.get("/api/v1/loads/L1", headers=HEADERS)
+
+    assert [(r["index"], r["status"]) for r in results] == [
+        (0, "created"),
+        (1, "invalid"),
+        (2, "invalid"),
+        (3, "updated"),
+    ]
+    assert results[1]["errors"][0].startswith("Invalid JSON")
+    assert l1.json()["equipment_type"] == "Reefer"
+
+
+@pytest.mark.asyncio
+async def test_bulk_accepts_wrapped_array_and_rejects_other_bodies(
+    loads_api, refreshed
+):
+    """Test the ``{"loads": [...]}`` form and the errors for other JSON bodies."""
+    wrapped = await loads_api.post(
+        "/api/v1/loads/bulk", json={"loads": [new_load("L2")]}, headers=HEADERS
+    )
+    not_array = await loads_api.post(
+        "/api/v1/loads/bulk", json={"load_id": "L2"}, headers=HEADERS
+    )
+    not_json = await loads_api.post(
+        "/api/v1/loads/bulk",
+        content=b"[{",
+        headers={**HEADERS, "Content-Type": "application/json"},
+    )
+
+    assert wrapped.json()["created"] == 1
+    assert not_array.status_code == 422
+    assert not_json.status_code == 400
+
+
+@pytest.mark.parametrize("dialect", [postgresql.dialect(), sqlite.dialect()])
+def test_upsert_statement_matches_the_bound_dialect(dialect):
+    """Test that the upsert compiles to ON CONFLICT for Postgres and SQLite."""
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=dialect))
+
+    stmt = loads.upsert_statement(db)
+    sql = str(stmt.compile(dialect=dialect))
+
+    assert type(stmt).__module__ == f"sqlalchemy.dialects.{dialect.name}.dml"
+    assert "ON CONFLICT (load_id) DO UPDATE SET" in sql
+    assert "loadboard_rate = excluded.loadboard_rate" in sql
+    assert "load_id = excluded.load_id" not in sql
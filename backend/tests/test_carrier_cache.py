@@ -0,0 +1,190 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.carrier_cache import HIT, MISS, STALE, CarrierVerificationCache
+from app.database import Base
+from app.fmcsa_client import MC_NOT_FOUND, request_deadline
+from app.schemas import FMCSAVerifyResponse
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeUpstream:
+    """Stand-in for the FMCSA lookup that counts requests."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = 0
+        self.fail = False
+
+    async def __call__(self, mc_number: str) -> FMCSAVerifyResponse:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("FMCSA unavailable")
+        if mc_number == "000000":
+            return FMCSAVerifyResponse(
+                mc_number=mc_number, is_valid=False, details={"error": MC_NOT_FOUND}
+            )
+        if mc_number == "500500":
+            return FMCSAVerifyResponse(
+                mc_number=mc_number,
+                is_valid=False,
+                details={"error": "FMCSA API returned status 500"},
+            )
+        return FMCSAVerifyResponse(
+            mc_number=mc_number,
+            is_valid=True,
+            carrier_name=f"Carrier {mc_number} request {self.requests}",
+            operating_status="ACTIVE",
+        )
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_positive_results_are_cached():
+    """Test that a valid carrier is fetched once within the TTL."""
+    upstream = FakeUpstream()
+    cache = CarrierVerificationCache(upstream, ttl=60, clock=FakeClock())
+
+    first, first_status = await cache.get("123456")
+    second, second_status = await cache.get("123456")
+
+    assert (first_status, second_status) == (MISS, HIT)
+    assert second == first
+    assert upstream.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_not_found_uses_shorter_ttl_and_errors_are_not_cached():
+    """Test negative caching and that upstream errors always go upstream."""
+    upstream = FakeUpstream()
+    clock = FakeClock()
+    cache = CarrierVerificationCache(
+        upstream, ttl=3600, negative_ttl=60, stale_ttl=3600, clock=clock
+    )
+
+    await cache.get("000000")
+    assert (await cache.get("000000"))[1] == HIT
+    clock.now += 61
+    assert (await cache.get("000000"))[1] == MISS
+
+    await cache.get("500500")
+    assert (await cache.get("500500"))[1] == MISS
+    assert upstream.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_request():
+    """Test single-flight for concurrent misses on the same MC number."""
+    upstream = FakeUpstream(delay=0.05)
+    cache = CarrierVerificationCache(upstream, clock=FakeClock())
+
+    results = await asyncio.gather(*(cache.get("123456") for _ in range(20)))
+
+    assert upstream.requests == 1
+    assert len({result.carrier_name for result, _ in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_request_ignores_the_first_callers_deadline():
+    """Test that a caller with a short budget does not cut off later waiters."""
+    upstream = FakeUpstream(delay=0.05)
+    deadlines = []
+
+    async def lookup(mc_number):
+        deadlines.append(request_deadline.get())
+        return await upstream(mc_number)
+
+    cache = CarrierVerificationCache(lookup, clock=FakeClock())
+
+    async def hurried():
+        request_deadline.set(time.monotonic() + 0.01)
+        async with asyncio.timeout(0.01):
+            return await cache.get("123456")
+
+    first = asyncio.create_task(hurried())
+    await asyncio.sleep(0)
+    patient = asyncio.create_task(cache.get("123456"))
+
+    with pytest.raises(TimeoutError):
+        await first
+    result, _ = await patient
+
+    assert deadlines == [None]
+    assert upstream.requests == 1
+    assert result.is_valid
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating():
+    """Test stale-while-revalidate after the TTL expires."""
+    upstream = FakeUpstream(delay=0.01)
+    clock = FakeClock()
+    cache = CarrierVerificationCache(upstream, ttl=60, stale_ttl=600, clock=clock)
+
+    first, _ = await cache.get("123456")
+    clock.now += 120
+
+    stale, status = await cache.get("123456")
+    assert status == STALE
+    assert stale == first
+
+    await asyncio.sleep(0.05)
+    fresh, status = await cache.get("123456")
+    assert status == HIT
+    assert fresh.carrier_name.endswith("request 2")
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_keeps_stale_entry():
+    """Test that a failing background refresh does not drop the entry."""
+    upstream = FakeUpstream()
+    clock = FakeClock()
+    cache = CarrierVerificationCache(upstream, ttl=60, stale_ttl=600, clock=clock)
+
+    first, _ = await cache.get("123456")
+    clock.now += 120
+    upstream.fail = True
+
+    await cache.get("123456")
+    await asyncio.sleep(0.01)
+    result, status = await cache.get("123456")
+
+    assert status == STALE
+    assert result == first
+
+
+@pytest.mark.asyncio
+async def test_entries_survive_restart(session_factory):
+    """Test that verifications persist to the carrier_verifications table."""
+    upstream = FakeUpstream()
+    clock = FakeClock()
+    cache = CarrierVerificationCache(upstream, session_factory, clock=clock)
+    first, _ = await cache.get("123456")
+
+    restarted = CarrierVerificationCache(upstream, session_factory, clock=clock)
+    result, status = await restarted.get("123456")
+
+    assert status == HIT
+    assert result == first
+    assert upstream.requests == 1
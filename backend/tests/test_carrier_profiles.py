@@ -0,0 +1,178 @@
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.carrier_cache import CarrierVerificationCache
+from app.carrier_profiles import CarrierProfileStore, summarize
+from app.config import settings
+from app.database import get_async_read_db
+from app.models import Call, CarrierProfile, Load
+from app.routers import carriers
+from app.schemas import FMCSAVerifyResponse
+from app.write_queue import CallWriteQueue
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    """Scratch database with loads L1 ($2000) and L2 ($1000)."""
+    with session_factory() as db:
+        for load_id, rate in (("L1", 2000.0), ("L2", 1000.0)):
+            db.add(
+                Load(
+                    load_id=load_id,
+                    origin="Chicago, IL",
+                    destination="Dallas, TX",
+                    pickup_datetime=datetime(2025, 1, 1, 8),
+                    delivery_datetime=datetime(2025, 1, 2, 8),
+                    equipment_type="Dry Van",
+                    loadboard_rate=rate,
+                )
+            )
+        db.commit()
+    return session_factory
+
+
+def test_profiles_follow_call_updates_and_match_rebuild(session_factory):
+    """Test incremental profile maintenance against a full rebuild."""
+    store = CarrierProfileStore()
+    write_queue = CallWriteQueue(session_factory, carrier_profiles=store)
+
+    write_queue.enqueue_call({"call_id": "HR-1", "carrier_mc_number": "111111"})
+    write_queue.enqueue_call({"call_id": "HR-2", "carrier_mc_number": "111111"})
+    write_queue.enqueue_call({"call_id": "HR-3", "carrier_name": "Unknown yet"})
+    write_queue.flush()
+    write_queue.enqueue_call(
+        {"call_id": "HR-1", "load_id": "L1", "outcome": "accepted", "final_rate": 1800}
+    )
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-1", "round_number": 2, "offer_type": "counter", "rate": 1900.0}
+    )
+    write_queue.enqueue_call(
+        {"call_id": "HR-2", "load_id": "L2", "outcome": "rejected", "final_rate": 1100}
+    )
+    # HR-3's MC number arrives late, e.g. from a webhook
+    write_queue.enqueue_call(
+        {"call_id": "HR-3", "carrier_mc_number": "222222", "outcome": "no_match"}
+    )
+    write_queue.flush()
+
+    profile = store.get("111111")
+    assert profile["total_calls"] == 2
+    assert profile["acceptance_rate"] == 0.5
+    assert profile["calls_by_outcome"] == {"accepted": 1, "rejected": 1}
+    assert profile["average_negotiation_rounds"] == 1.0
+    # (2000 - 1800) / 2000 and (1000 - 1100) / 1000
+    assert profile["average_discount"] == pytest.approx(0.0)
+    assert profile["last_call_id"] == "HR-2"
+    assert store.get("222222")["carrier_name"] == "Unknown yet"
+
+    # A corrected outcome replaces the old one rather than adding to it
+    write_queue.enqueue_call({"call_id": "HR-2", "outcome": "accepted"})
+    write_queue.flush()
+    assert store.get("111111")["calls_by_outcome"] == {"accepted": 2}
+
+    # A backfilled older call does not become the carrier's last call
+    write_queue.enqueue_call(
+        {
+            "call_id": "HR-4",
+            "carrier_mc_number": "111111",
+            "started_at": datetime(2024, 12, 1, 9),
+        }
+    )
+    write_queue.flush()
+    with session_factory() as db:
+        hr2 = db.query(Call).filter(Call.call_id == "HR-2").one()
+        assert store.get("111111")["last_call_at"] == hr2.started_at
+    assert store.get("111111")["last_call_id"] == "HR-2"
+    assert store.get("111111")["total_calls"] == 3
+
+    incremental = {mc: store.get(mc) for mc in ("111111", "222222")}
+    assert write_queue.rebuild_carrier_profiles() == 2
+    assert store.get("111111") is None
+
+    with write_queue.session_factory() as db:
+        for mc, expected in incremental.items():
+            actual = summarize(db.get(CarrierProfile, mc))
+            for field in (
+                "total_calls",
+                "accepted_calls",
+                "calls_by_outcome",
+                "average_negotiation_rounds",
+                "rated_calls",
+                "average_discount",
+                "carrier_name",
+                "last_call_id",
+                "last_call_at",
+            ):
+                assert actual[field] == expected[field]
+
+
+def test_fill_never_overwrites_a_published_profile():
+    """Test that a racing database read cannot replace a newer summary."""
+    store = CarrierProfileStore(max_entries=2)
+    store.publish({"111111": {"total_calls": 2}})
+    store.fill("111111", {"total_calls": 1})
+    store.fill("222222", {"total_calls": 1})
+    store.fill("333333", {"total_calls": 1})
+
+    assert store.get("111111") is None
+    assert store.get("333333") == {"total_calls": 1}
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_reads_through_and_adds_fmcsa_status(
+    database_url, session_factory, monkeypatch
+):
+    """Test the endpoint on a cold LRU, with and without FMCSA history."""
+    monkeypatch.setattr(settings, "API_KEY", "test-key")
+    store = CarrierProfileStore()
+    monkeypatch.setattr(carriers, "carrier_profiles", store)
+    write_queue = CallWriteQueue(
+        session_factory, carrier_profiles=CarrierProfileStore()
+    )
+    write_queue.enqueue_call({"call_id": "HR-1", "carrier_mc_number": "111111"})
+    write_queue.flush()
+
+    async def fetch(mc_number: str) -> FMCSAVerifyResponse:
+        return FMCSAVerifyResponse(
+            mc_number=mc_number,
+            is_valid=True,
+            carrier_name="Acme",
+            operating_status="AUTHORIZED",
+        )
+
+    carrier_cache = CarrierVerificationCache(fetch=fetch)
+    await carrier_cache.get("333333")
+
+    async_engine = create_async_engine(
+        database_url.replace("sqlite", "sqlite+aiosqlite")
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(carriers.router, prefix="/api/v1/carriers")
+    app.dependency_overrides[get_async_read_db] = override_async_db
+    app.state.carrier_cache = carrier_cache
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        history = await c.get("/api/v1/carriers/111111", headers=HEADERS)
+        verified_only = await c.get("/api/v1/carriers/333333", headers=HEADERS)
+        unknown = await c.get("/api/v1/carriers/999999", headers=HEADERS)
+    await async_engine.dispose()
+
+    assert history.json()["total_calls"] == 1
+    assert history.json()["fmcsa"] is None
+    assert store.get("111111")["total_calls"] == 1
+    assert verified_only.json()["total_calls"] == 0
+    assert verified_only.json()["fmcsa"]["operating_status"] == "AUTHORIZED"
+    assert unknown.status_code == 404
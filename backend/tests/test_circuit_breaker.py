@@ -0,0 +1,230 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.carrier_cache import CarrierVerificationCache
+from app.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyWindow,
+)
+from app.config import settings
+from app.fmcsa_client import FMCSAUpstream, request_deadline
+from app.routers import fmcsa
+from tests.fake_fmcsa import ERROR, NOT_FOUND, OK, SLOW, FakeFMCSA
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fmcsa_settings(monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY", "test-key")
+    monkeypatch.setattr(settings, "FMCSA_API_KEY", "test-web-key")
+    monkeypatch.setattr(settings, "FMCSA_API_URL", "http://fmcsa.test/carriers")
+
+
+@pytest.fixture
+def fake():
+    return FakeFMCSA()
+
+
+@pytest_asyncio.fixture
+async def upstream(fake):
+    async with fake.client() as client:
+        yield FMCSAUpstream(
+            client, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        )
+
+
+@pytest.fixture
+def app(upstream):
+    """The FMCSA router wired to the fake server, without the app lifespan."""
+    app = FastAPI()
+    app.include_router(fmcsa.router, prefix="/api/v1/fmcsa")
+    app.state.fmcsa_upstream = upstream
+    app.state.carrier_cache = CarrierVerificationCache(
+        upstream.fetch, ttl=60, stale_ttl=0
+    )
+    return app
+
+
+@pytest_asyncio.fixture
+async def api(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+def test_breaker_opens_then_probes_half_open():
+    """Test the closed -> open -> half-open -> closed cycle."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_failed_probe_reopens_breaker():
+    """Test that a half-open failure re-opens the breaker immediately."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 10
+
+
+def test_latency_window_percentiles():
+    """Test rolling percentiles over the most recent samples."""
+    window = LatencyWindow(size=100)
+    for ms in range(1, 201):
+        window.record(ms / 1000)
+
+    stats = window.stats()
+    assert stats["count"] == 200
+    assert stats["window"] == 100
+    assert stats["p50_ms"] == pytest.approx(151)
+    assert stats["max_ms"] == pytest.approx(200)
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_open_breaker_and_stop_requests(fake, upstream):
+    """Test that repeated 500s open the breaker and FMCSA is no longer called."""
+    fake.mode = ERROR
+    for _ in range(3):
+        result = await upstream.fetch("123456")
+        assert not result.is_valid
+
+    with pytest.raises(CircuitOpenError):
+        await upstream.fetch("123456")
+    assert fake.requests == 3
+    assert upstream.breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_not_a_breaker_failure(fake, upstream):
+    """Test that definitive not-found answers keep the breaker closed."""
+    fake.mode = NOT_FOUND
+    for _ in range(5):
+        await upstream.fetch("000000")
+
+    assert upstream.breaker.state == CLOSED
+    assert upstream.latency.stats()["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_request_deadline_bounds_slow_upstream(fake, upstream):
+    """Test that a slow FMCSA call is cut off at the request's deadline."""
+    fake.mode, fake.delay = SLOW, 1.0
+    start = time.monotonic()
+    token = request_deadline.set(start + 0.05)
+    try:
+        with pytest.raises(httpx.TimeoutException):
+            await upstream.fetch("123456")
+    finally:
+        request_deadline.reset(token)
+
+    assert time.monotonic() - start < 0.5
+    assert upstream.breaker.consecutive_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_serves_last_known_good(fake, app, api):
+    """Test the stale fallback, then fast 503 when nothing is cached."""
+    response = await api.post(
+        "/api/v1/fmcsa/verify", json={"mc_number": "123456"}, headers=HEADERS
+    )
+    assert response.headers["X-Cache"] == "MISS"
+
+    fake.mode = ERROR
+    for _ in range(3):
+        await api.post(
+            "/api/v1/fmcsa/verify", json={"mc_number": "999999"}, headers=HEADERS
+        )
+    requests = fake.requests
+
+    entry = app.state.carrier_cache.peek("123456")
+    entry.expires_at = entry.stale_until = 0  # Force the next lookup upstream
+
+    stale = await api.post(
+        "/api/v1/fmcsa/verify", json={"mc_number": "123456"}, headers=HEADERS
+    )
+    assert stale.status_code == 200
+    assert stale.headers["X-Cache"] == "STALE"
+    assert stale.headers["X-FMCSA-Fallback"] == "circuit_open"
+    assert stale.json()["carrier_name"] == "Carrier 123456"
+
+    unavailable = await api.post(
+        "/api/v1/fmcsa/verify", json={"mc_number": "555555"}, headers=HEADERS
+    )
+    assert unavailable.status_code == 503
+    assert int(unavailable.headers["Retry-After"]) >= 1
+    assert fake.requests == requests
+
+
+@pytest.mark.asyncio
+async def test_budget_header_turns_slow_upstream_into_fast_504(fake, api):
+    """Test that X-Request-Budget-Ms caps how long a lookup may wait."""
+    fake.mode, fake.delay = SLOW, 2.0
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    response = await api.post(
+        "/api/v1/fmcsa/verify",
+        json={"mc_number": "123456"},
+        headers={**HEADERS, "X-Request-Budget-Ms": "150"},
+    )
+
+    assert response.status_code == 504
+    assert loop.time() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_health_reports_breaker_latency_and_cache(fake, api):
+    """Test the exported breaker state and latency percentiles."""
+    fake.mode = OK
+    await api.post(
+        "/api/v1/fmcsa/verify", json={"mc_number": "123456"}, headers=HEADERS
+    )
+
+    health = (await api.get("/api/v1/fmcsa/health", headers=HEADERS)).json()
+
+    assert health["breaker"]["state"] == CLOSED
+    assert health["latency"]["count"] == 1
+    assert health["latency"]["p50_ms"] is not None
+    assert health["cache"]["misses"] == 1
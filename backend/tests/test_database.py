@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import settings
+from app.database import (
+    Base,
+    create_async_db_engine,
+    create_db_engine,
+    get_profile,
+    get_read_db,
+)
+from app.models import Load
+
+# PRAGMA reads return the numeric value of these keywords
+PRAGMA_KEYWORDS = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+
+def expected(name, value):
+    if name == "journal_mode":
+        return value.lower()
+    return PRAGMA_KEYWORDS.get(name, {}).get(value, value)
+
+
+def pragma(conn, name):
+    return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@pytest.mark.parametrize("name", sorted(settings.DB_PROFILES))
+def test_profile_pragmas_are_applied_on_connect(tmp_path, name):
+    """Test that every pragma of each profile is set on new connections."""
+    pragmas = get_profile(name)["pragmas"]
+    engine = create_db_engine(f"sqlite:///{tmp_path}/db.sqlite", get_profile(name))
+
+    with engine.connect() as conn:
+        applied = {key: pragma(conn, key) for key in pragmas}
+        query_only = pragma(conn, "query_only")
+    engine.dispose()
+
+    assert applied == {key: expected(key, value) for key, value in pragmas.items()}
+    assert {"journal_mode", "synchronous", "cache_size", "mmap_size"} <= set(applied)
+    assert query_only == 0
+
+
+def test_read_only_engines_reject_writes(tmp_path):
+    """Test that reader engines keep the writer's WAL mode but refuse writes."""
+    url = f"sqlite:///{tmp_path}/db.sqlite"
+    profile = get_profile("default")
+    writer = create_db_engine(url, profile)
+    Base.metadata.create_all(writer)
+    reader = create_db_engine(url, profile, read_only=True)
+
+    with reader.connect() as conn:
+        assert pragma(conn, "query_only") == 1
+        assert pragma(conn, "journal_mode") == "wal"
+        assert pragma(conn, "cache_size") == profile["pragmas"]["cache_size"]
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(Load.__table__.delete())
+    reader.dispose()
+    writer.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_read_only_engine_rejects_writes(tmp_path):
+    """Test that the asyncio reader gets the same pragmas as the sync one."""
+    url = f"sqlite:///{tmp_path}/db.sqlite"
+    writer = create_db_engine(url, get_profile("default"))
+    Base.metadata.create_all(writer)
+    reader = create_async_db_engine(url, get_profile("default"), read_only=True)
+
+    async with reader.connect() as conn:
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+        assert (await conn.execute(select(Load.load_id))).all() == []
+        with pytest.raises(OperationalError, match="readonly"):
+            await conn.execute(Load.__table__.delete())
+    await reader.dispose()
+    writer.dispose()
+
+
+def test_get_read_db_sessions_are_read_only(tmp_path, monkeypatch):
+    """Test that sessions from get_read_db can read but not write."""
+    url = f"sqlite:///{tmp_path}/db.sqlite"
+    writer = create_db_engine(url, get_profile("default"))
+    Base.metadata.create_all(writer)
+    reader = create_db_engine(url, get_profile("default"), read_only=True)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=reader))
+
+    sessions = get_read_db()
+    db = next(sessions)
+    assert db.scalars(select(Load)).all() == []
+    db.add(
+        Load(
+            load_id="L1",
+            origin="Chicago, IL",
+            destination="Dallas, TX",
+            pickup_datetime=datetime(2025, 1, 1, 8),
+            delivery_datetime=datetime(2025, 1, 2, 8),
+            equipment_type="Dry Van",
+            loadboard_rate=2000.0,
+        )
+    )
+    with pytest.raises(OperationalError, match="readonly"):
+        db.commit()
+    sessions.close()
+    reader.dispose()
+    writer.dispose()
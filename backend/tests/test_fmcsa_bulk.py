@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.carrier_cache import CarrierVerificationCache
+from app.rate_limit import TokenBucket
+from app.routers.fmcsa import bulk_mc_number, stream_bulk_results
+from app.schemas import FMCSAVerifyResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    """Test that the bucket allows a burst and then refills over time."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now += 10
+    assert sum(bucket.try_acquire() for _ in range(10)) == 3
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_acquire_waits_for_tokens():
+    """Test that acquire paces callers once the burst is spent."""
+    bucket = TokenBucket(rate=100, burst=1)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(6):
+        await bucket.acquire()
+
+    assert loop.time() - start >= 0.04
+
+
+def test_bulk_mc_number_accepts_strings_numbers_and_objects():
+    """Test the accepted shapes of a bulk verification row."""
+    assert bulk_mc_number(" 123456 ") == "123456"
+    assert bulk_mc_number(123456) == "123456"
+    assert bulk_mc_number({"mc_number": "123456"}) == "123456"
+    assert bulk_mc_number({"mc": "123456"}) is None
+    assert bulk_mc_number("") is None
+    assert bulk_mc_number(True) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_bulk_results_bounds_concurrency_and_reuses_cache(monkeypatch):
+    """Test fan-out limits, cache reuse and per-row errors in the stream."""
+    monkeypatch.setattr(settings, "FMCSA_BULK_CONCURRENCY", 2)
+    active = 0
+    peak = 0
+    requested = []
+
+    async def fetch(mc_number):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        requested.append(mc_number)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if mc_number == "999":
+            raise ConnectionError("boom")
+        return FMCSAVerifyResponse(mc_number=mc_number, is_valid=True)
+
+    cache = CarrierVerificationCache(fetch)
+    await cache.get("1")
+
+    rows = ["1", {"mc_number": "2"}, 3, "4", "5", "999", {}, ValueError("bad line")]
+    lines = [
+        json.loads(line)
+        async for line in stream_bulk_results(cache, rows)
+        if line.strip()
+    ]
+    by_index = {line["index"]: line for line in lines}
+
+    assert sorted(by_index) == list(range(len(rows)))
+    assert by_index[0]["cache"] == "HIT"
+    assert by_index[1]["result"]["is_valid"]
+    assert "boom" in by_index[5]["error"]
+    assert by_index[6]["error"] == "Missing mc_number"
+    assert by_index[7]["error"] == "bad line"
+    assert requested.count("1") == 1
+    assert peak == 2
@@ -0,0 +1,75 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from prometheus_client import REGISTRY
+
+from app.instrumentation import PrometheusMiddleware, retriever_stage
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_requests_by_route_template():
+    """Test per-route latency histograms and the in-flight gauge."""
+    router = APIRouter()
+
+    @router.get("/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"item_id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+    app.include_router(router, prefix="/api/items")
+
+    labels = {"method": "GET", "route": "/api/items/{item_id}"}
+    before_ok = sample("http_request_duration_seconds_count", status="200", **labels)
+    before_404 = sample("http_request_duration_seconds_count", status="404", **labels)
+    before_unmatched = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        await c.get("/api/items/a")
+        await c.get("/api/items/b")
+        await c.get("/api/items/missing")
+        await c.get("/nowhere")
+
+    assert (
+        sample("http_request_duration_seconds_count", status="200", **labels)
+        == before_ok + 2
+    )
+    assert (
+        sample("http_request_duration_seconds_count", status="404", **labels)
+        == before_404 + 1
+    )
+    assert (
+        sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        == before_unmatched + 1
+    )
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_retriever_stage_records_even_on_error():
+    """Test that a stage is timed whether or not it raises."""
+    before = sample("retriever_stage_duration_seconds_count", stage="bm25")
+
+    with retriever_stage("bm25"):
+        pass
+    with pytest.raises(ValueError):
+        with retriever_stage("bm25"):
+            raise ValueError
+
+    assert sample("retriever_stage_duration_seconds_count", stage="bm25") == before + 2
@@ -0,0 +1,146 @@
+import random
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.lane_stats import LaneStatsStore
+from app.models import Load
+from app.routers import metrics
+from app.sketches import DDSketch
+from app.write_queue import CallWriteQueue
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    """Scratch database with two loads on different lanes."""
+    with session_factory() as db:
+        for load_id, destination in (("L1", "Dallas, TX"), ("L2", "Atlanta, GA")):
+            db.add(
+                Load(
+                    load_id=load_id,
+                    origin="Chicago, IL",
+                    destination=destination,
+                    pickup_datetime=datetime(2025, 1, 1, 8),
+                    delivery_datetime=datetime(2025, 1, 2, 8),
+                    equipment_type="Dry Van",
+                    loadboard_rate=2000.0,
+                    miles=1000.0,
+                )
+            )
+        db.commit()
+    return session_factory
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    """Test quantile error bounds and that removals undo additions."""
+    rng = random.Random(7)
+    values = sorted(rng.uniform(500, 5000) for _ in range(5000))
+    sketch = DDSketch(0.01)
+    for value in values:
+        sketch.add(value)
+    sketch.add(9999.0)
+
+    assert sketch.remove(9999.0)
+    assert not sketch.remove(9999.0)
+    assert sketch.count == len(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+
+    restored = DDSketch.from_dict(sketch.to_dict())
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def test_write_queue_maintains_lane_stats_incrementally(session_factory):
+    """Test that call and negotiation writes keep lanes equal to a rebuild."""
+    store = LaneStatsStore()
+    write_queue = CallWriteQueue(session_factory, lane_stats=store)
+
+    write_queue.enqueue_call({"call_id": "HR-1", "initial_rate": 2400.0})
+    write_queue.enqueue_call({"call_id": "HR-2", "load_id": "L1"})
+    write_queue.flush()
+    assert store.get("Chicago, IL", "Dallas, TX", "Dry Van") is None
+
+    # HR-1 is matched to a load after its first negotiation round
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-1", "round_number": 1, "offer_type": "counter", "rate": 2300.0}
+    )
+    write_queue.flush()
+    write_queue.enqueue_call({"call_id": "HR-1", "load_id": "L1"})
+    write_queue.enqueue_call({"call_id": "HR-2", "final_rate": 2000.0})
+    write_queue.flush()
+
+    lane = store.get(" chicago, il", "DALLAS, TX", "dry van")
+    assert lane["initial"]["count"] == 1
+    assert lane["offers"]["count"] == 1
+    assert lane["booked"]["mean"] == 2000.0
+    assert lane["booked"]["per_mile"]["mean"] == 2.0
+
+    # A corrected final rate replaces the old one; moving loads moves offers
+    write_queue.enqueue_call({"call_id": "HR-2", "final_rate": 2200.0})
+    write_queue.enqueue_call({"call_id": "HR-1", "load_id": "L2"})
+    write_queue.flush()
+
+    dallas = store.get("Chicago, IL", "Dallas, TX", "Dry Van")
+    atlanta = store.get("Chicago, IL", "Atlanta, GA", "Dry Van")
+    assert dallas["booked"]["count"] == 1
+    assert dallas["booked"]["mean"] == 2200.0
+    assert dallas["offers"]["count"] == 0
+    assert dallas["initial"]["count"] == 0
+    assert atlanta["offers"]["percentiles"]["p50"] == pytest.approx(2300.0, rel=0.01)
+    assert atlanta["initial"]["mean"] == 2400.0
+
+    rebuilt = LaneStatsStore()
+    db = session_factory()
+    assert rebuilt.rebuild(db) == 2
+    loaded = LaneStatsStore()
+    assert loaded.load(db) == 2
+    db.close()
+    for origin, destination in (
+        ("Chicago, IL", "Dallas, TX"),
+        ("Chicago, IL", "Atlanta, GA"),
+    ):
+        incremental = store.get(origin, destination, "Dry Van")
+        for series in ("booked", "initial", "offers"):
+            assert rebuilt.get(origin, destination, "Dry Van")[series] == (
+                incremental[series]
+            )
+            assert loaded.get(origin, destination, "Dry Van")[series] == (
+                incremental[series]
+            )
+
+
+@pytest.mark.asyncio
+async def test_lane_endpoint_serves_published_stats(session_factory, monkeypatch):
+    """Test the lane lookup endpoint and its 404 for unknown lanes."""
+    store = LaneStatsStore()
+    monkeypatch.setattr(metrics, "lane_stats", store)
+    write_queue = CallWriteQueue(session_factory, lane_stats=store)
+    write_queue.enqueue_call({"call_id": "HR-1", "load_id": "L1", "final_rate": 1900.0})
+    write_queue.flush()
+
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1/metrics")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        found = await c.get(
+            "/api/v1/metrics/lanes",
+            params={
+                "origin": "Chicago, IL",
+                "destination": "Dallas, TX",
+                "equipment_type": "Dry Van",
+            },
+        )
+        missing = await c.get(
+            "/api/v1/metrics/lanes",
+            params={"origin": "Nowhere", "destination": "X", "equipment_type": "Y"},
+        )
+
+    assert found.status_code == 200
+    assert found.json()["booked"]["count"] == 1
+    assert found.json()["booked"]["percentiles"]["p90"] == pytest.approx(
+        1900.0, rel=0.01
+    )
+    assert missing.status_code == 404
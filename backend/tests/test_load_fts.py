@@ -0,0 +1,193 @@
+import re
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.load_fts import (
+    FTS_TABLE,
+    candidates_query,
+    ensure_load_fts,
+    match_expression,
+)
+from app import retrievers
+from app.models import Load
+from app.retrievers import FTS5LoadRetriever, LoadEmbeddingIndex
+from app.routers import loads
+from app.schemas import LoadSearchParams
+
+VOCAB = ["chicago", "atlanta", "dallas", "reefer", "dry", "van"]
+
+
+class BagOfWordsModel:
+    """Stands in for the sentence-transformers model: one dimension per word."""
+
+    def encode(self, texts, normalize_embeddings=False):
+        vectors = np.array(
+            [[re.findall(r"\w+", t.lower()).count(w) for w in VOCAB] for t in texts],
+            dtype=np.float32,
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+
+def make_load(load_id: str, origin: str, equipment_type: str, rate: float) -> Load:
+    return Load(
+        load_id=load_id,
+        origin=origin,
+        destination="Dallas, TX",
+        pickup_datetime=datetime(2025, 1, 1, 8),
+        delivery_datetime=datetime(2025, 1, 2, 8),
+        equipment_type=equipment_type,
+        loadboard_rate=rate,
+    )
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    """Swap the embedding model for ``BagOfWordsModel`` and start a fresh cache."""
+    monkeypatch.setattr(retrievers, "load_embed_model", lambda name: BagOfWordsModel())
+    index = LoadEmbeddingIndex()
+    monkeypatch.setattr(loads, "embedding_index", index)
+    return index
+
+
+@pytest.fixture
+def database_url(database_url):
+    """Scratch database with three loads, indexed after they were written."""
+    engine = create_engine(database_url)
+    with sessionmaker(bind=engine)() as db:
+        db.add(make_load("L1", "Chicago, IL", "Reefer", 2500.0))
+        db.add(make_load("L2", "Chicago, IL", "Dry Van", 1800.0))
+        db.add(make_load("L3", "Atlanta, GA", "Reefer", 2100.0))
+        db.commit()
+    assert ensure_load_fts(engine)
+    assert not ensure_load_fts(engine)
+    engine.dispose()
+    return database_url
+
+
+def indexed(engine, term: str):
+    with engine.connect() as conn:
+        return set(
+            conn.execute(
+                text(
+                    f"SELECT loads.load_id FROM {FTS_TABLE} "
+                    f"JOIN loads ON loads.rowid = {FTS_TABLE}.rowid "
+                    f"WHERE {FTS_TABLE} MATCH :term"
+                ),
+                {"term": term},
+            ).scalars()
+        )
+
+
+def test_match_expression_neutralizes_query_syntax():
+    """Test that query values become quoted, deduplicated OR terms."""
+    query = {"origin": 'Chicago" OR *', "equipment_type": "chicago NEAR(reefer)"}
+
+    assert match_expression(query) == '"chicago" OR "or" OR "near" OR "reefer"'
+    assert match_expression({"origin": "—"}) == ""
+
+
+def test_triggers_keep_the_index_in_sync(database_url):
+    """Test reindexing on insert, text update, delete and availability flips."""
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+    assert indexed(engine, "chicago") == {"L1", "L2"}
+
+    with Session() as db:
+        db.add(make_load("L4", "Chicago, IL", "Flatbed", 1500.0))
+        db.get(Load, "L2").origin = "Denver, CO"
+        db.delete(db.get(Load, "L3"))
+        db.commit()
+    assert indexed(engine, "chicago") == {"L1", "L4"}
+    assert indexed(engine, "denver") == {"L2"}
+    assert indexed(engine, "atlanta") == set()
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE loads SET is_available = 0 WHERE load_id = 'L1'"))
+    assert ensure_load_fts(engine) is False
+    assert indexed(engine, "reefer") == {"L1"}
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_candidates_are_filtered_and_ranked_in_one_query(database_url):
+    """Test that filters and bm25 ranking run together in SQL."""
+    engine = create_async_engine(database_url.replace("sqlite", "sqlite+aiosqlite"))
+    query = select(Load.load_id).where(Load.loadboard_rate >= 2000)
+    match = match_expression({"origin": "Chicago", "equipment_type": "Reefer"})
+
+    async with async_sessionmaker(engine)() as db:
+        rows = (await db.execute(candidates_query(query, match, 10))).all()
+        limited = (await db.execute(candidates_query(query, match, 1))).all()
+    await engine.dispose()
+
+    # L2 matches "chicago" but is below the rate floor
+    assert [row.load_id for row in rows] == ["L1", "L3"]
+    assert rows[0].bm25 > rows[1].bm25 > 0
+    assert [row.load_id for row in limited] == ["L1"]
+
+
+def test_retriever_fuses_normalized_bm25_with_embeddings(embeddings):
+    """Test that embedding similarity can outrank the best bm25 candidate."""
+    candidates = [
+        {"load_id": "L1", "origin": "Chicago, IL", "equipment_type": "Dry Van"},
+        {"load_id": "L3", "origin": "Atlanta, GA", "equipment_type": "Reefer"},
+    ]
+    candidates[0]["bm25"], candidates[1]["bm25"] = 2.0, 1.0
+    retriever = FTS5LoadRetriever(candidates, embedding_index=embeddings)
+
+    fused = retriever.search({"equipment_type": "reefer"})
+    lexical = retriever.search({"equipment_type": "reefer"}, embed_weight=0)
+
+    assert [(load["load_id"], round(score, 3)) for load, score in fused] == [
+        ("L3", round(0.25 + 0.5 / np.sqrt(2), 3)),
+        ("L1", 0.5),
+    ]
+    assert [load["load_id"] for load, _ in lexical] == ["L1", "L3"]
+    assert retriever.search({"origin": ""}) == []
+    assert (
+        FTS5LoadRetriever([], embedding_index=embeddings).search({"origin": "Chicago"})
+        == []
+    )
+    assert len(embeddings) == 2
+
+
+def test_rank_candidates_drops_the_bm25_column(embeddings):
+    """Test that ranked rows come back without the helper score."""
+    candidates = [
+        {"load_id": "L1", "origin": "Chicago, IL", "bm25": 1.0},
+        {"load_id": "L2", "origin": "Chicago, IL", "bm25": 3.0},
+    ]
+
+    ranked = loads.rank_candidates(candidates, {"origin": "Chicago"}, top_k=1)
+
+    assert ranked == [{"load_id": "L2", "origin": "Chicago, IL"}]
+
+
+@pytest.mark.asyncio
+async def test_search_fts5_ranks_only_lexical_matches(database_url, embeddings):
+    """Test filters, ranking and top_k, and that loads with no term hit are not returned."""
+    engine = create_async_engine(database_url.replace("sqlite", "sqlite+aiosqlite"))
+    query = select(*loads.LOAD_COLUMNS)
+    wanted = {"origin": "Chicago", "equipment_type": "Reefer"}
+
+    async with async_sessionmaker(engine)() as db:
+        ranked = await loads.search_fts5(
+            query, wanted, LoadSearchParams(min_rate=2000), 10, db
+        )
+        top = await loads.search_fts5(query, wanted, LoadSearchParams(), 1, db)
+        # Every load is a Dallas delivery, but none mentions Denver
+        missed = await loads.search_fts5(
+            query, {"origin": "Denver"}, LoadSearchParams(), 10, db
+        )
+    await engine.dispose()
+
+    assert [row["load_id"] for row in ranked] == ["L1", "L3"]
+    assert "bm25" not in ranked[0]
+    assert [row["load_id"] for row in top] == ["L1"]
+    assert missed == []
@@ -0,0 +1,77 @@
+import pytest
+
+from app.routers.loads import decode_cursor, encode_cursor
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+def new_load(load_id: str, rate: float) -> dict:
+    return {
+        "load_id": load_id,
+        "origin": "Chicago, IL",
+        "destination": "Dallas, TX",
+        "pickup_datetime": "2025-01-01T08:00:00",
+        "delivery_datetime": "2025-01-02T08:00:00",
+        "equipment_type": "Dry Van",
+        "loadboard_rate": rate,
+    }
+
+
+def test_cursor_round_trip():
+    """Test that cursors are opaque and decode back to the load_id."""
+    cursor = encode_cursor("LD-0042/β")
+    assert "LD" not in cursor
+    assert decode_cursor(cursor) == "LD-0042/β"
+
+
+@pytest.mark.asyncio
+async def test_listing_pages_with_cursor(loads_api):
+    """Test keyset pagination over the listing and the X-Next-Cursor header."""
+    for i in range(2, 8):
+        await loads_api.post(
+            "/api/v1/loads/", json=new_load(f"L{i}", 1000.0 * i), headers=HEADERS
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = await loads_api.get("/api/v1/loads/", params=params, headers=HEADERS)
+        assert page.status_code == 200
+        assert len(page.json()) <= 3
+        seen.extend(row["load_id"] for row in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [f"L{i}" for i in range(1, 8)]
+
+
+@pytest.mark.asyncio
+async def test_listing_filters_rates_and_serializes_columns(loads_api):
+    """Test SQL rate filters and that rows carry every LoadResponse field."""
+    await loads_api.post("/api/v1/loads/", json=new_load("L2", 500.0), headers=HEADERS)
+
+    response = await loads_api.get(
+        "/api/v1/loads/", params={"min_rate": 1000}, headers=HEADERS
+    )
+    rows = response.json()
+
+    assert [row["load_id"] for row in rows] == ["L1"]
+    assert rows[0]["pickup_datetime"] == "2025-01-01T08:00:00"
+    assert {"is_available", "created_at", "updated_at", "notes"} <= rows[0].keys()
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_and_limit(loads_api):
+    """Test that malformed cursors and limits are rejected."""
+    bad_cursor = await loads_api.get(
+        "/api/v1/loads/", params={"cursor": "%%%"}, headers=HEADERS
+    )
+    bad_limit = await loads_api.get(
+        "/api/v1/loads/", params={"limit": 0}, headers=HEADERS
+    )
+
+    assert bad_cursor.status_code == 400
+    assert bad_limit.status_code == 422
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_async_read_db
+from app.models import Call, Load
+from app.routers import metrics
+
+
+def load(load_id: str, **fields) -> Load:
+    return Load(
+        load_id=load_id,
+        origin="Chicago, IL",
+        destination="Dallas, TX",
+        pickup_datetime=datetime(2025, 1, 1, 8),
+        delivery_datetime=datetime(2025, 1, 2, 8),
+        equipment_type="Dry Van",
+        loadboard_rate=2000.0,
+        **fields,
+    )
+
+
+@pytest_asyncio.fixture
+async def metrics_api(tmp_path):
+    """The metrics router on a database seeded with four calls over two loads."""
+    url = f"sqlite:///{tmp_path}/metrics.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    weeks_ago = now - timedelta(days=40)
+
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([load("L1"), load("L2", is_available=False)])
+        db.add_all(
+            [
+                Call(
+                    call_id="C1",
+                    load_id="L1",
+                    outcome="accepted",
+                    sentiment="positive",
+                    duration_seconds=100,
+                    negotiation_rounds=2,
+                    final_rate=2000.0,
+                    created_at=now - timedelta(seconds=2),
+                ),
+                Call(
+                    call_id="C2",
+                    load_id="L1",
+                    outcome="rejected",
+                    sentiment="neutral",
+                    duration_seconds=200,
+                    negotiation_rounds=0,
+                    created_at=now - timedelta(seconds=1),
+                ),
+                Call(
+                    call_id="C3",
+                    load_id="L2",
+                    outcome="accepted",
+                    sentiment="positive",
+                    duration_seconds=300,
+                    negotiation_rounds=4,
+                    final_rate=3000.0,
+                    created_at=weeks_ago,
+                ),
+                Call(call_id="C4", negotiation_rounds=0, created_at=weeks_ago),
+            ]
+        )
+        db.commit()
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1/metrics")
+    app.dependency_overrides[get_async_read_db] = override_async_db
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_aggregate_seeded_calls(metrics_api):
+    """Test every dashboard figure against hand-computed values."""
+    response = await metrics_api.get("/api/v1/metrics/")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_calls": 4,
+        "calls_by_outcome": {"accepted": 2, "rejected": 1},
+        "calls_by_sentiment": {"positive": 2, "neutral": 1},
+        "average_duration_seconds": 200.0,
+        # Calls without negotiation rounds are left out of the average
+        "average_negotiation_rounds": 3.0,
+        "conversion_rate": 50.0,
+        "total_loads_available": 1,
+        # Distinct load_ids: C1 and C2 share L1, C4 has no load
+        "total_loads_matched": 2,
+        "average_rate": 2500.0,
+        "calls_today": 2,
+        "calls_this_week": 2,
+        "calls_this_month": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_metrics_on_an_empty_database(tmp_path):
+    """Test that averages and the conversion rate are null without calls."""
+    url = f"sqlite+aiosqlite:///{tmp_path}/empty.db"
+    async_engine = create_async_engine(url)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    AsyncSessionLocal = async_sessionmaker(async_engine)
+
+    async def override_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1/metrics")
+    app.dependency_overrides[get_async_read_db] = override_async_db
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        body = (await c.get("/api/v1/metrics/")).json()
+    await async_engine.dispose()
+
+    assert body["total_calls"] == 0
+    assert body["total_loads_matched"] == 0
+    assert body["conversion_rate"] is None
+    assert body["average_duration_seconds"] is None
+    assert body["calls_by_outcome"] == {}
+
+
+@pytest.mark.asyncio
+async def test_calls_are_listed_newest_first(metrics_api):
+    """Test that /calls pages through calls by creation time, newest first."""
+    first = await metrics_api.get("/api/v1/metrics/calls", params={"limit": 2})
+    rest = await metrics_api.get(
+        "/api/v1/metrics/calls", params={"limit": 2, "offset": 2}
+    )
+    too_many = await metrics_api.get("/api/v1/metrics/calls", params={"limit": 5000})
+
+    assert [c["call_id"] for c in first.json()] == ["C2", "C1"]
+    assert {c["call_id"] for c in rest.json()} == {"C3", "C4"}
+    assert first.json()[1]["final_rate"] == 2000.0
+    assert too_many.status_code == 422
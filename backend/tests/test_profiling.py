@@ -0,0 +1,127 @@
+import json
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.profiling import (
+    ProfileStore,
+    ProfilingMiddleware,
+    profile_header,
+    run_in_threadpool,
+    sign,
+    verify_signature,
+)
+
+SECRET = "profiling-secret"
+
+
+def busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def build_app(store: ProfileStore) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, secret=SECRET, store=store)
+
+    @app.get("/slow")
+    async def slow():
+        busy(0.02)
+        await run_in_threadpool(busy, 0.02)
+        return {"ok": True}
+
+    return app
+
+
+def test_signature_is_bound_to_method_path_and_time():
+    """Test that signatures only validate for their endpoint and window."""
+    header = profile_header(SECRET, "GET", "/slow")
+
+    assert verify_signature(SECRET, header, "GET", "/slow", max_age=60)
+    assert not verify_signature(SECRET, header, "GET", "/other", max_age=60)
+    assert not verify_signature(SECRET, header, "POST", "/slow", max_age=60)
+    assert not verify_signature("wrong", header, "GET", "/slow", max_age=60)
+    assert not verify_signature(SECRET, "garbage", "GET", "/slow", max_age=60)
+
+    old = int(time.time()) - 120
+    expired = f"{old}.{sign(SECRET, old, 'GET', '/slow')}"
+    assert not verify_signature(SECRET, expired, "GET", "/slow", max_age=60)
+
+
+def test_signature_covers_the_raw_query_string():
+    """Test that a signature made for one query does not profile another."""
+    header = profile_header(SECRET, "GET", "/slow", "limit=5")
+
+    assert verify_signature(SECRET, header, "GET", "/slow", 60, query="limit=5")
+    assert not verify_signature(SECRET, header, "GET", "/slow", 60)
+    assert not verify_signature(SECRET, header, "GET", "/slow", 60, query="limit=50")
+
+    path_only = profile_header(SECRET, "GET", "/slow")
+    assert not verify_signature(SECRET, path_only, "GET", "/slow", 60, query="limit=5")
+
+
+def test_store_is_bounded():
+    """Test that the oldest profiles are evicted first."""
+    store = ProfileStore(size=2)
+    for request_id in ("a", "b", "c"):
+        store.add({"request_id": request_id, "speedscope": "{}"})
+
+    assert store.get("a") is None
+    assert [p["request_id"] for p in store.recent()] == ["c", "b"]
+    assert "speedscope" not in store.recent()[0]
+
+
+@pytest.mark.asyncio
+async def test_signed_request_is_profiled_including_threadpool_work():
+    """Test that only signed requests are profiled, with worker threads merged."""
+    store = ProfileStore()
+    transport = httpx.ASGITransport(app=build_app(store))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        unsigned = await c.get("/slow")
+        forged = await c.get("/slow", headers={"X-Profile": "1.deadbeef"})
+        signed = await c.get(
+            "/slow", headers={"X-Profile": profile_header(SECRET, "GET", "/slow")}
+        )
+        other_query = await c.get(
+            "/slow?a=1", headers={"X-Profile": profile_header(SECRET, "GET", "/slow")}
+        )
+        signed_query = await c.get(
+            "/slow?a=1",
+            headers={"X-Profile": profile_header(SECRET, "GET", "/slow", "a=1")},
+        )
+
+    assert "X-Profile-Id" not in unsigned.headers
+    assert "X-Profile-Id" not in other_query.headers
+    assert "X-Profile-Id" not in forged.headers
+    assert signed.json() == {"ok": True}
+
+    profile = store.get(signed.headers["X-Profile-Id"])
+    assert profile["path"] == "/slow"
+    assert profile["status"] == 200
+    assert profile["thread_sessions"] == 1
+    assert store.get(signed_query.headers["X-Profile-Id"])["query"] == "a=1"
+    speedscope = json.loads(profile["speedscope"])
+    assert "busy" in {frame["name"] for frame in speedscope["shared"]["frames"]}
+
+
+@pytest.mark.asyncio
+async def test_signed_header_profiles_only_once():
+    """Test that replaying a used header within its window is not profiled."""
+    store = ProfileStore()
+    transport = httpx.ASGITransport(app=build_app(store))
+    header = {"X-Profile": profile_header(SECRET, "GET", "/slow")}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        first = await c.get("/slow", headers=header)
+        replayed = await c.get("/slow", headers=header)
+        padded = await c.get("/slow", headers={"X-Profile": "0" + header["X-Profile"]})
+
+    assert "X-Profile-Id" in first.headers
+    assert "X-Profile-Id" not in replayed.headers
+    assert "X-Profile-Id" not in padded.headers
+    assert replayed.json() == {"ok": True}
+    assert len(store.recent()) == 1
@@ -0,0 +1,75 @@
+from sqlalchemy import create_engine, text
+
+from app.query_log import SlowQueryLog, is_full_scan
+
+
+def make_engine(log: SlowQueryLog):
+    engine = create_engine("sqlite://")
+    log.install(engine, "test")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE calls (id INTEGER PRIMARY KEY, outcome TEXT)"))
+    return engine
+
+
+def test_records_statements_over_threshold_with_plan():
+    """Test that slow statements are kept with their query plan."""
+    log = SlowQueryLog(threshold_ms=0)
+    engine = make_engine(log)
+    log.clear()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT * FROM calls WHERE outcome = :o"), {"o": "accepted"})
+
+    entry = log.recent()[0]
+    assert entry["engine"] == "test"
+    assert "accepted" in entry["parameters"]
+    assert entry["plan"] == ["SCAN calls"]
+    assert entry["full_scan"] is True
+
+
+def test_index_lookup_is_not_flagged():
+    """Test that an indexed lookup is not reported as a full scan."""
+    log = SlowQueryLog(threshold_ms=0)
+    engine = make_engine(log)
+    log.clear()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT * FROM calls WHERE id = 1"))
+
+    assert log.recent()[0]["full_scan"] is False
+
+
+def test_fast_statements_are_not_recorded():
+    """Test that statements under the threshold are only counted."""
+    log = SlowQueryLog(threshold_ms=60_000)
+    engine = make_engine(log)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert log.recent() == []
+    assert log.statements > 0
+
+
+def test_ring_buffer_is_bounded():
+    """Test that only the most recent entries are retained."""
+    log = SlowQueryLog(threshold_ms=0, size=3)
+    engine = make_engine(log)
+
+    with engine.connect() as conn:
+        for i in range(10):
+            conn.execute(text(f"SELECT {i}"))
+
+    assert [e["statement"] for e in log.recent()] == [
+        "SELECT 9",
+        "SELECT 8",
+        "SELECT 7",
+    ]
+
+
+def test_is_full_scan():
+    assert is_full_scan("SCAN loads")
+    assert not is_full_scan("SCAN loads USING COVERING INDEX ix_loads_is_available")
+    assert not is_full_scan(
+        "SEARCH loads USING INDEX sqlite_autoindex_loads_1 (load_id=?)"
+    )
@@ -0,0 +1,79 @@
+import pytest
+
+from app.response_cache import ResponseCache
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+def test_bump_changes_etags_and_drops_bodies():
+    """Test that a load write invalidates ETags and cached bodies."""
+    cache = ResponseCache(max_entries=10)
+    etag = cache.etag("load:L1")
+    cache.put("load:L1", etag, b"{}")
+    assert cache.get("load:L1", etag).body == b"{}"
+    assert cache.etag("load:L2") != etag
+
+    cache.bump()
+
+    assert cache.etag("load:L1") != etag
+    assert cache.get("load:L1", cache.etag("load:L1")) is None
+
+
+def test_put_ignores_bodies_built_before_a_write():
+    """Test that a response computed across a write is not cached."""
+    cache = ResponseCache(max_entries=10)
+    etag = cache.etag("search:{}")
+    cache.bump()
+    cache.put("search:{}", etag, b"[]")
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_is_bounded():
+    """Test LRU eviction at max_entries."""
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, cache.etag(key), key.encode())
+
+    assert cache.get("a", cache.etag("a")) is None
+    assert cache.get("c", cache.etag("c")).body == b"c"
+
+
+@pytest.mark.asyncio
+async def test_get_load_etag_and_cache(loads_api):
+    """Test 304 on If-None-Match and cached repeats of GET /loads/{id}."""
+    first = await loads_api.get("/api/v1/loads/L1", headers=HEADERS)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    etag = first.headers["ETag"]
+
+    repeat = await loads_api.get("/api/v1/loads/L1", headers=HEADERS)
+    assert repeat.headers["X-Cache"] == "HIT"
+    assert repeat.json() == first.json()
+
+    revalidated = await loads_api.get(
+        "/api/v1/loads/L1", headers={**HEADERS, "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_load_write_invalidates_search_and_etags(loads_api):
+    """Test that updating a load changes the ETag and the cached search."""
+    search = await loads_api.get("/api/v1/loads/", headers=HEADERS)
+    assert search.headers["X-Cache"] == "MISS"
+    repeat = await loads_api.get("/api/v1/loads/", headers=HEADERS)
+    assert repeat.headers["X-Cache"] == "HIT"
+    etag = search.headers["ETag"]
+
+    await loads_api.put(
+        "/api/v1/loads/L1", json={"loadboard_rate": 2500.0}, headers=HEADERS
+    )
+
+    after = await loads_api.get(
+        "/api/v1/loads/", headers={**HEADERS, "If-None-Match": etag}
+    )
+    assert after.status_code == 200
+    assert after.headers["X-Cache"] == "MISS"
+    assert after.json()[0]["loadboard_rate"] == 2500.0
@@ -0,0 +1,322 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base, get_db, get_read_db
+from app.models import SavedSearch
+from app.routers import loads, saved_searches
+from app.saved_searches import (
+    CompiledSearch,
+    MatchBroker,
+    SavedSearchIndex,
+    SearchNotifier,
+    callback_url_error,
+)
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+def new_load(load_id: str, **fields) -> dict:
+    return {
+        "load_id": load_id,
+        "origin": "Houston, TX",
+        "destination": "Atlanta, GA",
+        "pickup_datetime": "2025-01-01T08:00:00",
+        "delivery_datetime": "2025-01-02T08:00:00",
+        "equipment_type": "Flatbed",
+        "loadboard_rate": 2400.0,
+        "miles": 800.0,
+        **fields,
+    }
+
+
+def matched_ids(index: SavedSearchIndex, load: dict):
+    return {search.id for search, _ in index.match([load])}
+
+
+def test_index_matches_words_rates_and_rate_per_mile():
+    """Test each criterion, and that removed searches stop matching."""
+    index = SavedSearchIndex(rate_bucket_size=500)
+    index.add(
+        SavedSearch(id=1, name="TX flatbeds", origin="TX", equipment_type="flatbed")
+    )
+    index.add(SavedSearch(id=2, name="$2/mile", min_rate_per_mile=2.0))
+    index.add(SavedSearch(id=3, name="Big", min_rate=3000))
+    index.add(SavedSearch(id=4, name="Cheap", max_rate=2000))
+    index.add(
+        SavedSearch(
+            id=5, name="Reefers to GA", destination="ga", equipment_type="Reefer"
+        )
+    )
+
+    assert matched_ids(index, new_load("L1")) == {1, 2}
+    assert matched_ids(index, new_load("L2", loadboard_rate=3200.0)) == {1, 2, 3}
+    assert matched_ids(index, new_load("L3", miles=None, loadboard_rate=1500.0)) == {
+        1,
+        4,
+    }
+    assert matched_ids(
+        index, new_load("L4", origin="Tulsa, OK", equipment_type="Reefer 53ft")
+    ) == {2, 5}
+
+    index.remove(1)
+    index.add(SavedSearch(id=3, name="Bigger", min_rate=5000))
+    assert matched_ids(index, new_load("L2", loadboard_rate=3200.0)) == {2}
+    assert len(index) == 4
+
+
+@pytest.mark.asyncio
+async def test_new_loads_are_pushed_to_listeners_and_callbacks(loads_api, monkeypatch):
+    """Test that create and bulk ingest push only new loads that match."""
+    callbacks = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        callbacks.append(
+            (request.headers.get("X-Webhook-Secret"), json.loads(request.content))
+        )
+        return httpx.Response(204)
+
+    index = SavedSearchIndex()
+    notifier = SearchNotifier(index, MatchBroker(), allowed_hosts=["dispatch.test"])
+    notifier._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(loads, "saved_search_index", index)
+    monkeypatch.setattr(loads, "search_notifier", notifier)
+    # Refreshing bulk embeddings would download the sentence-transformers model
+    monkeypatch.setattr(loads.embedding_index, "update", lambda rows: None)
+    index.add(
+        SavedSearch(
+            id=1,
+            name="TX flatbeds",
+            origin="TX",
+            equipment_type="Flatbed",
+            callback_url="http://dispatch.test/hook",
+            callback_secret="s3cret",
+        )
+    )
+    index.add(SavedSearch(id=2, name="Reefers", equipment_type="Reefer"))
+    listener = notifier.broker.subscribe(1)
+
+    await loads_api.post("/api/v1/loads/", json=new_load("L2"), headers=HEADERS)
+    bulk = [new_load("L2"), new_load("L3"), new_load("L4", origin="Tulsa, OK")]
+    await loads_api.post("/api/v1/loads/bulk", json=bulk, headers=HEADERS)
+    await notifier.aclose()
+
+    streamed = [listener.get_nowait(), listener.get_nowait()]
+    assert listener.empty()
+    # L2 was only updated by the bulk upsert, so it is not pushed again
+    assert [[x["load_id"] for x in event["loads"]] for event in streamed] == [
+        ["L2"],
+        ["L3"],
+    ]
+    assert [event["loads"][0]["load_id"] for _, event in callbacks] == ["L2", "L3"]
+    assert callbacks[0][1]["loads"][0]["pickup_datetime"] == "2025-01-01T08:00:00"
+    assert {secret for secret, _ in callbacks} == {"s3cret"}
+    assert notifier.broker.listeners(2) == 0
+
+
+@pytest.mark.asyncio
+async def test_saved_search_api_maintains_the_index(tmp_path, monkeypatch):
+    """Test that registering and deleting saved searches updates the index."""
+    monkeypatch.setattr(settings, "API_KEY", "test-key")
+    index = SavedSearchIndex()
+    monkeypatch.setattr(saved_searches, "saved_search_index", index)
+
+    engine = create_engine(f"sqlite:///{tmp_path}/searches.db")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def override_db():
+        with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(saved_searches.router, prefix="/api/v1/saved-searches")
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        created = await c.post(
+            "/api/v1/saved-searches/",
+            json={"name": "TX flatbeds", "origin": "TX", "callback_secret": "s3cret"},
+            headers=HEADERS,
+        )
+        invalid = await c.post(
+            "/api/v1/saved-searches/",
+            json={"name": "Bad", "callback_url": "ftp://x"},
+            headers=HEADERS,
+        )
+        metadata = await c.post(
+            "/api/v1/saved-searches/",
+            json={"name": "Bad", "callback_url": "http://169.254.169.254/latest"},
+            headers=HEADERS,
+        )
+        search_id = created.json()["id"]
+        assert matched_ids(index, new_load("L1")) == {search_id}
+
+        listed = await c.get("/api/v1/saved-searches/", headers=HEADERS)
+        deleted = await c.delete(f"/api/v1/saved-searches/{search_id}", headers=HEADERS)
+        missing = await c.get(
+            f"/api/v1/saved-searches/{search_id}/events", headers=HEADERS
+        )
+    engine.dispose()
+
+    assert "callback_secret" not in created.json()
+    assert invalid.status_code == 422
+    assert metadata.status_code == 422
+    assert [s["name"] for s in listed.json()] == ["TX flatbeds"]
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+    assert len(index) == 0
+
+    with SessionLocal() as db:
+        assert index.load(db) == 0
+
+
+def test_callback_urls_must_target_public_hosts():
+    """Test that local, private and link-local targets are refused."""
+    refused = [
+        "http://169.254.169.254/latest/meta-data",
+        "http://127.0.0.1:8000/hook",
+        "http://10.0.0.5/hook",
+        "http://192.168.1.10/hook",
+        "http://0.0.0.0/hook",
+        "http://[::1]/hook",
+        "http://[::ffff:127.0.0.1]/hook",
+        "http://[fe80::1]/hook",
+        "http://localhost/hook",
+        "http://api.localhost./hook",
+        "ftp://dispatch.example.com/hook",
+        "http:///hook",
+    ]
+
+    assert [url for url in refused if callback_url_error(url) is None] == []
+    assert callback_url_error("https://93.184.216.34/hook") is None
+    # Names are checked against what they resolve to when posting
+    assert callback_url_error("https://dispatch.example.com/hook") is None
+    assert callback_url_error("http://dispatch.test/", ["dispatch.test"]) is None
+    assert callback_url_error("http://10.0.0.5/", ["dispatch.test"]) is not None
+
+
+@pytest.mark.asyncio
+async def test_callbacks_to_hosts_resolving_privately_are_not_sent():
+    """Test that the resolved addresses are checked before every POST."""
+    posted = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted.append(
+            (
+                request.url.host,
+                request.headers["Host"],
+                request.extensions.get("sni_hostname"),
+            )
+        )
+        return httpx.Response(204)
+
+    notifier = SearchNotifier(SavedSearchIndex(), MatchBroker())
+    notifier._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    addresses = {
+        "internal.example.com": ["93.184.216.34", "10.1.2.3"],
+        "dispatch.example.com": ["93.184.216.34", "2606:2800:220:1::1"],
+    }
+    lookups = []
+
+    async def resolve(host, port):
+        lookups.append(host)
+        return addresses[host]
+
+    notifier.resolve = resolve
+    for search_id, host in enumerate(addresses):
+        search = SavedSearch(
+            id=search_id, name=host, callback_url=f"https://{host}/hook"
+        )
+        notifier.index.add(search)
+    await notifier.notify([new_load("L1")])
+    await notifier.aclose()
+
+    # Sent to the address that was checked, not re-resolved by the client
+    assert posted == [("93.184.216.34", "dispatch.example.com", "dispatch.example.com")]
+    assert sorted(lookups) == ["dispatch.example.com", "internal.example.com"]
+
+
+@pytest.mark.asyncio
+async def test_plain_http_callbacks_are_pinned_without_sni():
+    """Test that http callbacks keep their port and Host header when pinned."""
+    posted = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted.append((str(request.url), request.headers["Host"], request.extensions))
+        return httpx.Response(204)
+
+    notifier = SearchNotifier(SavedSearchIndex(), MatchBroker())
+    notifier._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def resolve(host, port):
+        assert (host, port) == ("dispatch.example.com", 8080)
+        return ["2606:2800:220:1::1"]
+
+    notifier.resolve = resolve
+    search = SavedSearch(
+        id=1, name="hook", callback_url="http://dispatch.example.com:8080/hook?a=1"
+    )
+    await notifier.post_callback(CompiledSearch.of(search), {"loads": []})
+    await notifier.aclose()
+
+    [(url, host, extensions)] = posted
+    assert url == "http://[2606:2800:220:1::1]:8080/hook?a=1"
+    assert host == "dispatch.example.com:8080"
+    assert "sni_hostname" not in extensions
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+@pytest.mark.asyncio
+async def test_match_stream_keeps_alive_and_ends_on_delete_or_disconnect(
+    monkeypatch,
+):
+    """Test SSE matches, keep-alives, the deleted event and listener cleanup."""
+    index = SavedSearchIndex()
+    notifier = SearchNotifier(index, MatchBroker())
+    monkeypatch.setattr(saved_searches, "saved_search_index", index)
+    monkeypatch.setattr(saved_searches, "search_notifier", notifier)
+    monkeypatch.setattr(settings, "SAVED_SEARCH_KEEPALIVE_SECONDS", 0.01)
+    index.add(SavedSearch(id=1, name="TX flatbeds", origin="TX"))
+
+    request = FakeRequest()
+    events = saved_searches.match_events(request, 1)
+    subscribed = await anext(events)
+    listening = notifier.broker.listeners(1)
+    await notifier.notify([new_load("L1")])
+    match = await anext(events)
+    keep_alive = await anext(events)
+    index.remove(1)
+    deleted = await anext(events)
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+
+    assert subscribed == b": subscribed\n\n"
+    assert listening == 1
+    assert match.startswith(b"event: match\ndata: ")
+    assert json.loads(match.split(b"data: ", 1)[1])["loads"][0]["load_id"] == "L1"
+    assert keep_alive == b": keep-alive\n\n"
+    assert deleted == b"event: deleted\ndata: {}\n\n"
+    assert notifier.broker.listeners(1) == 0
+
+    index.add(SavedSearch(id=1, name="TX flatbeds", origin="TX"))
+    events = saved_searches.match_events(request, 1)
+    await anext(events)
+    request.disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+    assert notifier.broker.listeners(1) == 0
@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Call, CarrierProfile, LaneStat, Load, Negotiation
+from scripts import seed_loads
+
+# Stamped by the database rather than the generator
+SERVER_STAMPED = {"created_at", "updated_at"}
+
+
+def table_rows(engine, model):
+    columns = [
+        c
+        for c in model.__table__.columns
+        if model is not Load or c.name not in SERVER_STAMPED
+    ]
+    with engine.connect() as conn:
+        return conn.execute(
+            select(*columns).order_by(*model.__table__.primary_key)
+        ).all()
+
+
+def generate_into(path, monkeypatch, **options):
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr(seed_loads, "init_db", lambda: Base.metadata.create_all(engine))
+    monkeypatch.setattr(seed_loads, "SessionLocal", sessionmaker(bind=engine))
+    seed_loads.generate(**options)
+    return engine
+
+
+def row_count(engine, model):
+    with sessionmaker(bind=engine)() as db:
+        return db.query(model).count()
+
+
+def test_generate_is_reproducible(tmp_path, monkeypatch):
+    """Test that two runs with the default base date write identical rows."""
+    args = seed_loads.parse_args(["--generate", "--loads", "50", "--calls", "200"])
+    options = dict(
+        loads=args.loads,
+        calls=args.calls,
+        seed=args.seed,
+        base_date=args.base_date,
+        batch_size=32,
+    )
+
+    first = generate_into(tmp_path / "first.db", monkeypatch, **options)
+    second = generate_into(tmp_path / "second.db", monkeypatch, **options)
+
+    assert args.base_date == seed_loads.DEFAULT_BASE_DATE
+    for model in (Load, Call, Negotiation):
+        rows = table_rows(first, model)
+        assert rows, model.__tablename__
+        assert rows == table_rows(second, model)
+    for model in (LaneStat, CarrierProfile):
+        assert row_count(first, model) == row_count(second, model) > 0
+    first.dispose()
+    second.dispose()
+
+
+def test_generate_skips_existing_rows(tmp_path, monkeypatch):
+    """Test that rerunning into the same database inserts nothing new."""
+    path = tmp_path / "seeded.db"
+    engine = generate_into(path, monkeypatch, loads=20, calls=30)
+    before = [table_rows(engine, model) for model in (Load, Call, Negotiation)]
+
+    generate_into(path, monkeypatch, loads=20, calls=30).dispose()
+
+    assert [table_rows(engine, model) for model in (Load, Call, Negotiation)] == before
+    engine.dispose()
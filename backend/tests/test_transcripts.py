@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, transcripts
+from app.database import Base, sqlite_has_fts5
+from app.models import Call, CallTranscript
+from app.transcripts import (
+    FTS_TABLE,
+    fts_enabled,
+    migrate_inline_transcripts,
+    load_transcript,
+    save_transcripts,
+    search_transcripts,
+    snippet,
+)
+from app.write_queue import CallWriteQueue
+
+TARPING = (
+    "Carrier asked whether the load needs tarping. We confirmed the steel coils "
+    "must be tarped and offered an extra 150 for tarps. " + "Small talk. " * 40
+)
+
+
+async def search(url: str, query: str):
+    engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    try:
+        async with async_sessionmaker(engine)() as db:
+            return await search_transcripts(db, query), await load_transcript(
+                db, "HR-1"
+            )
+    finally:
+        await engine.dispose()
+
+
+def test_snippet_highlights_stemmed_matches():
+    """Test that snippets center on a match and mark word variants."""
+    result = snippet(TARPING, ["tarping"], width=100)
+
+    assert result.startswith("Carrier asked")
+    assert "<mark>tarping</mark>" in result
+    assert "<mark>tarped</mark>" in result
+    assert result.endswith("…")
+
+
+@pytest.mark.asyncio
+async def test_transcripts_are_compressed_indexed_and_reindexed(
+    database_url, session_factory
+):
+    """Test compressed storage, ranked search, and that rewrites reindex."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1", "transcript": TARPING})
+    write_queue.enqueue_call({"call_id": "HR-2", "transcript": "Dry van, no tarps."})
+    write_queue.enqueue_call({"call_id": "HR-3", "outcome": "no_match"})
+    write_queue.flush()
+
+    with session_factory() as db:
+        stored = db.query(CallTranscript).filter(CallTranscript.call_id == 1).one()
+        assert stored.size == len(TARPING)
+        assert len(stored.data) < len(TARPING) / 2
+
+    results, transcript = await search(database_url, "tarp")
+    assert transcript == TARPING
+    assert {r["call_id"] for r in results} == {"HR-1", "HR-2"}
+    assert results[0]["score"] >= results[1]["score"]
+    assert all("<mark>tarp" in r["snippet"] for r in results)
+
+    write_queue.enqueue_call({"call_id": "HR-1", "transcript": "Reefer at -10F."})
+    write_queue.flush()
+
+    results, transcript = await search(database_url, "tarp")
+    assert [r["call_id"] for r in results] == ["HR-2"]
+    assert transcript == "Reefer at -10F."
+    results, _ = await search(database_url, 'reefer" OR "*')
+    assert [r["call_id"] for r in results] == []
+
+
+@pytest.mark.asyncio
+async def test_inline_transcripts_are_migrated(database_url):
+    """Test moving the legacy calls.transcript column into the side table."""
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE calls ADD COLUMN transcript TEXT"))
+        conn.execute(
+            text(
+                "INSERT INTO calls (call_id, negotiation_rounds, transcript) "
+                "VALUES ('HR-1', 0, :t), ('HR-2', 0, NULL)"
+            ),
+            {"t": TARPING},
+        )
+
+    assert migrate_inline_transcripts(engine) == 1
+    assert migrate_inline_transcripts(engine) == 0
+    columns = {column["name"] for column in inspect(engine).get_columns("calls")}
+    assert "transcript" not in columns
+    engine.dispose()
+
+    results, transcript = await search(database_url, "steel coils")
+    assert [r["call_id"] for r in results] == ["HR-1"]
+    assert transcript == TARPING
+
+
+@pytest.mark.asyncio
+async def test_transcripts_are_stored_without_fts5(tmp_path, monkeypatch):
+    """Test that a SQLite build without FTS5 skips the index but keeps transcripts."""
+    assert sqlite_has_fts5()
+    monkeypatch.setattr(models, "sqlite_has_fts5", lambda: False)
+    monkeypatch.setattr(transcripts, "sqlite_has_fts5", lambda: False)
+    url = f"sqlite:///{tmp_path}/no_fts.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    with sessionmaker(bind=engine)() as db:
+        db.add(Call(id=1, call_id="HR-1", negotiation_rounds=0))
+        save_transcripts(db, {1: TARPING})
+        save_transcripts(db, {1: "Reefer at -10F."})
+        db.commit()
+        assert not fts_enabled(db)
+    assert not inspect(engine).has_table(FTS_TABLE)
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    async with async_sessionmaker(async_engine)() as db:
+        assert await load_transcript(db, "HR-1") == "Reefer at -10F."
+    await async_engine.dispose()
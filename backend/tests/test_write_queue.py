@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+from app.models import Call, Negotiation
+from app.write_queue import CallWriteQueue, QueueFullError
+
+
+def test_batch_merges_duplicate_call_ids(session_factory):
+    """Test that repeated writes for one call_id collapse into one row."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1", "carrier_mc_number": "123456"})
+    write_queue.enqueue_call({"call_id": "HR-1", "outcome": "accepted"})
+    write_queue.enqueue_call({"call_id": "HR-2", "carrier_mc_number": "654321"})
+
+    write_queue.flush()
+
+    db = session_factory()
+    calls = {call.call_id: call for call in db.query(Call).all()}
+    assert set(calls) == {"HR-1", "HR-2"}
+    assert calls["HR-1"].carrier_mc_number == "123456"
+    assert calls["HR-1"].outcome == "accepted"
+    assert write_queue.duplicates_merged == 1
+    assert write_queue.batches == 1
+    assert write_queue.committed == 3
+
+
+def test_update_applies_to_existing_call(session_factory):
+    """Test that a later batch updates a call written by an earlier one."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1", "carrier_mc_number": "123456"})
+    write_queue.flush()
+
+    write_queue.enqueue_call({"call_id": "HR-1", "final_rate": 2100.0})
+    write_queue.flush()
+
+    db = session_factory()
+    call = db.query(Call).one()
+    assert call.carrier_mc_number == "123456"
+    assert call.final_rate == 2100.0
+
+
+def test_negotiations_deduplicate_and_track_rounds(session_factory):
+    """Test that replayed negotiation rounds are written once."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1", "carrier_mc_number": "123456"})
+    write_queue.flush()
+
+    for _ in range(2):
+        write_queue.enqueue_negotiation(
+            {
+                "call_id": "HR-1",
+                "round_number": 2,
+                "offer_type": "counter",
+                "rate": 1900.0,
+            }
+        )
+        write_queue.flush()
+
+    db = session_factory()
+    assert db.query(Negotiation).one().call_id == db.query(Call).one().id
+    assert db.query(Call).one().negotiation_rounds == 2
+    assert write_queue.duplicates_merged == 1
+    assert write_queue.committed == 3
+
+
+def test_negotiation_resolves_a_call_queued_in_the_same_batch(session_factory):
+    """Test that rounds are keyed by HappyRobot call_id, not the table PK."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-7", "carrier_mc_number": "123456"})
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-7", "round_number": 1, "offer_type": "initial", "rate": 1.0}
+    )
+    write_queue.flush()
+
+    db = session_factory()
+    assert db.query(Negotiation).one().call_id == db.query(Call).one().id
+
+
+def test_negotiation_written_before_its_call_is_dropped(session_factory):
+    """Test that a round batched ahead of its call fails rather than waiting."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-7", "round_number": 1, "offer_type": "initial", "rate": 1.0}
+    )
+    write_queue.flush()
+    write_queue.enqueue_call({"call_id": "HR-7", "carrier_mc_number": "123456"})
+    write_queue.flush()
+
+    db = session_factory()
+    assert db.query(Call).one().call_id == "HR-7"
+    assert db.query(Negotiation).count() == 0
+    assert write_queue.failed == 1
+    assert write_queue.committed == 1
+
+
+def test_failed_write_does_not_drop_batch(session_factory):
+    """Test that one bad write falls back to per-op commits."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1"})
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-9", "round_number": 1, "offer_type": "initial", "rate": 1.0}
+    )
+    write_queue.enqueue_call({"call_id": "HR-2", "no_such_column": 1})
+    write_queue.enqueue_call({"call_id": "HR-1", "outcome": "accepted"})
+
+    write_queue.flush()
+
+    db = session_factory()
+    assert [call.call_id for call in db.query(Call).all()] == ["HR-1"]
+    # The failed group commit's merge of HR-1 is not counted again
+    assert write_queue.stats()["failed"] == 2
+    assert write_queue.stats()["committed"] == 2
+    assert write_queue.stats()["duplicates_merged"] == 0
+
+
+def test_unknown_call_negotiation_is_failed_not_committed(session_factory):
+    """Test that rounds dropped for unknown calls are not counted as committed."""
+    write_queue = CallWriteQueue(session_factory)
+    write_queue.enqueue_call({"call_id": "HR-1"})
+    write_queue.enqueue_negotiation(
+        {"call_id": "HR-9", "round_number": 1, "offer_type": "initial", "rate": 1.0}
+    )
+
+    write_queue.flush()
+
+    assert write_queue.committed == 1
+    assert write_queue.failed == 1
+
+
+def test_enqueue_rejects_when_full(session_factory):
+    """Test that the queue is bounded."""
+    write_queue = CallWriteQueue(session_factory, max_size=1)
+    write_queue.enqueue_call({"call_id": "HR-1"})
+
+    with pytest.raises(QueueFullError):
+        write_queue.enqueue_call({"call_id": "HR-2"})
+
+
+@pytest.mark.asyncio
+async def test_writer_task_group_commits(session_factory):
+    """Test that the background writer drains and reports lag."""
+    write_queue = CallWriteQueue(session_factory, batch_size=50, flush_interval=0.01)
+    write_queue.start()
+    for i in range(20):
+        write_queue.enqueue_call({"call_id": f"HR-{i}"})
+
+    for _ in range(100):
+        if write_queue.committed == 20:
+            break
+        await asyncio.sleep(0.01)
+    await write_queue.stop()
+
+    stats = write_queue.stats()
+    assert stats["committed"] == 20
+    assert stats["depth"] == 0
+    assert stats["batches"] < 20
+    assert stats["last_lag_seconds"] is not None
+    assert session_factory().query(Call).count() == 20
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_acknowledged_ops(session_factory):
+    """Test that stopping mid-batch flushes the batch instead of dropping it."""
+    write_queue = CallWriteQueue(session_factory, flush_interval=5)
+    write_queue.start()
+    write_queue.enqueue_call({"call_id": "HR-1"})
+    write_queue.enqueue_call({"call_id": "HR-2"})
+    await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(write_queue.stop(), 1)
+
+    assert write_queue.stats()["committed"] == 2
+    assert session_factory().query(Call).count() == 2